@@ -1,4 +1,4 @@
-# armazenamento/database.py 20250725 161500 (v2.1 - Boas Praticas Confirmadas)
+# armazenamento/database.py 20250730 140000 (v2.3 - Leitura em fluxo para consultas em lote)
 """
 Módulo para interação com o banco de dados SQLite.
 
@@ -8,11 +8,33 @@ Responsável por criar tabelas, inserir DataFrames e consultar dados.
 import sqlite3
 import pandas as pd
 import os
+import json
 import logging
 from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.text_folding import fold_text
 
 logger = logging.getLogger(__name__)
 
+# Tabela de metadados (chave/valor) mantida pelo importador
+METADATA_TABLE = 'metadados'
+# Sufixo da tabela-sombra de busca (FTS5 com texto já normalizado por fold())
+SEARCH_INDEX_SUFFIX = '_busca'
+# Mesmo separador usado pelo motor de busca em memória (core.search_engine)
+SEARCH_SEPARATOR = '\x1f'
+# Sufixo da tabela com o catálogo de estatísticas por coluna (ver core.column_stats)
+STATS_SUFFIX = '_estatisticas'
+# Colunas do catálogo, na ordem dos campos de core.column_stats.ColumnStats
+STATS_COLUMNS = (
+    ('coluna', 'TEXT PRIMARY KEY'), ('linhas', 'INTEGER'), ('fracao_nulos', 'REAL'),
+    ('distintos', 'INTEGER'), ('largura_p95', 'INTEGER'), ('largura_max', 'INTEGER'),
+    ('minimo', 'TEXT'), ('maximo', 'TEXT'), ('chave_min', 'REAL'), ('chave_max', 'REAL'),
+)
+# Fragmentos de tipo declarado que indicam coluna numérica (regras de afinidade do SQLite)
+_NUMERIC_TYPE_MARKERS = ('INT', 'REAL', 'FLOA', 'DOUB')
+
 # --- Gerenciamento de Conexão ---
 
 @contextmanager
@@ -36,6 +58,8 @@ def get_db_connection(db_path: str):
         conn = sqlite3.connect(db_path)
         # Configurações recomendadas para performance e segurança
         conn.execute("PRAGMA foreign_keys = ON") # Se estiver usando FKs
+        # fold(): remove acentos e converte para minúsculas (busca insensível a acentos)
+        conn.create_function('fold', 1, fold_text, deterministic=True)
         yield conn
     except sqlite3.Error as e:
         logger.error(f"Erro de banco de dados: {e}")
@@ -153,3 +177,359 @@ def insert_dataframe_to_db(df: pd.DataFrame, db_path: str, table_name: str, if_e
     except Exception as e:
         logger.error(f"Falha ao inserir dados na tabela '{table_name}': {e}")
         return False
+
+def ensure_indexes(db_path: str, table_name: str, columns: list) -> list:
+    """
+    Cria (se necessário) índices para as colunas informadas que existirem na tabela.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Nome da tabela.
+        columns (list): Colunas candidatas a indexação.
+
+    Returns:
+        list: Colunas efetivamente indexadas.
+    """
+    indexed = []
+    try:
+        with get_db_connection(db_path) as conn:
+            existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+            for column in columns:
+                if column not in existing:
+                    continue
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{table_name}_{column}" ON "{table_name}" ("{column}")'
+                )
+                indexed.append(column)
+            conn.commit()
+        logger.debug(f"Índices garantidos na tabela '{table_name}': {indexed}")
+    except Exception as e:
+        logger.error(f"Falha ao criar índices na tabela '{table_name}': {e}")
+    return indexed
+
+def query_range(db_path: str, table_name: str, column: str, low=None, high=None) -> pd.DataFrame:
+    """
+    Consulta as linhas cujo valor de `column` está no intervalo [low, high], usando o índice da coluna.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Nome da tabela.
+        column (str): Coluna do intervalo (deve ser um nome de coluna confiável).
+        low (optional): Limite inferior inclusivo. None para intervalo aberto.
+        high (optional): Limite superior inclusivo. None para intervalo aberto.
+
+    Returns:
+        pd.DataFrame: Linhas no intervalo, ordenadas pela coluna.
+    """
+    conditions = []
+    params = []
+    if low is not None:
+        conditions.append(f'"{column}" >= ?')
+        params.append(low)
+    if high is not None:
+        conditions.append(f'"{column}" <= ?')
+        params.append(high)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f'SELECT * FROM "{table_name}"{where} ORDER BY "{column}"'
+    return query_db(db_path, table_name, query, tuple(params))
+
+# --- Leitura incremental (paginação por chave) ---
+
+def get_table_columns(db_path: str, table_name: str) -> List[str]:
+    """Nomes das colunas da tabela, na ordem do schema (lista vazia se não existir)."""
+    try:
+        with get_db_connection(db_path) as conn:
+            return [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+    except sqlite3.Error:
+        return []
+
+def get_column_types(db_path: str, table_name: str) -> Dict[str, str]:
+    """Tipo declarado de cada coluna da tabela, na ordem do schema ({} se não existir)."""
+    try:
+        with get_db_connection(db_path) as conn:
+            return {row[1]: (row[2] or '') for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    except sqlite3.Error:
+        return {}
+
+def is_numeric_type(declared_type: str) -> bool:
+    """True se o tipo declarado indica coluna numérica (regras de afinidade do SQLite)."""
+    return any(marker in (declared_type or '').upper() for marker in _NUMERIC_TYPE_MARKERS)
+
+def stream_rows(
+    db_path: str,
+    table_name: str,
+    columns: List[str],
+    where: str = "1",
+    params: tuple = (),
+    use_search_index: bool = False,
+    functions: Optional[Dict[str, Tuple[int, Callable]]] = None
+) -> Iterator[tuple]:
+    """
+    Gera, em ordem de rowid, as linhas que satisfazem `where`, sem carregar o resultado inteiro.
+
+    O cursor é percorrido sob demanda: a memória não cresce com o tamanho do resultado.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Tabela lida (apelido `t` na condição).
+        columns (List[str]): Colunas de cada tupla gerada, na ordem.
+        where (str): Condição SQL (pode usar `b.texto` se `use_search_index`).
+        params (tuple): Parâmetros da condição.
+        use_search_index (bool): Junta a tabela-sombra `<tabela>_busca` (apelido `b`).
+        functions (Optional[Dict[str, Tuple[int, Callable]]]): Funções SQL extras
+            registradas na conexão (nome -> (nº de argumentos, função)), ex: 'regexp'.
+
+    Yields:
+        tuple: Valores das `columns` de cada linha encontrada.
+    """
+    select = ", ".join(f't."{col}"' for col in columns)
+    join = ""
+    if use_search_index:
+        join = f'JOIN "{table_name}{SEARCH_INDEX_SUFFIX}" b ON b.rowid = t.rowid '
+    query = f'SELECT {select} FROM "{table_name}" t {join}WHERE {where} ORDER BY t.rowid'
+    with get_db_connection(db_path) as conn:
+        for name, (num_args, func) in (functions or {}).items():
+            conn.create_function(name, num_args, func, deterministic=True)
+        yield from conn.execute(query, params)
+
+def count_rows(db_path: str, table_name: str) -> int:
+    """Quantidade de linhas da tabela (0 se não existir)."""
+    try:
+        with get_db_connection(db_path) as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+    except sqlite3.Error:
+        return 0
+
+def fetch_rows_after(
+    db_path: str, table_name: str, columns: List[str], after_rowid: int, limit: int
+) -> List[tuple]:
+    """
+    Lê o próximo lote de linhas em ordem de rowid, a partir de `after_rowid` (exclusivo).
+
+    A paginação por chave (WHERE rowid > ?) custa o mesmo em qualquer ponto da tabela,
+    ao contrário de OFFSET, que percorre todas as linhas anteriores.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Nome da tabela.
+        columns (List[str]): Colunas lidas (nomes confiáveis, ex: de `get_table_columns`).
+        after_rowid (int): Último rowid já lido (0 para começar do início).
+        limit (int): Tamanho máximo do lote.
+
+    Returns:
+        List[tuple]: Tuplas (rowid, *valores das colunas); menos de `limit` indica o fim da tabela.
+    """
+    select = ', '.join(['rowid'] + [f'"{col}"' for col in columns])
+    query = f'SELECT {select} FROM "{table_name}" WHERE rowid > ? ORDER BY rowid LIMIT ?'
+    try:
+        with get_db_connection(db_path) as conn:
+            return conn.execute(query, (after_rowid, limit)).fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao ler lote da tabela '{table_name}': {e}")
+        return []
+
+def get_row_by_rowid(db_path: str, table_name: str, rowid: int) -> Optional[dict]:
+    """Linha completa (coluna -> valor) com o rowid informado, ou None."""
+    try:
+        with get_db_connection(db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(f'SELECT * FROM "{table_name}" WHERE rowid = ?', (rowid,)).fetchone()
+        return dict(row) if row else None
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao ler a linha {rowid} da tabela '{table_name}': {e}")
+        return None
+
+# --- Metadados ---
+
+def set_metadata(db_path: str, key: str, value: str):
+    """Grava um par chave/valor na tabela de metadados."""
+    with get_db_connection(db_path) as conn:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {METADATA_TABLE} (chave TEXT PRIMARY KEY, valor TEXT)")
+        conn.execute(f"INSERT OR REPLACE INTO {METADATA_TABLE} (chave, valor) VALUES (?, ?)", (key, value))
+        conn.commit()
+
+def get_metadata(db_path: str, key: str) -> Optional[str]:
+    """Lê um valor da tabela de metadados. Retorna None se não existir."""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        with get_db_connection(db_path) as conn:
+            # Bancos criados antes da tabela de metadados: sem erro, apenas sem valor
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (METADATA_TABLE,)
+            ).fetchone():
+                return None
+            row = conn.execute(f"SELECT valor FROM {METADATA_TABLE} WHERE chave = ?", (key,)).fetchone()
+        return row[0] if row else None
+    except sqlite3.Error:
+        return None
+
+def get_dataset_version(db_path: str) -> Optional[str]:
+    """
+    Versão atual do conjunto de dados: o id da última importação gravada pelo importador.
+
+    Se o banco não tiver id de importação, usa a data de modificação do arquivo.
+    Retorna None se o banco não existir.
+    """
+    import_id = get_metadata(db_path, 'import_id')
+    if import_id is not None:
+        return import_id
+    if not os.path.exists(db_path):
+        return None
+    stat = os.stat(db_path)
+    return f"mtime:{stat.st_mtime_ns}:{stat.st_size}"
+
+def bump_dataset_version(db_path: str) -> str:
+    """Gera e grava um novo id de importação. Retorna o novo id."""
+    import_id = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    set_metadata(db_path, 'import_id', import_id)
+    logger.debug(f"Nova versão do conjunto de dados: {import_id}")
+    return import_id
+
+# --- Catálogo de estatísticas por coluna ---
+
+def save_column_stats(db_path: str, table_name: str, rows: List[tuple]) -> bool:
+    """
+    Substitui o catálogo `<tabela>_estatisticas` pelas linhas informadas.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Tabela descrita pelo catálogo.
+        rows (List[tuple]): Uma tupla por coluna, na ordem de `STATS_COLUMNS`.
+
+    Returns:
+        bool: True se o catálogo foi gravado.
+    """
+    stats_table = f"{table_name}{STATS_SUFFIX}"
+    definition = ", ".join(f"{name} {sql_type}" for name, sql_type in STATS_COLUMNS)
+    placeholders = ", ".join("?" for _ in STATS_COLUMNS)
+    try:
+        with get_db_connection(db_path) as conn:
+            conn.execute(f'DROP TABLE IF EXISTS "{stats_table}"')
+            conn.execute(f'CREATE TABLE "{stats_table}" ({definition})')
+            conn.executemany(f'INSERT INTO "{stats_table}" VALUES ({placeholders})', rows)
+            conn.commit()
+        logger.info(f"Catálogo de estatísticas '{stats_table}' recriado ({len(rows)} colunas).")
+        return True
+    except sqlite3.Error as e:
+        logger.error(f"Falha ao gravar o catálogo de estatísticas '{stats_table}': {e}")
+        return False
+
+def load_column_stats(db_path: str, table_name: str) -> Optional[List[tuple]]:
+    """
+    Lê o catálogo `<tabela>_estatisticas`.
+
+    Returns:
+        Optional[List[tuple]]: Uma tupla por coluna (ordem de `STATS_COLUMNS`), ou None
+                               se o banco não existir ou ainda não tiver catálogo.
+    """
+    if not os.path.exists(db_path):
+        return None
+    stats_table = f"{table_name}{STATS_SUFFIX}"
+    columns = ", ".join(name for name, _ in STATS_COLUMNS)
+    try:
+        with get_db_connection(db_path) as conn:
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (stats_table,)
+            ).fetchone():
+                return None
+            return [tuple(row) for row in conn.execute(f'SELECT {columns} FROM "{stats_table}"')]
+    except sqlite3.Error as e:
+        logger.warning(f"Não foi possível ler o catálogo de estatísticas '{stats_table}': {e}")
+        return None
+
+# --- Índice de busca insensível a acentos ---
+
+def _text_columns(conn: sqlite3.Connection, table_name: str) -> List[str]:
+    """Colunas da tabela que não têm tipo numérico declarado (lidas como texto pelo pandas)."""
+    columns = []
+    for _cid, name, declared_type, *_ in conn.execute(f'PRAGMA table_info("{table_name}")'):
+        if not is_numeric_type(declared_type):
+            columns.append(name)
+    return columns
+
+def rebuild_search_index(db_path: str, table_name: str) -> bool:
+    """
+    Recria a tabela-sombra de busca `<tabela>_busca` com o texto de cada linha normalizado por fold().
+
+    Usa FTS5 com o tokenizador trigram, que permite responder buscas por substring
+    (GLOB '*termo*') pelo índice. Se FTS5 não estiver disponível, cria uma tabela comum.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Tabela de origem.
+
+    Returns:
+        bool: True se o índice foi recriado com sucesso.
+    """
+    index_table = f"{table_name}{SEARCH_INDEX_SUFFIX}"
+    try:
+        with get_db_connection(db_path) as conn:
+            columns = _text_columns(conn, table_name)
+            if not columns:
+                logger.warning(f"Tabela '{table_name}' sem colunas de texto. Índice de busca não criado.")
+                return False
+            conn.execute(f'DROP TABLE IF EXISTS "{index_table}"')
+            try:
+                conn.execute(f'CREATE VIRTUAL TABLE "{index_table}" USING fts5(texto, tokenize="trigram")')
+            except sqlite3.OperationalError as e:
+                logger.warning(f"FTS5/trigram indisponível ({e}). Usando tabela de busca sem índice.")
+                conn.execute(f'CREATE TABLE "{index_table}" (texto TEXT)')
+            separator = " || char(31) || ".join(f'coalesce("{col}", \'\')' for col in columns)
+            conn.execute(
+                f'INSERT INTO "{index_table}" (rowid, texto) '
+                f'SELECT rowid, fold({separator}) FROM "{table_name}"'
+            )
+            conn.commit()
+        set_metadata(db_path, f"{index_table}_colunas", json.dumps(columns, ensure_ascii=False))
+        logger.info(f"Índice de busca '{index_table}' recriado ({len(columns)} colunas de texto).")
+        return True
+    except Exception as e:
+        logger.error(f"Falha ao recriar o índice de busca '{index_table}': {e}")
+        return False
+
+def load_search_haystack(db_path: str, table_name: str) -> Optional[Tuple[List[str], List[str]]]:
+    """
+    Lê o texto normalizado de cada linha a partir da tabela-sombra, na ordem de rowid.
+
+    Returns:
+        Optional[Tuple[List[str], List[str]]]: (colunas usadas, textos por linha),
+                                               ou None se o índice não existir.
+    """
+    index_table = f"{table_name}{SEARCH_INDEX_SUFFIX}"
+    columns_json = get_metadata(db_path, f"{index_table}_colunas")
+    if columns_json is None:
+        return None
+    try:
+        with get_db_connection(db_path) as conn:
+            texts = [row[0] for row in conn.execute(f'SELECT texto FROM "{index_table}" ORDER BY rowid')]
+        return json.loads(columns_json), texts
+    except sqlite3.Error as e:
+        logger.warning(f"Não foi possível ler o índice de busca '{index_table}': {e}")
+        return None
+
+def glob_literal(term: str) -> str:
+    """Escapa os curingas do GLOB para buscar o termo literalmente."""
+    return ''.join(f'[{ch}]' if ch in '*?[' else ch for ch in term)
+
+def search_db(db_path: str, table_name: str, terms: List[str]) -> pd.DataFrame:
+    """
+    Busca linhas que contenham todos os termos, ignorando acentos e maiúsculas, dentro do SQLite.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Nome da tabela (com índice criado por `rebuild_search_index`).
+        terms (List[str]): Termos literais (combinados com E).
+
+    Returns:
+        pd.DataFrame: Linhas encontradas, na ordem de rowid.
+    """
+    index_table = f"{table_name}{SEARCH_INDEX_SUFFIX}"
+    folded_terms = [fold_text(term.strip()) for term in terms if term and term.strip()]
+    conditions = " AND ".join("b.texto GLOB ?" for _ in folded_terms) or "1"
+    query = (
+        f'SELECT t.* FROM "{table_name}" t JOIN "{index_table}" b ON b.rowid = t.rowid '
+        f'WHERE {conditions} ORDER BY t.rowid'
+    )
+    params = tuple(f"*{glob_literal(term)}*" for term in folded_terms)
+    return query_db(db_path, table_name, query, params)
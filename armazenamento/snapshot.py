@@ -0,0 +1,157 @@
+# armazenamento/snapshot.py 20250802 110000 (v1.1 - Snapshot criado com as permissoes da umask)
+"""
+Snapshot colunar da base (Arrow IPC / Feather v2) para a carga rápida da CLI e da GUI.
+
+Ao fim de cada importação, a tabela já tipada e o texto pesquisável da tabela-sombra
+são gravados em `<pasta do banco>/<tabela>.<import_id>.arrow`. Na inicialização, se
+o id de importação do banco for o mesmo do snapshot, a base é lida dele por mapeamento
+de memória, sem `SELECT *`, sem inferir tipos e sem ler a tabela-sombra. Colunas
+numéricas sem nulos chegam ao DataFrame sem cópia; os textos viram objetos Python,
+como na leitura pelo SQL.
+
+O pyarrow é opcional: sem ele, nenhum snapshot é gravado ou lido e a base vem do SQLite.
+"""
+
+import os
+import glob
+import json
+import logging
+import uuid
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from armazenamento.database import query_db, load_search_haystack
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401  (pa.ipc)
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_EXTENSION = '.arrow'
+# Coluna extra do snapshot com o texto pesquisável (não vai para o DataFrame)
+HAYSTACK_COLUMN = '__texto_busca__'
+# Chaves dos metadados do esquema
+_IMPORT_ID_KEY = b'import_id'
+_HAYSTACK_COLUMNS_KEY = b'colunas_texto_busca'
+
+# (DataFrame, (colunas do texto pesquisável, textos por linha) ou None)
+Snapshot = Tuple[pd.DataFrame, Optional[Tuple[List[str], np.ndarray]]]
+
+
+def is_available() -> bool:
+    """True se o pyarrow estiver instalado."""
+    return pa is not None
+
+
+def snapshot_path(db_path: str, table_name: str, import_id: str) -> str:
+    """Caminho do snapshot de `table_name` para a importação `import_id`."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), f"{table_name}.{import_id}{SNAPSHOT_EXTENSION}")
+
+
+def _remove_old_snapshots(db_path: str, table_name: str, keep: str):
+    """Apaga os snapshots de importações anteriores (os que estiverem em uso ficam para a próxima vez)."""
+    pattern = os.path.join(os.path.dirname(os.path.abspath(db_path)), f"{table_name}.*{SNAPSHOT_EXTENSION}")
+    for path in glob.glob(pattern):
+        if os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)
+        except OSError as e:
+            # No Windows, um arquivo mapeado por outro processo não pode ser apagado
+            logger.debug(f"Snapshot antigo '{path}' não removido: {e}")
+
+
+def write_snapshot(db_path: str, table_name: str, import_id: str) -> bool:
+    """
+    Grava o snapshot da tabela e do texto pesquisável para a importação `import_id`.
+
+    A gravação é atômica (arquivo temporário na mesma pasta + os.replace) e sem
+    compressão, para que a leitura possa mapear o arquivo direto na memória. O
+    temporário é criado pelo próprio pyarrow, com as permissões da umask (o mkstemp
+    o criaria com 0600).
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Tabela gravada.
+        import_id (str): Id da importação que gerou os dados (`bump_dataset_version`).
+
+    Returns:
+        bool: True se o snapshot foi gravado.
+    """
+    if pa is None:
+        logger.debug("pyarrow não instalado: snapshot da base não gravado.")
+        return False
+    path = snapshot_path(db_path, table_name, import_id)
+    tmp_path = None
+    try:
+        df = query_db(db_path, table_name)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_IMPORT_ID_KEY] = import_id.encode()
+        search_index = load_search_haystack(db_path, table_name)
+        if search_index is not None and len(search_index[1]) == len(df):
+            columns, texts = search_index
+            table = table.append_column(HAYSTACK_COLUMN, pa.array(texts, type=pa.string()))
+            metadata[_HAYSTACK_COLUMNS_KEY] = json.dumps(columns).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        tmp_path = None
+    except Exception as e:
+        # Ex: coluna com tipos misturados que o Arrow não representa; a carga segue pelo SQL
+        logger.warning(f"Snapshot da base não gravado: {e}")
+        return False
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _remove_old_snapshots(db_path, table_name, keep=path)
+    logger.info(f"Snapshot da base gravado: '{os.path.basename(path)}' ({table.num_rows} linhas).")
+    return True
+
+
+def load_snapshot(db_path: str, table_name: str, import_id: Optional[str]) -> Optional[Snapshot]:
+    """
+    Lê o snapshot da importação `import_id` por mapeamento de memória.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Tabela lida.
+        import_id (Optional[str]): Id de importação atual do banco (`get_dataset_version`).
+
+    Returns:
+        Optional[Snapshot]: (DataFrame, texto pesquisável ou None), ou None se não houver
+        pyarrow ou snapshot válido para essa importação (a base deve vir do SQL).
+    """
+    if pa is None or import_id is None:
+        return None
+    path = snapshot_path(db_path, table_name, import_id)
+    if not os.path.exists(path):
+        logger.debug(f"Sem snapshot para a importação {import_id}.")
+        return None
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        metadata = table.schema.metadata or {}
+        if metadata.get(_IMPORT_ID_KEY, b'').decode() != import_id:
+            logger.debug(f"Snapshot '{os.path.basename(path)}' não corresponde à importação {import_id}.")
+            return None
+        search_index = None
+        if HAYSTACK_COLUMN in table.column_names:
+            texts = table.column(HAYSTACK_COLUMN).to_numpy(zero_copy_only=False)
+            search_index = (json.loads(metadata[_HAYSTACK_COLUMNS_KEY]), texts)
+            table = table.select([name for name in table.column_names if name != HAYSTACK_COLUMN])
+        # split_blocks: cada coluna numérica sem nulos aponta para o arquivo mapeado, sem cópia
+        df = table.to_pandas(split_blocks=True)
+    except Exception as e:
+        logger.warning(f"Snapshot '{os.path.basename(path)}' ilegível, lendo a base pelo SQL: {e}")
+        return None
+    logger.debug(f"Base lida do snapshot '{os.path.basename(path)}' ({len(df)} linhas).")
+    return df, search_index
@@ -1,28 +1,38 @@
-# core/app_logic.py 20250725 103000 (v3.1 - Refatorado, Exceções, Logging)
+# core/app_logic.py 20250731 180000 (v3.6 - Snapshot da base gravado na importacao e carga compartilhada CLI/GUI)
 """
 Lógica central da aplicação para importação e atualização do banco de dados.
 
 Coordena a verificação de arquivos modificados, a extração de dados,
 a atualização do banco de dados SQLite e o gerenciamento do cache.
+
+Importar este módulo é barato: o extrator (openpyxl), o banco (pandas) e o motor
+de busca só são carregados quando há arquivo a importar ou busca a fazer. Assim a
+verificação de novos relatórios na inicialização não paga por eles quando nada mudou.
 """
 
 import os
 import sys
 import logging
-import pandas as pd
-from typing import List, Set
+from typing import TYPE_CHECKING, Callable, List, Optional, Set
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 # Adiciona o diretório raiz do projeto ao sys.path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 from utils import caching
-from extracao import extractor
-from armazenamento import database
 
 # Configura logger específico para este módulo
 logger = logging.getLogger(__name__)
 
+# Callback de progresso da importação: (etapa, atual, total, descrição).
+# Etapas: 'arquivo' (1-based, por arquivo), 'planilha' (1-based, por planilha do
+# arquivo atual) e 'indices' (reconstrução dos índices de busca, 0 de 1).
+ProgressCallback = Callable[[str, int, int, str], None]
+
 # --- Exceções Personalizadas ---
 
 class ImporterError(Exception):
@@ -79,7 +89,9 @@ def _get_files_to_process(docs_dir: str, cache_file: str, force_import: bool) ->
         logger.error(f"Erro ao determinar arquivos para processamento: {e}")
         raise CacheError(f"Falha na verificação de arquivos: {e}") from e
 
-def _import_single_file(file_path: str, db_path: str, table_name: str) -> bool:
+def _import_single_file(
+    file_path: str, db_path: str, table_name: str, progress_callback: Optional[ProgressCallback] = None
+) -> bool:
     """
     Importa um único arquivo Excel para o banco de dados.
 
@@ -87,6 +99,7 @@ def _import_single_file(file_path: str, db_path: str, table_name: str) -> bool:
         file_path (str): Caminho completo para o arquivo Excel.
         db_path (str): Caminho para o banco de dados SQLite.
         table_name (str): Nome da tabela no banco de dados.
+        progress_callback (Optional[ProgressCallback]): Recebe o progresso por planilha.
 
     Returns:
         bool: True se a importação foi bem-sucedida, False caso contrário.
@@ -95,9 +108,17 @@ def _import_single_file(file_path: str, db_path: str, table_name: str) -> bool:
         ExtractionError: Se houver falha na extração.
         DatabaseError: Se houver falha na inserção no DB.
     """
+    # Importação local: openpyxl e o extrator só são carregados quando há arquivo a importar
+    from extracao import extractor
+    from armazenamento import database
+
     logger.info(f"Iniciando importação de '{file_path}'...")
     try:
-        df = extractor.extract_data_from_excel(file_path)
+        sheet_progress = None
+        if progress_callback is not None:
+            def sheet_progress(current: int, total: int, sheet_name: str):
+                progress_callback('planilha', current, total, sheet_name)
+        df = extractor.extract_data_from_excel(file_path, sheet_progress=sheet_progress)
         if df is not None and not df.empty:
             success = database.insert_dataframe_to_db(df, db_path, table_name)
             if success:
@@ -148,20 +169,43 @@ def run_importer_logic(
     data_dir: str = 'data',
     db_name: str = 'ssas.db',
     table_name: str = 'ssas',
-    force_import: bool = False
+    force_import: bool = False,
+    progress_callback: Optional[ProgressCallback] = None
 ) -> bool:
     """
     Executa a lógica principal de importação de dados.
 
+    Mesmos argumentos de `import_new_reports`.
+
+    Returns:
+        bool: True se o banco de dados foi atualizado, False caso contrário.
+    """
+    return bool(import_new_reports(docs_dir, data_dir, db_name, table_name, force_import, progress_callback))
+
+def import_new_reports(
+    docs_dir: str = 'docs_entrada',
+    data_dir: str = 'data',
+    db_name: str = 'ssas.db',
+    table_name: str = 'ssas',
+    force_import: bool = False,
+    progress_callback: Optional[ProgressCallback] = None
+) -> List[str]:
+    """
+    Importa os relatórios novos ou modificados e atualiza índices, catálogo e cache.
+
     Args:
         docs_dir (str): Diretório de entrada dos arquivos Excel.
         data_dir (str): Diretório para armazenamento do banco de dados e cache.
         db_name (str): Nome do arquivo do banco de dados SQLite.
         table_name (str): Nome da tabela no banco de dados.
         force_import (bool): Se True, força a reimportação de todos os arquivos.
+        progress_callback (Optional[ProgressCallback]): Chamada a cada arquivo, planilha e
+            na reconstrução dos índices (ex: para a barra de progresso da GUI). É executada
+            na thread da importação.
 
     Returns:
-        bool: True se o banco de dados foi atualizado, False caso contrário.
+        List[str]: Caminhos dos relatórios importados com sucesso (vazia se o banco
+        não foi atualizado).
     """
     logger.info("=== Iniciando processo de importação ===")
     
@@ -177,15 +221,17 @@ def run_importer_logic(
 
         if not files_to_process:
             logger.info("Nenhum arquivo novo ou modificado encontrado para processamento.")
-            return False
+            return []
 
         logger.info(f"{len(files_to_process)} arquivo(s) identificado(s) para importação.")
 
         # --- 2. Processar cada arquivo ---
         successfully_processed_files = []
-        for file_path in files_to_process:
+        for file_number, file_path in enumerate(files_to_process, start=1):
+            if progress_callback is not None:
+                progress_callback('arquivo', file_number, len(files_to_process), os.path.basename(file_path))
             try:
-                if _import_single_file(file_path, db_path, table_name):
+                if _import_single_file(file_path, db_path, table_name, progress_callback):
                     successfully_processed_files.append(file_path)
             except (ExtractionError, DatabaseError) as e:
                 # Loga o erro mas continua com os próximos arquivos
@@ -196,12 +242,29 @@ def run_importer_logic(
 
         # --- 3. Atualizar cache apenas se houve sucesso ---
         if successfully_processed_files:
+            from armazenamento import database, snapshot
+            from core import search_engine, column_stats
+            from core.search_cache import search_cache
+
+            if progress_callback is not None:
+                progress_callback('indices', 0, 1, "Atualizando índices de busca")
+            # Índices para os filtros de intervalo (semanas, número e data)
+            database.ensure_indexes(db_path, table_name, list(search_engine.RANGE_COLUMNS))
+            # Texto normalizado (sem acentos) para busca dentro do SQLite
+            database.rebuild_search_index(db_path, table_name)
+            # Larguras, nulos, distintos e mínimo/máximo por coluna (impressão, GUI e planejador)
+            column_stats.rebuild_column_stats(db_path, table_name)
+            # Nova versão dos dados: resultados de busca anteriores deixam de valer
+            import_id = database.bump_dataset_version(db_path)
+            search_cache.clear(f"importação {import_id}")
+            # Base tipada + texto pesquisável para a próxima inicialização (sem SELECT *)
+            snapshot.write_snapshot(db_path, table_name, import_id)
             _update_cache_after_import(successfully_processed_files, cache_file, docs_dir)
             logger.info("=== Processo de importação concluído com atualizações ===")
-            return True
+            return successfully_processed_files
         else:
             logger.info("Nenhum arquivo foi processado com sucesso.")
-            return False
+            return []
 
     except ImporterError:
         # Re-levanta exceções personalizadas
@@ -211,11 +274,87 @@ def run_importer_logic(
         raise ImporterError("Erro crítico no processo de importação.") from e
 
 
-def filter_dataframe(df: pd.DataFrame, search_terms: list) -> pd.DataFrame:
+def load_dataset(db_path: str, table_name: str) -> 'pd.DataFrame':
+    """
+    Carrega a base completa para a busca em memória (CLI e GUI).
+
+    Usa o snapshot colunar da última importação quando o id dele coincide com o do
+    banco (`armazenamento.snapshot`); caso contrário, lê a tabela e a tabela-sombra
+    pelo SQL. Em ambos os casos o DataFrame sai com o texto pesquisável, a versão dos
+    dados (cache de buscas) e o catálogo de estatísticas associados.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Tabela carregada.
+
+    Returns:
+        pd.DataFrame: A base (vazia se a tabela não puder ser lida).
+    """
+    from armazenamento import database, snapshot
+    from core import search_engine, column_stats
+
+    version = database.get_dataset_version(db_path)
+    loaded = snapshot.load_snapshot(db_path, table_name, version)
+    if loaded is not None:
+        df, search_index = loaded
+    else:
+        df = database.query_db(db_path, table_name)
+        # Reaproveita o texto normalizado gravado na importação (evita normalizar linha a linha)
+        search_index = database.load_search_haystack(db_path, table_name)
+    if search_index is not None:
+        columns, haystack = search_index
+        search_engine.attach_haystack(df, haystack, columns)
+    # Habilita o cache de resultados (filtros padrão, -r, -c) para esta versão dos dados
+    search_engine.tag_dataset_version(df, version)
+    # Larguras de exibição e estimativas de intervalo vêm do catálogo da importação
+    column_stats.load_and_attach(df, db_path, table_name)
+    return df
+
+def filter_view(df: 'pd.DataFrame', search_terms: list, candidates: Optional['np.ndarray'] = None) -> 'np.ndarray':
+    """
+    Filtra `df` e retorna as posicoes das linhas encontradas, sem copiar dados.
+
+    Usado por quem representa resultados como visoes (arrays de posicoes) sobre uma
+    base unica, como a GUI. Mesma sintaxe e mesmo cache de `filter_dataframe`.
+
+    Args:
+        df (pd.DataFrame): Base pesquisada.
+        search_terms (list): Uma lista de strings para buscar.
+        candidates (Optional[np.ndarray]): Posicoes de uma visao anterior a refinar (None = base inteira).
+
+    Returns:
+        np.ndarray: Posicoes (em `df`) das linhas que correspondem aos criterios.
+    """
+    from core import search_engine
+    from core.search_cache import search_cache, frame_fingerprint, positions_fingerprint
+
+    version = search_engine.dataset_version_of(df)
+    if version is None:
+        return search_engine.filter_positions(df, search_terms, candidates)
+    cache_key = (
+        version, frame_fingerprint(df),
+        None if candidates is None else positions_fingerprint(candidates),
+        search_engine.normalize_query(search_terms)
+    )
+    positions = search_cache.get(cache_key)
+    if positions is None:
+        positions = search_engine.filter_positions(df, search_terms, candidates)
+        search_cache.put(cache_key, positions)
+    return positions
+
+
+def filter_dataframe(df: 'pd.DataFrame', search_terms: list) -> 'pd.DataFrame':
     """
     Filtra um DataFrame com base em uma lista de termos de busca.
     Os termos sao procurados em todas as colunas de texto do DataFrame.
 
+    Cada item da lista e uma alternativa (OU). Dentro de um item, '&' exige
+    todos os termos (E) e '!' nega um termo (NAO). Ex: ['MEL3 & !ADM', 'IEE3'].
+    Ver `core.search_engine` para detalhes da avaliacao.
+
+    Se o DataFrame tiver versao de dados conhecida (`search_engine.tag_dataset_version`),
+    o resultado e guardado/consultado no cache LRU de `core.search_cache`.
+
     Args:
         df (pd.DataFrame): O DataFrame a ser filtrado.
         search_terms (list): Uma lista de strings para buscar.
@@ -227,20 +366,5 @@ def filter_dataframe(df: pd.DataFrame, search_terms: list) -> pd.DataFrame:
     if not search_terms or df.empty:
         return df
 
-    # Cria uma mascara booleana inicialmente falsa
-    mask = pd.Series([False] * len(df), dtype=bool)
-    
-    # Converte todas as colunas de objeto (strings) para string e torna minusculas
-    # para busca case-insensitive
-    str_df = df.select_dtypes(include=['object']).astype(str).apply(lambda x: x.str.lower())
-    
-    # Para cada termo de busca, verifica se ele esta presente em qualquer celula da linha
-    for term in search_terms:
-        term_lower = term.lower()
-        # Verifica em todas as colunas de string
-        term_mask = str_df.apply(lambda col: col.str.contains(term_lower, na=False)).any(axis=1)
-        # Combina com a mascara geral usando OR (|)
-        mask = mask | term_mask
-        
-    # Retorna o DataFrame filtrado
-    return df[mask]
\ No newline at end of file
+    from core import search_engine
+    return search_engine.take_rows(df, filter_view(df, search_terms))
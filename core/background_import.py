@@ -0,0 +1,143 @@
+# core/background_import.py 20250801 100000 (v1.1 - Espera na saida interrompivel por Ctrl+C)
+"""
+Importação de novos relatórios em segundo plano (`main.py --background-import`).
+
+A CLI abre na base atual e, assim que a carrega na memória, inicia a importação
+numa thread. Ao terminar, o prompt avisa quantos relatórios entraram e o usuário
+decide quando recarregar (-r). Enquanto a importação roda, as mensagens INFO/DEBUG
+dela são omitidas do console para não se misturarem ao prompt; avisos e erros
+continuam aparecendo.
+
+Toda saída da aplicação passa por `wait_or_abandon`, que avisa no console e espera
+a importação terminar, para que o banco e o cache de arquivos não fiquem pela metade.
+Um Ctrl+C durante essa espera abandona a importação (com aviso de que o banco pode
+ter ficado parcial); por isso a thread é daemon e não prende o interpretador.
+"""
+
+import logging
+import threading
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+THREAD_NAME = 'importacao-segundo-plano'
+
+# Importador: recebe force_import e retorna os relatórios importados
+Importer = Callable[..., List[str]]
+
+
+class _QuietThreadFilter(logging.Filter):
+    """Descarta os registros abaixo de WARNING emitidos pela thread da importação."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.threadName != THREAD_NAME or record.levelno >= logging.WARNING
+
+
+class BackgroundImport:
+    """
+    Executa a importação de novos relatórios numa thread e guarda o resultado.
+
+    Args:
+        force_import (bool): Reimporta todos os arquivos, ignorando o cache.
+        importer (Optional[Importer]): Função de importação (padrão:
+            `core.app_logic.import_new_reports`).
+    """
+
+    def __init__(self, force_import: bool = False, importer: Optional[Importer] = None):
+        self._force_import = force_import
+        self._importer = importer
+        self._thread: Optional[threading.Thread] = None
+        self._filter = _QuietThreadFilter()
+        self._acknowledged = False
+        self.imported: Optional[List[str]] = None  # None enquanto não termina
+        self.error: Optional[Exception] = None
+        self.abandoned = False
+
+    def start(self) -> bool:
+        """
+        Inicia a importação (uma única vez).
+
+        Returns:
+            bool: True se a thread foi iniciada agora, False se já tinha sido.
+        """
+        if self._thread is not None:
+            return False
+        for handler in logging.getLogger().handlers:
+            handler.addFilter(self._filter)
+        self._thread = threading.Thread(target=self._run, name=THREAD_NAME, daemon=True)
+        self._thread.start()
+        logger.debug("Importação em segundo plano iniciada.")
+        return True
+
+    def _run(self):
+        try:
+            importer = self._importer
+            if importer is None:
+                from core.app_logic import import_new_reports as importer
+            self.imported = list(importer(force_import=self._force_import))
+        except Exception as e:
+            logger.error(f"Erro na importação em segundo plano: {e}", exc_info=True)
+            self.error = e
+            self.imported = []
+        finally:
+            for handler in logging.getLogger().handlers:
+                handler.removeFilter(self._filter)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a importação terminar.
+
+        Returns:
+            bool: True se ela terminou (ou nem foi iniciada), False se o tempo acabou.
+        """
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def wait_or_abandon(self):
+        """
+        Espera a importação terminar, avisando no console (usado em toda saída e recarga).
+
+        Raises:
+            KeyboardInterrupt: Se o usuário interromper a espera; a importação é então
+                abandonada e as chamadas seguintes retornam sem esperar.
+        """
+        if self.abandoned or not self.is_running():
+            return
+        print("Aguardando a importação em segundo plano terminar... (Ctrl+C para sair sem esperar)")
+        try:
+            self.wait()
+        except KeyboardInterrupt:
+            self.abandoned = True
+            logger.warning(
+                "Importação em segundo plano interrompida: o banco pode ter ficado parcial. "
+                "Os relatórios não marcados no cache serão importados de novo na próxima inicialização."
+            )
+            raise
+
+    def acknowledge(self):
+        """Marca o resultado como visto (a base em uso já inclui os relatórios importados)."""
+        if self._thread is not None and not self.is_running():
+            self._acknowledged = True
+
+    def notice(self) -> Optional[str]:
+        """
+        Aviso para o prompt quando a importação termina, até ser reconhecido.
+
+        Returns:
+            Optional[str]: O aviso, ou None se não há nada a avisar.
+        """
+        if self._thread is None or self.is_running() or self._acknowledged:
+            return None
+        if self.error is not None:
+            return f"Falha na importação em segundo plano: {self.error} (detalhes no log)"
+        count = len(self.imported or [])
+        if count == 0:
+            return None
+        if count == 1:
+            return "1 novo relatório importado — digite -r para atualizar"
+        return f"{count} novos relatórios importados — digite -r para atualizar"
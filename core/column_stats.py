@@ -0,0 +1,164 @@
+# core/column_stats.py 20250730 090000 (v1.0 - Catalogo de estatisticas por coluna)
+"""
+Catálogo de estatísticas por coluna, calculado pelo importador e gravado no banco.
+
+Para cada coluna da tabela: largura de exibição (p95 e máxima), fração de nulos,
+quantidade de valores distintos e mínimo/máximo. Com o catálogo:
+
+- o impressor de tabelas (`interface.table_printer`) e a GUI definem as larguras das
+  colunas sem examinar os dados a cada exibição;
+- o planejador de consultas (`core.search_engine.estimate_selectivity`) estima os
+  filtros de intervalo pelo mínimo/máximo, sem construir o índice ordenado só para isso.
+
+As estatísticas valem para a tabela inteira; subconjuntos (resultados de busca) herdam
+as da base, o que basta para larguras e estimativas.
+"""
+
+import logging
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from armazenamento import database
+from core.search_engine import DATE_RANGE_COLUMNS, RANGE_COLUMNS, _to_sort_keys, attach_column_stats
+
+logger = logging.getLogger(__name__)
+
+# Percentil usado como largura "típica" (ignora os poucos textos muito longos)
+WIDTH_QUANTILE = 0.95
+
+
+class ColumnStats(NamedTuple):
+    """Estatísticas de uma coluna (uma linha da tabela `<tabela>_estatisticas`, na mesma ordem)."""
+    column: str
+    rows: int
+    null_fraction: float
+    distinct: int
+    width_p95: int
+    width_max: int
+    min_value: Optional[str] = None  # Mínimo/máximo como texto (para exibição)
+    max_value: Optional[str] = None
+    min_key: Optional[float] = None  # Mínimo/máximo como chave de intervalo (colunas numéricas/datas)
+    max_key: Optional[float] = None
+
+    def range_fraction(
+        self,
+        low: Optional[float],
+        high: Optional[float],
+        low_inclusive: bool = True,
+        high_inclusive: bool = True
+    ) -> Optional[float]:
+        """
+        Fração estimada de linhas com valor em [low, high], supondo distribuição uniforme
+        entre o mínimo e o máximo. None se a coluna não tiver chaves de intervalo.
+        """
+        if self.min_key is None or self.max_key is None:
+            return None
+        non_null = 1.0 - self.null_fraction
+        low = self.min_key if low is None else low
+        high = self.max_key if high is None else high
+        if high < low or high < self.min_key or low > self.max_key:
+            return 0.0
+        if high == low and not (low_inclusive and high_inclusive):
+            return 0.0
+        span = self.max_key - self.min_key
+        if span <= 0:
+            return non_null
+        overlap = min(high, self.max_key) - max(low, self.min_key)
+        # Intervalos de um único valor ainda casam com ~1 valor distinto
+        fraction = max(overlap / span, 1.0 / max(self.distinct, 1))
+        return non_null * min(fraction, 1.0)
+
+
+def _display_texts(series: pd.Series) -> pd.Series:
+    """Textos de exibição dos valores não nulos (inteiros em float sem casas decimais)."""
+    values = series.dropna()
+    if pd.api.types.is_float_dtype(values) and len(values) and (values % 1 == 0).all():
+        values = values.astype('int64')
+    return values.astype(str)
+
+
+def compute_column_stats(df: pd.DataFrame) -> Dict[str, ColumnStats]:
+    """
+    Calcula as estatísticas de todas as colunas de `df`.
+
+    Args:
+        df (pd.DataFrame): Tabela completa.
+
+    Returns:
+        Dict[str, ColumnStats]: Estatísticas por nome de coluna.
+    """
+    stats = {}
+    total = len(df)
+    for col in df.columns:
+        series = df[col]
+        texts = _display_texts(series)
+        widths = texts.str.len()
+        min_value = max_value = min_key = max_key = None
+        if col in RANGE_COLUMNS:
+            keys = _to_sort_keys(series, col in DATE_RANGE_COLUMNS)
+            keys = keys[~np.isnan(keys)]
+            if keys.size:
+                min_key, max_key = float(keys.min()), float(keys.max())
+        if len(texts):
+            try:
+                valid = series.dropna()
+                min_value, max_value = str(valid.min()), str(valid.max())
+            except TypeError:  # Tipos misturados: compara pelo texto
+                min_value, max_value = texts.min(), texts.max()
+        stats[col] = ColumnStats(
+            column=col,
+            rows=total,
+            null_fraction=float(1.0 - len(texts) / total) if total else 0.0,
+            distinct=int(series.nunique(dropna=True)),
+            width_p95=int(widths.quantile(WIDTH_QUANTILE, interpolation='lower')) if len(widths) else 0,
+            width_max=int(widths.max()) if len(widths) else 0,
+            min_value=min_value,
+            max_value=max_value,
+            min_key=min_key,
+            max_key=max_key,
+        )
+    return stats
+
+
+def rebuild_column_stats(db_path: str, table_name: str) -> bool:
+    """
+    Recalcula o catálogo de estatísticas da tabela e o grava no banco (chamado após a importação).
+
+    Returns:
+        bool: True se o catálogo foi gravado.
+    """
+    df = database.query_db(db_path, table_name)
+    if df.empty:
+        logger.warning(f"Tabela '{table_name}' vazia. Catálogo de estatísticas não criado.")
+        return False
+    stats = compute_column_stats(df)
+    return database.save_column_stats(db_path, table_name, [tuple(s) for s in stats.values()])
+
+
+def load_column_stats(db_path: str, table_name: str) -> Dict[str, ColumnStats]:
+    """Lê o catálogo de estatísticas da tabela ({} se o banco ainda não tiver catálogo)."""
+    rows = database.load_column_stats(db_path, table_name) or []
+    return {row[0]: ColumnStats(*row) for row in rows}
+
+
+def load_and_attach(df: pd.DataFrame, db_path: str, table_name: str) -> Dict[str, ColumnStats]:
+    """Lê o catálogo do banco e o associa a `df` (ver `core.search_engine.attach_column_stats`)."""
+    stats = load_column_stats(db_path, table_name)
+    if stats:
+        attach_column_stats(df, stats)
+    return stats
+
+
+def display_width(stats: Optional[ColumnStats], header: str, max_width: int, min_width: int = 0) -> Optional[int]:
+    """
+    Largura de exibição (em caracteres) de uma coluna a partir do catálogo.
+
+    Usa o p95 das larguras dos valores, nunca menor que o cabeçalho nem que `min_width`,
+    limitado a `max_width`. None se não houver estatísticas da coluna.
+    """
+    if stats is None:
+        return None
+    return min(max(len(str(header)), stats.width_p95, min_width), max_width)
+
@@ -1,15 +1,31 @@
-# core/config_manager.py 20250725 163000 (v2.1 - Melhorias de Erro, Logging)
+# core/config_manager.py 20250802 100000 (v2.4 - Gravacao atomica preserva as permissoes do arquivo)
 """
 Gerenciador de configurações da aplicação.
 
 Responsável por carregar, salvar e garantir a existência do arquivo settings.json.
+
+As leituras passam por uma instância única de `SettingsService` (`settings_service`),
+compartilhada pela CLI, pela GUI e pelo exportador:
+
+- Cada arquivo JSON lido fica em cache na memória e só é lido de novo quando a sua
+  assinatura (inode, data de modificação e tamanho) muda — uma edição manual do
+  arquivo é percebida na próxima leitura, sem reler o arquivo a cada comando.
+- A gravação é atômica: o JSON é escrito em um arquivo temporário no mesmo diretório
+  e renomeado sobre o original (`os.replace`), então um leitor nunca vê um arquivo pela metade.
+- Dentro de `with settings_service.batch():` as gravações são adiadas e feitas uma
+  única vez ao sair do bloco (ex: vários ajustes seguidos no menu de configurações).
 """
 
+import copy
 import json
 import os
 import shutil
+import stat
 import logging
-from typing import Dict, Any
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -20,47 +36,204 @@ USER_SETTINGS_FILE = os.path.join(CONFIG_DIR, 'settings.json')
 DISPLAY_MAPPINGS_FILE = os.path.join(CONFIG_DIR, 'display_mappings.json')
 COLUMN_MAPPINGS_FILE = os.path.join(CONFIG_DIR, 'column_mappings.json')
 
+# Assinatura de um arquivo para o cache: (inode, mtime em ns, tamanho)
+FileSignature = Tuple[int, int, int]
+
+# umask do processo, lida uma vez (os.umask só lê trocando o valor, o que não é seguro entre threads)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_signature(path: str) -> Optional[FileSignature]:
+    """Assinatura atual do arquivo, ou None se ele não existir."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_ino, info.st_mtime_ns, info.st_size
+
+
+def _file_mode(path: str) -> int:
+    """Permissões de `path`, ou as de um arquivo novo (0o666 menos a umask) se ele não existir."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def write_json_atomic(path: str, data: Any):
+    """
+    Grava `data` como JSON em `path` de forma atômica (arquivo temporário + rename).
+
+    O arquivo temporário (criado pelo mkstemp com modo 0600) recebe as permissões do
+    original, ou as de um arquivo novo, antes de substituí-lo.
+
+    Raises:
+        OSError: Se o arquivo não puder ser gravado (o original fica intacto).
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, _file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SettingsService:
+    """
+    Configurações do usuário e demais arquivos JSON de configuração, com cache em memória.
+
+    `get()` e `load_json()` devolvem cópias do que está em cache: para alterar uma
+    configuração, modifique a cópia e chame `save()`. Assim uma alteração cuja gravação
+    falhou nunca fica valendo só na memória (nem altera as configurações padrão).
+
+    Args:
+        settings_file (str): Arquivo de configurações do usuário.
+        default_file (str): Arquivo lido quando o do usuário ainda não existe.
+    """
+
+    def __init__(self, settings_file: str = USER_SETTINGS_FILE, default_file: str = DEFAULT_SETTINGS_FILE):
+        self.settings_file = settings_file
+        self.default_file = default_file
+        self._cache: Dict[str, Tuple[FileSignature, Any]] = {}
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._pending: Optional[Dict[str, Any]] = None  # Configurações aguardando o fim do lote
+
+    def load_json(self, path: str, default: Any = None) -> Any:
+        """
+        Lê um arquivo JSON pelo cache, relendo-o apenas se a assinatura do arquivo mudou.
+
+        Args:
+            path (str): Caminho do arquivo.
+            default (Any): Valor retornado se o arquivo não existir ou for inválido.
+                Se None, os erros são propagados.
+        """
+        with self._lock:
+            signature = _file_signature(path)
+            cached = self._cache.get(path)
+            if cached is not None and signature is not None and cached[0] == signature:
+                return copy.deepcopy(cached[1])
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError) as e:
+                self._cache.pop(path, None)
+                if default is None:
+                    raise
+                logger.warning(f"Não foi possível ler '{path}': {e}. Usando valor padrão.")
+                return default
+            self._cache[path] = (signature, data)
+            logger.debug(f"Configuração lida de '{path}'.")
+            return copy.deepcopy(data)
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Configurações do usuário (ou as padrões, se o arquivo do usuário não existir).
+
+        Raises:
+            FileNotFoundError: Se nenhum dos dois arquivos existir.
+            json.JSONDecodeError: Se o arquivo for um JSON inválido.
+        """
+        with self._lock:
+            if self._pending is not None:
+                return copy.deepcopy(self._pending)
+            path = self.settings_file
+            if not os.path.exists(path):
+                logger.debug(f"Arquivo de configuração do usuário '{path}' não encontrado. Usando padrões.")
+                path = self.default_file
+            try:
+                return self.load_json(path)
+            except FileNotFoundError:
+                logger.critical(f"Arquivo de configuração '{path}' não encontrado.")
+                raise
+            except json.JSONDecodeError as e:
+                logger.error(f"Erro ao decodificar JSON em '{path}': {e}")
+                raise
+
+    def save(self, settings: Dict[str, Any]) -> bool:
+        """
+        Salva as configurações do usuário (adiado até o fim do lote, dentro de `batch()`).
+
+        Returns:
+            bool: True se o arquivo foi gravado agora; False se a gravação ficou para o fim do lote.
+        """
+        with self._lock:
+            if self._batch_depth:
+                self._pending = copy.deepcopy(settings)
+                return False
+            self._write(settings)
+            return True
+
+    def _write(self, settings: Dict[str, Any]):
+        try:
+            write_json_atomic(self.settings_file, settings)
+        except OSError as e:
+            logger.error(f"Erro ao salvar configurações em '{self.settings_file}': {e}")
+            # A próxima leitura volta ao disco: nada do que não foi gravado fica valendo
+            self.invalidate()
+            raise
+        # O arquivo recém-gravado já está em memória: a próxima leitura não o relê
+        self._cache[self.settings_file] = (_file_signature(self.settings_file), copy.deepcopy(settings))
+        logger.info(f"Configurações salvas em '{self.settings_file}'.")
+
+    @contextmanager
+    def batch(self):
+        """Adia as gravações de `save()` e grava uma única vez ao sair do bloco mais externo."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._pending is not None:
+                    pending, self._pending = self._pending, None
+                    self._write(pending)
+
+    def has_pending_changes(self) -> bool:
+        """True se há configurações salvas dentro de um lote e ainda não gravadas."""
+        return self._pending is not None
+
+    def invalidate(self):
+        """Descarta o cache: a próxima leitura de cada arquivo vai ao disco."""
+        with self._lock:
+            self._cache.clear()
+
+
+# Instância única compartilhada pela CLI, pela GUI e pelo exportador
+settings_service = SettingsService()
+
+
 def load_settings() -> Dict[str, Any]:
     """
     Carrega as configurações do usuário. Se não existir, carrega as padrões.
-    
+
+    Usa o cache de `settings_service`: o arquivo só é lido de novo se tiver mudado.
+
     Returns:
         Dict[str, Any]: Um dicionário com as configurações.
     """
-    settings_path = USER_SETTINGS_FILE
-    if not os.path.exists(settings_path):
-        logger.info(f"Arquivo de configuração do usuário '{settings_path}' não encontrado. Carregando padrões.")
-        settings_path = DEFAULT_SETTINGS_FILE
-
-    try:
-        with open(settings_path, 'r', encoding='utf-8') as f:
-            settings = json.load(f)
-        logger.debug(f"Configurações carregadas de '{settings_path}'.")
-        return settings
-    except FileNotFoundError:
-        logger.critical(f"Arquivo de configuração '{settings_path}' não encontrado.")
-        # Retorna um dicionário vazio ou padrão mínimo como último recurso?
-        # Ou lança uma exceção? Vamos lançar para que o chamador decida.
-        raise
-    except json.JSONDecodeError as e:
-        logger.error(f"Erro ao decodificar JSON em '{settings_path}': {e}")
-        raise
+    return settings_service.get()
 
 def save_settings(settings: Dict[str, Any]):
     """
-    Salva as configurações do usuário.
+    Salva as configurações do usuário (gravação atômica, ver `SettingsService.save`).
     
     Args:
         settings (Dict[str, Any]): O dicionário de configurações a ser salvo.
     """
-    try:
-        os.makedirs(os.path.dirname(USER_SETTINGS_FILE), exist_ok=True)
-        with open(USER_SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=4, ensure_ascii=False)
-        logger.info(f"Configurações salvas em '{USER_SETTINGS_FILE}'.")
-    except IOError as e:
-        logger.error(f"Erro ao salvar configurações em '{USER_SETTINGS_FILE}': {e}")
-        raise
+    settings_service.save(settings)
 
 def ensure_default_settings():
     """
@@ -0,0 +1,205 @@
+# core/fuzzy_index.py 20250802 130000 (v1.1 - Valores distintos com NUL nao se confundem)
+"""
+Índice para busca aproximada (`~termo`) em colunas com muitos erros de digitação.
+
+O índice trabalha sobre os valores *distintos* das colunas (e não sobre cada linha):
+    1. Cada valor distinto é normalizado (`fold_text`) e quebrado em palavras.
+    2. Cada palavra distinta é indexada por seus trigramas.
+    3. Na consulta, os trigramas da palavra buscada geram candidatas (lema dos q-gramas),
+       que passam por uma distância de edição limitada (Damerau-Levenshtein restrita:
+       uma troca de letras vizinhas, como 'bomab', custa 1).
+    4. As distâncias das palavras são propagadas para os valores e, pelos códigos
+       de cada linha, para as linhas.
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.text_folding import fold_text
+
+try:
+    # Implementação em C, opcional; sem ela usamos a versão em Python puro abaixo
+    from rapidfuzz.distance import OSA as _rapidfuzz_osa
+except ImportError:
+    _rapidfuzz_osa = None
+
+logger = logging.getLogger(__name__)
+
+# Colunas pesquisadas pelo modo aproximado
+FUZZY_COLUMNS = ('equipamento', 'descricao_localizacao')
+NGRAM_SIZE = 3
+# Marcador de borda: favorece candidatas com o mesmo início/fim de palavra
+_PAD = '$'
+_WORD_PATTERN = re.compile(r'\w+')
+# Quantidade de consultas recentes guardadas por índice
+_MEMO_SIZE = 32
+
+
+def max_distance_for(word: str) -> int:
+    """Distância de edição tolerada para uma palavra, proporcional ao seu tamanho."""
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 4:
+        return 1
+    if len(word) <= 8:
+        return 2
+    return 3
+
+
+def _ngrams(word: str) -> List[str]:
+    """Trigramas da palavra com marcadores de borda ('bomba' -> '$bo', 'bom', ..., 'ba$')."""
+    padded = f"{_PAD}{word}{_PAD}"
+    return [padded[i:i + NGRAM_SIZE] for i in range(max(1, len(padded) - NGRAM_SIZE + 1))]
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Distância de edição (Damerau-Levenshtein restrita) entre `a` e `b`, interrompida
+    ao ultrapassar `max_distance`.
+
+    Returns:
+        Optional[int]: A distância, ou None se for maior que `max_distance`.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if _rapidfuzz_osa is not None:
+        distance = _rapidfuzz_osa.distance(a, b, score_cutoff=max_distance)
+        return distance if distance <= max_distance else None
+
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if before_previous and i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], before_previous[j - 2] + 1)  # Transposição
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return None
+        before_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def _replace_nul(series: pd.Series) -> pd.Series:
+    """
+    Troca NUL por espaço nos textos de `series` (os demais valores ficam como estão).
+
+    A tabela hash do pandas corta textos no primeiro NUL, então pd.factorize juntaria
+    'a\\x00b' e 'a' num só valor. Para as palavras do índice, NUL e espaço são
+    o mesmo separador.
+    """
+    if series.dtype != object and not isinstance(series.dtype, pd.StringDtype):
+        return series
+    try:
+        replaced = series.str.replace('\x00', ' ', regex=False)
+    except AttributeError:  # Coluna sem textos
+        return series
+    return replaced.where(replaced.notna(), series)
+
+
+class FuzzyIndex:
+    """Índice de n-gramas sobre as palavras dos valores distintos de algumas colunas."""
+
+    def __init__(self, df: pd.DataFrame, columns: Sequence[str] = FUZZY_COLUMNS):
+        self.columns = [col for col in columns if col in df.columns]
+        self.size = len(df)
+
+        # Valores distintos de todas as colunas num único espaço de ids
+        self.row_codes: List[np.ndarray] = []
+        values: List[str] = []
+        for col in self.columns:
+            codes, uniques = pd.factorize(_replace_nul(df[col]), use_na_sentinel=True)
+            codes = codes.astype(np.int64)
+            codes[codes >= 0] += len(values)
+            self.row_codes.append(codes)
+            values.extend(fold_text(str(value)) for value in uniques)
+        self.value_count = len(values)
+
+        # Palavras distintas -> valores que as contêm
+        token_ids: Dict[str, int] = {}
+        token_values: List[List[int]] = []
+        for value_id, value in enumerate(values):
+            for token in set(_WORD_PATTERN.findall(value)):
+                token_id = token_ids.setdefault(token, len(token_ids))
+                if token_id == len(token_values):
+                    token_values.append([])
+                token_values[token_id].append(value_id)
+        self.tokens = list(token_ids)
+        self.token_values = [np.asarray(ids, dtype=np.int64) for ids in token_values]
+
+        # Trigramas -> palavras que os contêm
+        postings: Dict[str, List[int]] = {}
+        for token_id, token in enumerate(self.tokens):
+            for gram in set(_ngrams(token)):
+                postings.setdefault(gram, []).append(token_id)
+        self.postings = {gram: np.asarray(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+        self._memo: Dict[str, np.ndarray] = {}
+        logger.debug(
+            f"Índice aproximado: {len(self.tokens)} palavras em {self.value_count} valores "
+            f"distintos de {self.columns}."
+        )
+
+    def subset(self, positions: np.ndarray) -> 'FuzzyIndex':
+        """Índice equivalente para as linhas `positions` (reaproveita vocabulário e n-gramas)."""
+        clone = object.__new__(FuzzyIndex)
+        clone.__dict__.update(self.__dict__)
+        clone.row_codes = [codes[positions] for codes in self.row_codes]
+        clone.size = len(positions)
+        clone._memo = {}
+        return clone
+
+    def _word_distances(self, word: str) -> Dict[int, int]:
+        """Palavras do vocabulário próximas de `word`: {token_id: distância}."""
+        max_distance = max_distance_for(word)
+        grams = _ngrams(word)
+        hits = [self.postings[gram] for gram in set(grams) if gram in self.postings]
+        if not hits:
+            return {}
+        counts = np.bincount(np.concatenate(hits), minlength=len(self.tokens))
+        # Lema dos q-gramas: cada edição destrói no máximo NGRAM_SIZE trigramas
+        # (NGRAM_SIZE + 1 para uma transposição de letras vizinhas)
+        threshold = max(1, len(set(grams)) - (NGRAM_SIZE + 1) * max_distance)
+        distances = {}
+        for token_id in np.flatnonzero(counts >= threshold):
+            distance = bounded_edit_distance(word, self.tokens[token_id], max_distance)
+            if distance is not None:
+                distances[int(token_id)] = distance
+        return distances
+
+    def row_distances(self, term: str) -> np.ndarray:
+        """
+        Distância aproximada de cada linha ao termo (soma das melhores distâncias de cada palavra).
+
+        Args:
+            term (str): Termo buscado (uma ou mais palavras; todas precisam casar).
+
+        Returns:
+            np.ndarray: float64 por linha; `np.inf` para linhas que não casam.
+        """
+        term = fold_text(term)
+        if term in self._memo:
+            return self._memo[term]
+
+        words = _WORD_PATTERN.findall(term)
+        total = np.zeros(self.size) if words else np.full(self.size, np.inf)
+        for word in words:
+            value_distance = np.full(self.value_count + 1, np.inf)  # último = valores nulos
+            for token_id, distance in self._word_distances(word).items():
+                value_ids = self.token_values[token_id]
+                value_distance[value_ids] = np.minimum(value_distance[value_ids], distance)
+            row_distance = np.full(self.size, np.inf)
+            for codes in self.row_codes:
+                row_distance = np.minimum(row_distance, value_distance[codes])  # -1 -> nulo
+            total += row_distance
+
+        if len(self._memo) >= _MEMO_SIZE:
+            self._memo.pop(next(iter(self._memo)))
+        self._memo[term] = total
+        return total
@@ -0,0 +1,127 @@
+# core/ranking.py 20250728 180000 (v1.0 - Ranking de relevancia com top-k)
+"""
+Ordenação por relevância dos resultados de uma busca.
+
+A pontuação de cada linha soma, para cada termo positivo da consulta:
+    - o peso do campo onde o termo aparece (`FIELD_WEIGHTS`: Nº SSA > equipamento >
+      descrição), multiplicado por 1 + log(frequência do termo no campo);
+    - `OTHER_FIELDS_WEIGHT` se o termo aparece em qualquer coluna de texto;
+    - para termos aproximados ('~'), o peso do equipamento dividido por 1 + distância.
+Por fim, soma um bônus de recência da `data_cadastro` (meia-vida de `RECENCY_HALF_LIFE_DAYS`,
+contada a partir da data mais recente do conjunto).
+
+Apenas as k melhores linhas são ordenadas (np.argpartition), e não o resultado inteiro.
+"""
+
+import logging
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from utils.text_folding import fold_text
+from core.search_engine import (
+    Predicate, RegexPredicate, FuzzyPredicate, HAYSTACK_SEPARATOR,
+    parse_query, compile_pattern, get_haystack, get_fuzzy_index, _match
+)
+
+logger = logging.getLogger(__name__)
+
+# Peso de um termo encontrado em cada campo
+FIELD_WEIGHTS = {
+    'numero_ssa': 8.0,
+    'equipamento': 4.0,
+    'descricao_ssa': 2.0,
+}
+OTHER_FIELDS_WEIGHT = 1.0
+RECENCY_WEIGHT = 1.0
+RECENCY_HALF_LIFE_DAYS = 90.0
+DEFAULT_TOP_K = 50
+
+
+def _term_counts(texts: pd.Series, predicate) -> np.ndarray:
+    """Quantidade de ocorrências do termo em cada texto (já normalizado)."""
+    if isinstance(predicate, RegexPredicate):
+        findall = compile_pattern(predicate.value).findall
+        return np.fromiter(
+            (len(findall(f"{HAYSTACK_SEPARATOR}{text}{HAYSTACK_SEPARATOR}")) for text in texts),
+            dtype=np.float64, count=len(texts)
+        )
+    return np.fromiter((text.count(predicate.value) for text in texts), dtype=np.float64, count=len(texts))
+
+
+def _recency_scores(df: pd.DataFrame) -> np.ndarray:
+    """Bônus de recência (0 a RECENCY_WEIGHT) pela `data_cadastro`; 0 para datas ausentes."""
+    if 'data_cadastro' not in df.columns:
+        return np.zeros(len(df))
+    dates = pd.to_datetime(df['data_cadastro'], errors='coerce')
+    if dates.notna().sum() == 0:
+        return np.zeros(len(df))
+    age_days = ((dates.max() - dates).dt.total_seconds() / 86400.0).to_numpy(dtype=np.float64)
+    scores = RECENCY_WEIGHT * np.power(0.5, age_days / RECENCY_HALF_LIFE_DAYS)
+    return np.nan_to_num(scores, nan=0.0)
+
+
+def score_rows(df: pd.DataFrame, search_terms: List[str]) -> np.ndarray:
+    """
+    Calcula a pontuação de relevância de cada linha de `df` para a consulta.
+
+    Args:
+        df (pd.DataFrame): Linhas a pontuar (normalmente o resultado da busca).
+        search_terms (List[str]): Termos da consulta (mesma sintaxe de `filter_dataframe`).
+
+    Returns:
+        np.ndarray: Pontuação (float64) por linha de `df`.
+
+    Raises:
+        QueryError: Se a consulta for inválida.
+    """
+    scores = _recency_scores(df)
+    terms = [
+        p for clause in parse_query(search_terms) for p in clause
+        if not p.negated and isinstance(p, (Predicate, RegexPredicate, FuzzyPredicate))
+    ]
+    if not terms or df.empty:
+        return scores
+
+    # Texto normalizado dos campos pesados, calculado uma vez para todos os termos
+    fields = {
+        col: df[col].fillna('').astype(str).map(fold_text)
+        for col in FIELD_WEIGHTS if col in df.columns
+    }
+    haystack = get_haystack(df)
+    for term in terms:
+        if isinstance(term, FuzzyPredicate):
+            distances = get_fuzzy_index(df).row_distances(term.value)
+            scores += FIELD_WEIGHTS['equipamento'] / (1.0 + distances)  # inf -> 0
+            continue
+        for col, texts in fields.items():
+            counts = _term_counts(texts, term)
+            found = counts > 0
+            scores[found] += FIELD_WEIGHTS[col] * (1.0 + np.log(counts[found]))
+        scores += OTHER_FIELDS_WEIGHT * _match(haystack, term)
+    return scores
+
+
+def rank_positions(df: pd.DataFrame, search_terms: List[str], k: int = DEFAULT_TOP_K) -> np.ndarray:
+    """
+    Retorna as posições das k linhas mais relevantes, da maior para a menor pontuação.
+
+    Empates mantêm a ordem original das linhas.
+
+    Args:
+        df (pd.DataFrame): Linhas a ordenar.
+        search_terms (List[str]): Termos da consulta.
+        k (int): Quantidade de linhas retornadas.
+
+    Returns:
+        np.ndarray: Até k posições (0-based) de `df`.
+    """
+    scores = score_rows(df, search_terms)
+    k = max(0, min(k, len(scores)))
+    if k == 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    order = np.lexsort((top, -scores[top]))
+    logger.debug(f"Ranking: {k} de {len(scores)} linhas para {search_terms}.")
+    return top[order]
@@ -0,0 +1,118 @@
+# core/search_cache.py 20250801 130000 (v1.2 - Impressao digital calculada uma vez por DataFrame)
+"""
+Cache LRU de resultados de busca, posicionado na frente de `core.search_engine`.
+
+A chave combina a versão do conjunto de dados (id da última importação), uma
+impressão digital do DataFrame pesquisado e a consulta normalizada. O valor é o
+array de posições das linhas encontradas, e não uma cópia do DataFrame.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.search_engine import _frame_artifacts
+
+logger = logging.getLogger(__name__)
+
+# Limites padrão: quantidade de consultas e total de posições guardadas (~8 bytes cada)
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_POSITIONS = 4_000_000
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Impressão digital do DataFrame pesquisado (tamanho, colunas e rótulos das linhas, em ordem).
+
+    Dois DataFrames com a mesma impressão digital e a mesma versão de dados têm as mesmas
+    linhas na mesma ordem, então o mesmo resultado de busca vale para ambos.
+
+    O hash do índice custa O(n): é calculado uma vez e guardado nos artefatos de `df`
+    (ao lado da versão dos dados), e refeito só se o tamanho, as colunas ou o objeto
+    do índice mudarem.
+    """
+    artifacts = _frame_artifacts(df)
+    guard = (len(df), tuple(df.columns), id(df.index))
+    cached = artifacts.get('fingerprint')
+    if cached is not None and cached[0] == guard:
+        return cached[1]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(df)).encode())
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8', 'replace'))
+    digest.update(pd.util.hash_pandas_object(df.index, index=False).to_numpy().tobytes())
+    artifacts['fingerprint'] = (guard, digest.hexdigest())
+    return artifacts['fingerprint'][1]
+
+
+def positions_fingerprint(positions: np.ndarray) -> str:
+    """Impressão digital de uma visão (array de posições), para buscas restritas a ela."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(positions, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class SearchResultCache:
+    """Cache LRU thread-safe de posições de resultados, com contadores de acerto/falha."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_positions: int = DEFAULT_MAX_POSITIONS):
+        self.max_entries = max_entries
+        self.max_positions = max_positions
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, np.ndarray]' = OrderedDict()
+        self._total_positions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """Retorna as posições guardadas para `key` (ou None), atualizando a ordem LRU."""
+        with self._lock:
+            positions = self._entries.get(key)
+            if positions is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            logger.debug(
+                f"Cache de busca: {'acerto' if positions is not None else 'falha'} "
+                f"(acertos={self.hits}, falhas={self.misses}, entradas={len(self._entries)})"
+            )
+            return positions
+
+    def put(self, key: Hashable, positions: np.ndarray):
+        """Guarda as posições de um resultado, descartando os menos usados se necessário."""
+        if len(positions) > self.max_positions:
+            return  # Resultado grande demais para valer a pena guardar
+        positions = np.array(positions, copy=True)
+        positions.setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                self._total_positions -= len(self._entries.pop(key))
+            self._entries[key] = positions
+            self._total_positions += len(positions)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._total_positions > self.max_positions
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_positions -= len(evicted)
+
+    def clear(self, reason: str = ""):
+        """Esvazia o cache (ex: após uma importação), registrando os contadores acumulados."""
+        with self._lock:
+            logger.info(
+                f"Cache de busca invalidado{f' ({reason})' if reason else ''}. "
+                f"Acertos={self.hits}, falhas={self.misses}, entradas descartadas={len(self._entries)}."
+            )
+            self._entries.clear()
+            self._total_positions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Instância única compartilhada pela CLI e pela GUI
+search_cache = SearchResultCache()
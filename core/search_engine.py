@@ -0,0 +1,891 @@
+# core/search_engine.py 20250802 150000 (v1.14 - Cabecalhos de grupo '(?...)' preservados nos padroes re:)
+"""
+Motor de busca em memória usado por `filter_dataframe`.
+
+Sintaxe da consulta (cada item da lista corresponde a um trecho separado por vírgula):
+    - Vírgula separa alternativas (OU): 'ADM, MEL3'
+    - '&' combina termos obrigatórios (E): 'cisco & painel'
+    - '!' no início de um termo nega o termo (NAO): 'MEL3 & !ADM'
+    - Intervalos em colunas numéricas/data (ver `RANGE_COLUMNS`):
+        'semana_cadastro:202518..202522', 'numero_ssa>=2025000',
+        'data_cadastro:01/06/2025..30/06/2025', 'data_cadastro:30d' (últimos 30 dias)
+    - '~' no início de um termo ativa a busca aproximada (tolerante a erros de digitação)
+      em equipamento/descrição da localização: '~bomab recalqe'. Quando a consulta é uma
+      única cláusula, o resultado é ordenado pela distância de edição.
+    - 're:' no início de um termo ativa expressões regulares: 're:^mel[0-9]',
+      're:bomba.*vazamento'. '^' e '$' ancoram no início/fim de cada coluna. Como a
+      vírgula e o '&' separam termos, use '|' para alternativas dentro do padrão.
+      Sem 're:', o termo é sempre literal ('a.b' procura o texto 'a.b').
+
+A busca ignora acentos e maiúsculas: 'execucao' encontra 'Execução'. O texto
+pesquisável de cada linha é normalizado uma única vez por DataFrame (ou lido pronto da
+tabela-sombra `<tabela>_busca`, ver `armazenamento.database.rebuild_search_index`).
+
+Os termos de uma cláusula E são avaliados do mais seletivo para o menos seletivo,
+sempre sobre o conjunto (cada vez menor) de linhas candidatas. As cláusulas OU são
+avaliadas apenas sobre as linhas que ainda não casaram com nenhuma cláusula anterior.
+
+Modo paralelo (ver `configure_parallel`): em conjuntos grandes, os termos de texto são
+avaliados em blocos de linhas por um pool de threads e os resultados são reunidos na
+ordem original. Com `pyarrow` instalado o texto pesquisável usa o tipo string do Arrow,
+cujas funções de busca liberam o GIL; sem ele o modo automático fica desligado.
+"""
+
+import os
+import re
+import logging
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.text_folding import fold_text, strip_accents
+from core.fuzzy_index import FuzzyIndex
+
+logger = logging.getLogger(__name__)
+
+# Operadores da linguagem de consulta
+AND_OPERATOR = '&'
+NOT_PREFIX = '!'
+FUZZY_PREFIX = '~'
+REGEX_PREFIX = 're:'
+
+# Separador usado ao concatenar as colunas de texto de uma linha.
+# Um caractere de controle evita que um termo case "atravessando" duas colunas.
+HAYSTACK_SEPARATOR = '\x1f'
+
+# Colunas que aceitam predicados de intervalo, respondidos por índices ordenados
+NUMERIC_RANGE_COLUMNS = ('semana_cadastro', 'semana_programada', 'semana_executada', 'numero_ssa')
+DATE_RANGE_COLUMNS = ('data_cadastro',)
+RANGE_COLUMNS = NUMERIC_RANGE_COLUMNS + DATE_RANGE_COLUMNS
+
+_RANGE_PATTERN = re.compile(r'^(?P<column>[a-z_]+)\s*(?P<op>>=|<=|>|<|=|:)\s*(?P<value>.+)$')
+_RELATIVE_DAYS_PATTERN = re.compile(r'^(\d+)d$')
+# Cabeçalho de um grupo '(?...)' num padrão 're:': nome, referência, condicional,
+# comentário, lookaround, grupo sem captura/atômico ou flags
+_GROUP_HEADER_PATTERN = re.compile(r'\(\?(?:P<\w+>|P=\w+\)|\(\w+\)|#[^)]*\)|<[=!]|[=!:>]|[aiLmsux-]+[:)])')
+
+# Quantidade de padrões de expressão regular compilados mantidos em cache
+REGEX_CACHE_SIZE = 128
+
+# Tamanho máximo da amostra usada para estimar a seletividade de cada termo
+SELECTIVITY_SAMPLE_SIZE = 2000
+
+# Busca paralela: abaixo deste número de linhas candidatas o custo das threads não compensa
+PARALLEL_MIN_ROWS = 200_000
+
+try:
+    import pyarrow  # noqa: F401  (habilita o tipo 'string[pyarrow]' no pandas)
+    ARROW_STRINGS_AVAILABLE = True
+except ImportError:
+    ARROW_STRINGS_AVAILABLE = False
+
+# Configuração atual do modo paralelo (alterada por `configure_parallel`)
+_parallel = {'workers': 1, 'min_rows': PARALLEL_MIN_ROWS, 'executor': None}
+_parallel_lock = threading.Lock()
+
+
+class QueryError(ValueError):
+    """Erro de sintaxe ou de valor em uma consulta."""
+    pass
+
+
+class Predicate(NamedTuple):
+    """Um termo da consulta, já normalizado."""
+    value: str
+    negated: bool = False
+
+
+class RangePredicate(NamedTuple):
+    """Um predicado de intervalo sobre uma coluna numérica ou de data."""
+    column: str
+    low: Optional[float] = None
+    high: Optional[float] = None
+    low_inclusive: bool = True
+    high_inclusive: bool = True
+    negated: bool = False
+
+
+class FuzzyPredicate(NamedTuple):
+    """Um termo de busca aproximada (ver `core.fuzzy_index`)."""
+    value: str
+    negated: bool = False
+
+
+class RegexPredicate(NamedTuple):
+    """Um termo de expressão regular ('re:padrão'), avaliado sobre o texto pesquisável."""
+    value: str
+    negated: bool = False
+
+
+AnyPredicate = Union[Predicate, RangePredicate, FuzzyPredicate, RegexPredicate]
+# Predicados avaliados sobre o texto pesquisável (os demais são respondidos por índices)
+TEXT_PREDICATES = (Predicate, RegexPredicate)
+
+
+# --- Índices ordenados ---
+
+class SortedIndex:
+    """
+    Índice ordenado de uma coluna: permite responder intervalos com `searchsorted`.
+
+    Valores nulos ficam fora do índice. Datas são indexadas como inteiros (ns desde a época).
+    """
+
+    def __init__(self, series: pd.Series, is_date: bool):
+        keys = _to_sort_keys(series, is_date)
+        valid = ~np.isnan(keys)
+        valid_positions = np.flatnonzero(valid)
+        order = np.argsort(keys[valid], kind='stable')
+        self.order = valid_positions[order]
+        self.sorted_keys = keys[valid][order]
+        self.size = len(series)
+
+    def positions_between(
+        self,
+        low: Optional[float],
+        high: Optional[float],
+        low_inclusive: bool = True,
+        high_inclusive: bool = True
+    ) -> np.ndarray:
+        """Retorna as posições (não ordenadas) cujos valores estão no intervalo."""
+        start = 0
+        end = len(self.sorted_keys)
+        if low is not None:
+            start = np.searchsorted(self.sorted_keys, low, side='left' if low_inclusive else 'right')
+        if high is not None:
+            end = np.searchsorted(self.sorted_keys, high, side='right' if high_inclusive else 'left')
+        return self.order[start:max(start, end)]
+
+
+def _to_sort_keys(series: pd.Series, is_date: bool) -> np.ndarray:
+    """Converte uma coluna em chaves float64 comparáveis (NaN para nulos/inválidos)."""
+    if is_date:
+        # ISO8601: cada valor no seu formato ('aaaa-mm-dd' ou com hora), como o datetime()
+        # do SQLite; sem isso o pandas usa o formato do primeiro valor para a coluna toda
+        dates = pd.to_datetime(series, errors='coerce', format='ISO8601')
+        keys = dates.to_numpy(dtype='datetime64[ns]').astype('int64').astype('float64')
+        keys[dates.isna().to_numpy()] = np.nan
+        return keys
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+# Cache de artefatos derivados (texto pesquisável, índices ordenados) por DataFrame.
+# A chave é id(df); a referência fraca garante que a entrada seja descartada (e nunca
+# reaproveitada por engano) quando o DataFrame morrer.
+_frame_cache: Dict[int, tuple] = {}
+
+
+def _frame_artifacts(df: pd.DataFrame) -> dict:
+    """Retorna o dicionário de artefatos em cache associado a `df`."""
+    key = id(df)
+    entry = _frame_cache.get(key)
+    if entry is None or entry[0]() is not df:
+        entry = (weakref.ref(df, lambda _ref, k=key: _frame_cache.pop(k, None)), {'indexes': {}})
+        _frame_cache[key] = entry
+    return entry[1]
+
+
+def get_sorted_index(df: pd.DataFrame, column: str) -> SortedIndex:
+    """
+    Obtém (ou constrói e guarda em cache) o índice ordenado de uma coluna de `df`.
+
+    Args:
+        df (pd.DataFrame): DataFrame de origem. Não deve ser modificado in-place depois.
+        column (str): Nome da coluna.
+
+    Returns:
+        SortedIndex: Índice ordenado da coluna.
+    """
+    indexes = _frame_artifacts(df)['indexes']
+    if column not in indexes:
+        logger.debug(f"Construindo índice ordenado para a coluna '{column}'...")
+        indexes[column] = SortedIndex(df[column], column in DATE_RANGE_COLUMNS)
+    return indexes[column]
+
+
+def _replace_nul(series: pd.Series) -> pd.Series:
+    """
+    Troca NUL por \\x01 nos textos de `series` (os demais valores ficam como estão).
+
+    A tabela hash do pandas corta textos no primeiro NUL, então pd.factorize juntaria
+    'a\\x00b' e 'a'. O \\x01 é o caractere seguinte, o que mantém a ordem dos textos.
+    """
+    if series.dtype != object and not isinstance(series.dtype, pd.StringDtype):
+        return series
+    try:
+        replaced = series.str.replace('\x00', '\x01', regex=False)
+    except AttributeError:  # Coluna sem textos
+        return series
+    return replaced.where(replaced.notna(), series)
+
+
+def _column_sort_keys(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Chaves float64 de ordenação de uma coluna (NaN para nulos)."""
+    if column in RANGE_COLUMNS:
+        return _to_sort_keys(df[column], column in DATE_RANGE_COLUMNS)
+    values = _replace_nul(df[column])
+    try:
+        codes, _ = pd.factorize(values, sort=True)
+    except TypeError:  # Tipos misturados não comparáveis: ordena pelo texto
+        codes, _ = pd.factorize(_replace_nul(values.astype(str)).where(values.notna()), sort=True)
+    keys = codes.astype('float64')
+    keys[codes < 0] = np.nan
+    return keys
+
+
+def get_sort_order(df: pd.DataFrame, column: str, ascending: bool = True) -> np.ndarray:
+    """
+    Obtém (ou calcula e guarda em cache) a permutação que ordena `df` por `column`.
+
+    A ordenação é estável e deixa os nulos no fim nos dois sentidos. As permutações ficam
+    no cache de artefatos do DataFrame: reordenar ou alternar crescente/decrescente é uma
+    consulta ao cache, e um DataFrame recarregado começa sem elas. Colunas de intervalo
+    (`RANGE_COLUMNS`) reaproveitam o `SortedIndex` usado pelos filtros.
+
+    Returns:
+        np.ndarray: Posições de todas as linhas de `df`, na ordem pedida.
+    """
+    orders = _frame_artifacts(df).setdefault('sort_orders', {})
+    key = (column, ascending)
+    if key not in orders:
+        if column in RANGE_COLUMNS and ascending:
+            index = get_sorted_index(df, column)
+            nulls = np.setdiff1d(np.arange(len(df)), index.order, assume_unique=True)
+            orders[key] = np.concatenate([index.order, nulls])
+        else:
+            keys = _column_sort_keys(df, column)
+            valid = ~np.isnan(keys)
+            valid_positions = np.flatnonzero(valid)
+            ranked = keys[valid] if ascending else -keys[valid]
+            orders[key] = np.concatenate([
+                valid_positions[np.argsort(ranked, kind='stable')], np.flatnonzero(~valid)
+            ])
+        logger.debug(f"Permutação de ordenação calculada: {column} ({'asc' if ascending else 'desc'}).")
+    return orders[key]
+
+
+def sort_view(
+    df: pd.DataFrame, positions: Optional[np.ndarray], column: str, ascending: bool = True
+) -> np.ndarray:
+    """
+    Ordena uma visão (posições de `df`, None = todas as linhas) por `column`.
+
+    Filtra a permutação em cache da base pelas posições da visão: custo linear, sem nova ordenação.
+    """
+    order = get_sort_order(df, column, ascending)
+    if positions is None:
+        return order
+    in_view = np.zeros(len(df), dtype=bool)
+    in_view[positions] = True
+    return order[in_view[order]]
+
+
+def tag_dataset_version(df: pd.DataFrame, version: Optional[str]):
+    """
+    Associa a `df` a versão do conjunto de dados de onde ele veio (id da importação).
+
+    DataFrames com versão conhecida podem usar o cache de resultados (`core.search_cache`);
+    os subconjuntos gerados por `take_rows` herdam a versão.
+    """
+    _frame_artifacts(df)['dataset_version'] = version
+
+
+def dataset_version_of(df: pd.DataFrame) -> Optional[str]:
+    """Versão do conjunto de dados associada a `df`, ou None se desconhecida."""
+    entry = _frame_cache.get(id(df))
+    if entry is None or entry[0]() is not df:
+        return None
+    return entry[1].get('dataset_version')
+
+
+def attach_column_stats(df: pd.DataFrame, stats: Dict[str, Any]):
+    """
+    Associa a `df` o catálogo de estatísticas por coluna (`core.column_stats`).
+
+    O planejador usa o catálogo para estimar filtros de intervalo, e o impressor de
+    tabelas para as larguras das colunas; os subconjuntos gerados por `take_rows` o herdam.
+    """
+    _frame_artifacts(df)['column_stats'] = stats
+
+
+def column_stats_of(df: pd.DataFrame) -> Dict[str, Any]:
+    """Catálogo de estatísticas associado a `df` ({} se nenhum)."""
+    entry = _frame_cache.get(id(df))
+    if entry is None or entry[0]() is not df:
+        return {}
+    return entry[1].get('column_stats', {})
+
+
+def get_fuzzy_index(df: pd.DataFrame) -> FuzzyIndex:
+    """Obtém (ou constrói e guarda em cache) o índice de busca aproximada de `df`."""
+    artifacts = _frame_artifacts(df)
+    if 'fuzzy' not in artifacts:
+        artifacts['fuzzy'] = FuzzyIndex(df)
+    return artifacts['fuzzy']
+
+
+# --- Parsing ---
+
+def configure_parallel(workers: int = 0, min_rows: int = PARALLEL_MIN_ROWS):
+    """
+    Configura o modo paralelo da busca de texto.
+
+    Args:
+        workers (int): Número de threads. 0 = automático (núcleos disponíveis, apenas se o
+                       tipo string do Arrow estiver disponível); 1 = desligado.
+        min_rows (int): Quantidade mínima de linhas candidatas para usar o modo paralelo.
+    """
+    if workers <= 0:
+        workers = (os.cpu_count() or 1) if ARROW_STRINGS_AVAILABLE else 1
+        if not ARROW_STRINGS_AVAILABLE:
+            logger.debug("Busca paralela automática desligada: 'pyarrow' não está instalado.")
+    with _parallel_lock:
+        if workers != _parallel['workers'] and _parallel['executor'] is not None:
+            _parallel['executor'].shutdown(wait=False)
+            _parallel['executor'] = None
+        _parallel['workers'] = workers
+        _parallel['min_rows'] = max(1, min_rows)
+    logger.debug(f"Busca paralela: {workers} thread(s), a partir de {_parallel['min_rows']} linhas.")
+
+
+def _parallel_executor() -> Optional[ThreadPoolExecutor]:
+    """Pool de threads da busca paralela (criado sob demanda), ou None se desligada."""
+    with _parallel_lock:
+        if _parallel['workers'] <= 1:
+            return None
+        if _parallel['executor'] is None:
+            _parallel['executor'] = ThreadPoolExecutor(
+                max_workers=_parallel['workers'], thread_name_prefix='busca'
+            )
+        return _parallel['executor']
+
+
+def _parse_range_value(column: str, value: str, is_upper: bool) -> Optional[float]:
+    """
+    Converte o limite de um intervalo em chave numérica comparável com `SortedIndex`.
+
+    Para datas sem horário, o limite superior avança para o fim do dia.
+    """
+    value = value.strip()
+    if not value:
+        return None
+    if column in DATE_RANGE_COLUMNS:
+        parsed = pd.to_datetime(value, errors='coerce', dayfirst='/' in value)
+        if pd.isna(parsed):
+            raise QueryError(f"Data inválida para '{column}': '{value}'.")
+        if is_upper and parsed == parsed.normalize():
+            parsed = parsed + timedelta(days=1) - timedelta(microseconds=1)
+        return float(parsed.value)
+    try:
+        return float(value)
+    except ValueError:
+        raise QueryError(f"Valor numérico inválido para '{column}': '{value}'.") from None
+
+
+def _parse_range(column: str, op: str, value: str, negated: bool) -> RangePredicate:
+    """Converte 'coluna<op>valor' em um `RangePredicate`."""
+    if op == ':':
+        relative = _RELATIVE_DAYS_PATTERN.match(value.strip())
+        if relative and column in DATE_RANGE_COLUMNS:
+            start = datetime.now() - timedelta(days=int(relative.group(1)))
+            return RangePredicate(column, low=float(pd.Timestamp(start).value), negated=negated)
+        if '..' in value:
+            low_text, high_text = value.split('..', 1)
+            return RangePredicate(
+                column,
+                low=_parse_range_value(column, low_text, is_upper=False),
+                high=_parse_range_value(column, high_text, is_upper=True),
+                negated=negated
+            )
+        op = '='
+    if op == '=':
+        return RangePredicate(
+            column,
+            low=_parse_range_value(column, value, is_upper=False),
+            high=_parse_range_value(column, value, is_upper=True),
+            negated=negated
+        )
+    # '<=' e '>' usam o fim do dia de uma data; '<' e '>=' usam o início
+    bound = _parse_range_value(column, value, is_upper=op in ('<=', '>'))
+    if op.startswith('>'):
+        return RangePredicate(column, low=bound, low_inclusive=(op == '>='), negated=negated)
+    return RangePredicate(column, high=bound, high_inclusive=(op == '<='), negated=negated)
+
+
+def _translate_pattern(pattern: str) -> str:
+    """
+    Adapta um padrão 're:' ao texto pesquisável (minúsculo, colunas separadas por
+    `HAYSTACK_SEPARATOR`, avaliado como SEP + texto + SEP):
+        - '^' e '$' viram o separador, ancorando no início/fim de cada coluna;
+        - '.' não atravessa colunas;
+        - letras fora de sequências de escape vão para minúsculas ('\\D' continua '\\D');
+        - cabeçalhos de grupo '(?...)' ficam como estão ('(?P<Nome>', '(?P=Nome)').
+    Dispensar re.IGNORECASE e ancorar num literal deixa o motor de regex bem mais rápido.
+    """
+    separator = re.escape(HAYSTACK_SEPARATOR)
+    parts = []
+    i = 0
+    in_class = False
+    class_body_start = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            parts.append(pattern[i:i + 2])
+            i += 2
+            continue
+        header = None if in_class else _GROUP_HEADER_PATTERN.match(pattern, i)
+        if header:
+            parts.append(header.group())
+            i = header.end()
+            continue
+        if in_class:
+            # ']' logo após '[' ou '[^' é literal
+            if char == ']' and i > class_body_start:
+                in_class = False
+            parts.append(char.lower())
+        elif char == '[':
+            in_class = True
+            class_body_start = i + 2 if pattern[i + 1:i + 2] == '^' else i + 1
+            parts.append(char)
+        elif char in '^$':
+            parts.append(separator)
+        elif char == '.':
+            parts.append(f'[^{separator}]')
+        else:
+            parts.append(char.lower())
+        i += 1
+    return ''.join(parts)
+
+
+@functools.lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """
+    Compila (com cache LRU) um padrão de busca 're:'.
+
+    O padrão é comparado sem acentos e sem diferenciar maiúsculas, como os termos literais.
+
+    Raises:
+        QueryError: Se o padrão for inválido.
+    """
+    try:
+        return re.compile(_translate_pattern(strip_accents(pattern)))
+    except re.error as e:
+        raise QueryError(f"Expressão regular inválida '{pattern}': {e}") from e
+
+
+def parse_predicate(raw_term: str) -> AnyPredicate:
+    """
+    Converte um termo digitado pelo usuário em um predicado.
+
+    Args:
+        raw_term (str): Termo bruto, possivelmente prefixado por '!'.
+
+    Returns:
+        AnyPredicate: `RangePredicate` para intervalos em `RANGE_COLUMNS`,
+                      `FuzzyPredicate` para termos iniciados por '~',
+                      `RegexPredicate` para termos iniciados por 're:',
+                      `Predicate` (texto sem acentos, minúsculo, sem espaços nas bordas) caso contrário.
+
+    Raises:
+        QueryError: Se o termo for um intervalo com valor inválido ou uma expressão
+                    regular inválida.
+    """
+    term = raw_term.strip()
+    negated = False
+    while term.startswith(NOT_PREFIX):
+        negated = not negated
+        term = term[len(NOT_PREFIX):].strip()
+
+    if term.startswith(FUZZY_PREFIX):
+        return FuzzyPredicate(fold_text(term[len(FUZZY_PREFIX):].strip()), negated)
+
+    if term[:len(REGEX_PREFIX)].lower() == REGEX_PREFIX:
+        pattern = term[len(REGEX_PREFIX):].strip()
+        if pattern:
+            compile_pattern(pattern)  # Valida já na leitura da consulta
+        return RegexPredicate(pattern, negated)
+
+    range_match = _RANGE_PATTERN.match(term.lower())
+    if range_match and range_match.group('column') in RANGE_COLUMNS:
+        return _parse_range(
+            range_match.group('column'), range_match.group('op'), range_match.group('value'), negated
+        )
+    return Predicate(fold_text(term), negated)
+
+
+def parse_query(search_terms: List[str]) -> List[List[AnyPredicate]]:
+    """
+    Converte a lista de termos em uma disjunção (OU) de conjunções (E).
+
+    Args:
+        search_terms (List[str]): Termos separados por vírgula pelo chamador.
+
+    Returns:
+        List[List[AnyPredicate]]: Lista de cláusulas; cada cláusula é uma lista de
+                                  predicados que devem casar simultaneamente.
+
+    Raises:
+        QueryError: Se algum termo de intervalo for inválido.
+    """
+    clauses = []
+    for raw_clause in search_terms:
+        predicates = [
+            parse_predicate(part) for part in str(raw_clause).split(AND_OPERATOR)
+        ]
+        # Descarta termos vazios (ex: 'abc &' ou '!')
+        predicates = [p for p in predicates if isinstance(p, RangePredicate) or p.value]
+        if predicates:
+            clauses.append(predicates)
+    return clauses
+
+
+def normalize_query(search_terms: List[str]) -> tuple:
+    """
+    Forma canônica e hashable de uma consulta, usada como chave de cache.
+
+    Consultas equivalentes ('ADM , mel3' e 'MEL3, adm'; 'a & b' e 'b & a') geram a mesma chave.
+
+    Raises:
+        QueryError: Se algum termo de intervalo for inválido.
+    """
+    clauses = parse_query(search_terms)
+    return tuple(sorted(tuple(sorted(repr(p) for p in clause)) for clause in clauses))
+
+
+def _implies(stronger: AnyPredicate, weaker: AnyPredicate) -> bool:
+    """True se toda linha que satisfaz `stronger` também satisfaz `weaker`."""
+    if stronger == weaker:
+        return True
+    if not (isinstance(stronger, Predicate) and isinstance(weaker, Predicate)):
+        return False
+    if stronger.negated != weaker.negated:
+        return False
+    if stronger.negated:
+        return stronger.value in weaker.value  # Sem 'ab' -> sem 'abc'
+    return weaker.value in stronger.value  # Com 'mel3' -> com 'mel'
+
+
+def is_refinement(previous_terms: List[str], new_terms: List[str]) -> bool:
+    """
+    Verifica se o resultado de `new_terms` está contido no resultado de `previous_terms`.
+
+    Nesse caso, a nova consulta pode ser avaliada sobre o resultado anterior em vez do
+    DataFrame completo (ex: 'MEL' -> 'MEL3', 'bomba' -> 'bomba & !adm').
+    Cada cláusula nova precisa implicar alguma cláusula anterior; uma cláusula implica
+    outra se cada termo desta for implicado por algum termo daquela.
+
+    Raises:
+        QueryError: Se alguma das consultas for inválida.
+    """
+    previous = parse_query(previous_terms)
+    if not previous:
+        return True  # Consulta anterior vazia: o resultado anterior é tudo
+    new = parse_query(new_terms)
+    if not new:
+        return False
+    return all(
+        any(all(any(_implies(q, p) for q in new_clause) for p in old_clause) for old_clause in previous)
+        for new_clause in new
+    )
+
+
+# --- Texto pesquisável ---
+
+def haystack_columns(df: pd.DataFrame) -> List[str]:
+    """Colunas de `df` que compõem o texto pesquisável (colunas de texto)."""
+    return list(df.select_dtypes(include=['object']).columns)
+
+
+def build_haystack(df: pd.DataFrame) -> np.ndarray:
+    """
+    Constrói o texto pesquisável de cada linha (colunas de texto concatenadas, sem acentos, em minúsculas).
+
+    Args:
+        df (pd.DataFrame): DataFrame de origem.
+
+    Returns:
+        np.ndarray: Array de objetos (str), um elemento por linha de `df`.
+    """
+    columns = haystack_columns(df)
+    if not columns:
+        return np.full(len(df), '', dtype=object)
+
+    parts = [df[col].fillna('').astype(str) for col in columns]
+    haystack = parts[0].str.cat(parts[1:], sep=HAYSTACK_SEPARATOR) if len(parts) > 1 else parts[0]
+    return haystack.map(fold_text).to_numpy(dtype=object)
+
+
+def attach_haystack(df: pd.DataFrame, haystack, columns: Optional[List[str]] = None) -> bool:
+    """
+    Associa a `df` um texto pesquisável já calculado (ex: lido da tabela-sombra do SQLite).
+
+    Args:
+        df (pd.DataFrame): DataFrame de destino.
+        haystack: Sequência de textos normalizados, um por linha de `df`.
+        columns (Optional[List[str]]): Colunas usadas para gerar o texto. Se informadas,
+                                       precisam coincidir com `haystack_columns(df)`.
+
+    Returns:
+        bool: True se o texto foi aceito; False se for incompatível com `df`.
+    """
+    if len(haystack) != len(df) or (columns is not None and list(columns) != haystack_columns(df)):
+        logger.debug("Texto pesquisável pré-calculado incompatível com o DataFrame. Ignorado.")
+        return False
+    artifacts = _frame_artifacts(df)
+    artifacts['haystack'] = np.asarray(haystack, dtype=object)
+    artifacts.pop('haystack_arrow', None)
+    return True
+
+
+def get_haystack(df: pd.DataFrame) -> np.ndarray:
+    """Obtém (ou constrói e guarda em cache) o texto pesquisável de `df`."""
+    artifacts = _frame_artifacts(df)
+    if 'haystack' not in artifacts:
+        artifacts['haystack'] = build_haystack(df)
+    return artifacts['haystack']
+
+
+def _search_haystack(df: pd.DataFrame):
+    """
+    Texto pesquisável na forma usada pela avaliação: no modo paralelo, com o tipo string
+    do Arrow (convertido uma vez e guardado em cache); caso contrário, o array de objetos.
+    """
+    artifacts = _frame_artifacts(df)
+    if 'haystack_arrow' in artifacts:
+        return artifacts['haystack_arrow']
+    haystack = get_haystack(df)
+    if ARROW_STRINGS_AVAILABLE and _parallel['workers'] > 1 and len(haystack) >= _parallel['min_rows']:
+        artifacts['haystack_arrow'] = pd.array(haystack, dtype='string[pyarrow]')
+        return artifacts['haystack_arrow']
+    return haystack
+
+
+def take_rows(df: pd.DataFrame, positions: np.ndarray) -> pd.DataFrame:
+    """
+    Seleciona linhas por posição, propagando o texto pesquisável já calculado.
+
+    Assim, filtros sucessivos sobre o resultado não precisam normalizar o texto de novo.
+    """
+    result = df.iloc[positions]
+    artifacts = _frame_artifacts(df)
+    if 'haystack' in artifacts:
+        _frame_artifacts(result)['haystack'] = artifacts['haystack'][positions]
+    if 'fuzzy' in artifacts:
+        _frame_artifacts(result)['fuzzy'] = artifacts['fuzzy'].subset(positions)
+    for key in ('dataset_version', 'column_stats'):
+        if key in artifacts:
+            _frame_artifacts(result)[key] = artifacts[key]
+    return result
+
+
+# --- Avaliação ---
+
+def _match(haystack, predicate: Union[Predicate, RegexPredicate]) -> np.ndarray:
+    """Retorna a máscara booleana do predicado de texto sobre um trecho do texto pesquisável."""
+    if len(haystack) == 0:
+        return np.zeros(0, dtype=bool)
+    if isinstance(predicate, RegexPredicate):
+        search = compile_pattern(predicate.value).search
+        mask = np.fromiter(
+            (search(f"{HAYSTACK_SEPARATOR}{text}{HAYSTACK_SEPARATOR}") is not None for text in haystack),
+            dtype=bool, count=len(haystack)
+        )
+    else:
+        if isinstance(haystack, np.ndarray):
+            series = pd.Series(haystack, dtype=object, copy=False)
+        else:
+            series = pd.Series(haystack, copy=False)  # Tipo string do Arrow
+        # Termo literal: regex=False evita o motor de expressões regulares (e metacaracteres acidentais)
+        mask = series.str.contains(predicate.value, regex=False, na=False).to_numpy(dtype=bool)
+    return ~mask if predicate.negated else mask
+
+
+def parallel_match(
+    haystack, candidates: np.ndarray, predicate: Union[Predicate, RegexPredicate], workers: int
+) -> np.ndarray:
+    """
+    Avalia um predicado de texto sobre `haystack[candidates]` em blocos, um por thread.
+
+    Args:
+        haystack: Texto pesquisável completo (array de objetos ou array string do Arrow).
+        candidates (np.ndarray): Posições candidatas, em ordem.
+        predicate (Union[Predicate, RegexPredicate]): Termo de texto.
+        workers (int): Número de blocos/threads.
+
+    Returns:
+        np.ndarray: Máscara booleana alinhada com `candidates`.
+    """
+    executor = _parallel_executor()
+    bounds = np.linspace(0, len(candidates), num=max(1, workers) + 1, dtype=np.int64)
+    chunks = [candidates[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+    if executor is None or len(chunks) <= 1:
+        return _match(haystack[candidates], predicate)
+    # map() devolve os resultados na ordem dos blocos: a concatenação preserva a ordem das linhas
+    masks = executor.map(lambda chunk: _match(haystack[chunk], predicate), chunks)
+    return np.concatenate(list(masks))
+
+
+def check_range_columns(clauses: List[List[AnyPredicate]], columns) -> None:
+    """
+    Garante que os termos de intervalo se refiram a colunas existentes.
+
+    Sem esta verificação, um intervalo numa coluna ausente não casaria com nada (ou,
+    negado, casaria com tudo) sem aviso algum.
+
+    Args:
+        clauses (List[List[AnyPredicate]]): Cláusulas de `parse_query`.
+        columns: Colunas disponíveis (ex: `df.columns`).
+
+    Raises:
+        QueryError: Se algum intervalo usar uma coluna inexistente.
+    """
+    available = set(columns)
+    for clause in clauses:
+        for predicate in clause:
+            if isinstance(predicate, RangePredicate) and predicate.column not in available:
+                raise QueryError(
+                    f"Coluna '{predicate.column}' não existe na base. "
+                    f"Intervalos aceitos: {', '.join(col for col in RANGE_COLUMNS if col in available) or 'nenhum'}."
+                )
+
+
+def _indexed_mask(df: pd.DataFrame, predicate: AnyPredicate) -> np.ndarray:
+    """
+    Retorna a máscara (sobre todas as linhas de `df`) de um predicado respondido por índice
+    (intervalo ou busca aproximada).
+    """
+    if isinstance(predicate, FuzzyPredicate):
+        mask = np.isfinite(get_fuzzy_index(df).row_distances(predicate.value))
+    else:
+        mask = np.zeros(len(df), dtype=bool)
+        index = get_sorted_index(df, predicate.column)  # Coluna já validada por check_range_columns
+        mask[index.positions_between(
+            predicate.low, predicate.high, predicate.low_inclusive, predicate.high_inclusive
+        )] = True
+    return ~mask if predicate.negated else mask
+
+
+def estimate_selectivity(df: pd.DataFrame, haystack: np.ndarray, predicate: AnyPredicate) -> float:
+    """
+    Estima a fração de linhas que satisfazem o predicado.
+
+    Intervalos são estimados pelo mínimo/máximo do catálogo de estatísticas, quando
+    associado a `df` (`attach_column_stats`); sem catálogo, e para termos aproximados, a
+    contagem é exata pelos índices. Termos de texto são estimados sobre uma amostra
+    uniforme do texto pesquisável.
+
+    Args:
+        df (pd.DataFrame): DataFrame de origem.
+        haystack (np.ndarray): Texto pesquisável completo (None se não houver termos de texto).
+        predicate (AnyPredicate): Predicado a ser estimado.
+
+    Returns:
+        float: Fração estimada (0.0 a 1.0) de linhas que casam.
+    """
+    if len(df) == 0:
+        return 0.0
+    if isinstance(predicate, RangePredicate):
+        stats = column_stats_of(df).get(predicate.column)
+        fraction = None if stats is None else stats.range_fraction(
+            predicate.low, predicate.high, predicate.low_inclusive, predicate.high_inclusive
+        )
+        if fraction is not None:
+            return 1.0 - fraction if predicate.negated else fraction
+    if not isinstance(predicate, TEXT_PREDICATES):
+        return float(_indexed_mask(df, predicate).mean())
+    step = max(1, len(haystack) // SELECTIVITY_SAMPLE_SIZE)
+    sample = haystack[::step]
+    return float(_match(sample, predicate).mean())
+
+
+def _evaluate_clause(
+    df: pd.DataFrame,
+    haystack: np.ndarray,
+    candidates: np.ndarray,
+    clause: List[AnyPredicate]
+) -> np.ndarray:
+    """
+    Avalia uma cláusula E sobre as posições candidatas, em ordem de seletividade.
+
+    Returns:
+        np.ndarray: Posições (subconjunto de `candidates`) que satisfazem a cláusula.
+    """
+    ordered = sorted(clause, key=lambda p: estimate_selectivity(df, haystack, p))
+    for predicate in ordered:
+        if candidates.size == 0:
+            break  # Curto-circuito: nenhum candidato restante
+        if not isinstance(predicate, TEXT_PREDICATES):
+            candidates = candidates[_indexed_mask(df, predicate)[candidates]]
+        elif _parallel['workers'] > 1 and candidates.size >= _parallel['min_rows']:
+            candidates = candidates[parallel_match(haystack, candidates, predicate, _parallel['workers'])]
+        else:
+            candidates = candidates[_match(haystack[candidates], predicate)]
+    return candidates
+
+
+def filter_positions(
+    df: pd.DataFrame, search_terms: List[str], candidates: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Retorna as posições (0-based, em ordem) das linhas de `df` que casam com a consulta.
+
+    Args:
+        df (pd.DataFrame): DataFrame a ser pesquisado.
+        search_terms (List[str]): Termos da consulta (ver sintaxe no topo do módulo).
+        candidates (Optional[np.ndarray]): Se informado, pesquisa apenas estas posições de `df`
+                                           (ex: o resultado anterior, ao refinar uma busca),
+                                           sem materializar um DataFrame com elas.
+
+    Returns:
+        np.ndarray: Array de posições inteiras, em ordem crescente (ou por distância,
+                    para consultas aproximadas de cláusula única).
+
+    Raises:
+        QueryError: Se a consulta contiver um intervalo inválido ou sobre coluna inexistente.
+    """
+    clauses = parse_query(search_terms)
+    check_range_columns(clauses, df.columns)
+    if candidates is not None:
+        candidates = np.asarray(candidates, dtype=np.int64)
+    if not clauses:
+        return np.arange(len(df)) if candidates is None else candidates
+
+    # O texto pesquisável só é necessário (e construído) se houver termos de texto
+    needs_text = any(isinstance(p, TEXT_PREDICATES) for clause in clauses for p in clause)
+    haystack = _search_haystack(df) if needs_text else None
+    matched = np.zeros(len(df), dtype=bool)
+    remaining = np.arange(len(df)) if candidates is None else np.sort(candidates)
+
+    # Cláusulas mais abrangentes primeiro: reduzem mais rápido o conjunto restante
+    if len(clauses) > 1:
+        clauses = sorted(
+            clauses,
+            key=lambda c: min(estimate_selectivity(df, haystack, p) for p in c),
+            reverse=True
+        )
+
+    for clause in clauses:
+        if remaining.size == 0:
+            break  # Curto-circuito: todas as linhas já casaram
+        hits = _evaluate_clause(df, haystack, remaining, clause)
+        matched[hits] = True
+        remaining = remaining[~matched[remaining]]
+
+    # Mantém a ordem das candidatas (ex: uma visão já ordenada)
+    positions = np.flatnonzero(matched) if candidates is None else candidates[matched[candidates]]
+
+    # Consulta de cláusula única com termos aproximados: mais próximos primeiro
+    fuzzy_terms = [p for p in clauses[0] if isinstance(p, FuzzyPredicate) and not p.negated]
+    if len(clauses) == 1 and fuzzy_terms and positions.size:
+        fuzzy_index = get_fuzzy_index(df)
+        distances = sum(fuzzy_index.row_distances(p.value)[positions] for p in fuzzy_terms)
+        positions = positions[np.argsort(distances, kind='stable')]
+
+    logger.debug(f"Consulta {search_terms} casou {len(positions)} de {len(df)} linhas.")
+    return positions
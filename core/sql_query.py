@@ -0,0 +1,160 @@
+# core/sql_query.py 20250801 090000 (v1.1 - Intervalo sobre coluna inexistente e erro de consulta)
+"""
+Execução de consultas direto no SQLite, sem montar o DataFrame da base.
+
+A consulta usa a mesma sintaxe do motor em memória (`core.search_engine.parse_query`)
+e é traduzida para uma condição SQL:
+
+- termos de texto viram `fold(...) GLOB '*termo*'` sobre a tabela-sombra `<tabela>_busca`
+  (texto já normalizado na importação);
+- termos 're:' usam a função `regexp()` registrada na conexão, com o mesmo padrão
+  compilado da busca em memória;
+- intervalos viram comparações na própria coluna (datas normalizadas por `datetime()`
+  e comparadas como texto ISO).
+
+As linhas são geradas à medida que o cursor avança, na ordem de rowid (a mesma da
+base em memória). A busca aproximada ('~') depende do índice em memória: consultas
+com esse operador — ou bancos ainda sem a tabela-sombra — são respondidas pelo
+caminho do DataFrame.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from armazenamento import database
+from core.search_engine import (
+    HAYSTACK_SEPARATOR, DATE_RANGE_COLUMNS, AnyPredicate, FuzzyPredicate, Predicate, RangePredicate,
+    RegexPredicate, check_range_columns, compile_pattern, parse_query
+)
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _regexp(pattern: str, text: Optional[str]) -> bool:
+    """Função SQL `regexp(padrão, texto)` (operador `texto REGEXP padrão`)."""
+    if text is None:
+        return False
+    return compile_pattern(pattern).search(f"{HAYSTACK_SEPARATOR}{text}{HAYSTACK_SEPARATOR}") is not None
+
+
+def _date_literal(key: float) -> str:
+    """Chave de data (ns desde a época, como em `RangePredicate`) em texto ISO comparável."""
+    return (_EPOCH + timedelta(microseconds=int(key) // 1000)).isoformat(sep=' ')
+
+
+def _range_condition(predicate: RangePredicate, column_types: Dict[str, str]) -> Tuple[str, list]:
+    """Condição SQL (sem a negação) de um predicado de intervalo."""
+    column = f't."{predicate.column}"'
+    is_date = predicate.column in DATE_RANGE_COLUMNS
+    if is_date:  # datetime() normaliza 'aaaa-mm-dd' e 'aaaa-mm-dd hh:mm:ss' (inválidas viram NULL)
+        value = f"datetime({column})"
+        conditions = [f"{value} IS NOT NULL"]
+    elif database.is_numeric_type(column_types[predicate.column]):
+        value = column
+        conditions = [f"typeof({column}) IN ('integer', 'real')"]
+    else:  # Números gravados como texto: compara o valor convertido
+        value = f"CAST({column} AS REAL)"
+        conditions = [f"{column} GLOB '*[0-9]*'"]
+    params = []
+    bounds = (
+        (predicate.low, '>=' if predicate.low_inclusive else '>'),
+        (predicate.high, '<=' if predicate.high_inclusive else '<'),
+    )
+    for bound, op in bounds:
+        if bound is not None:
+            conditions.append(f"{value} {op} ?")
+            params.append(_date_literal(bound) if is_date else bound)
+    return " AND ".join(conditions), params
+
+
+def _predicate_condition(predicate: AnyPredicate, column_types: Dict[str, str]) -> Tuple[str, list]:
+    """Condição SQL de um predicado, já com a negação aplicada."""
+    if isinstance(predicate, RangePredicate):
+        condition, params = _range_condition(predicate, column_types)
+        # Negado: as linhas sem valor passam a casar, como em `~mask` na busca em memória
+        return (f"NOT coalesce(({condition}), 0)" if predicate.negated else f"({condition})"), params
+    if isinstance(predicate, RegexPredicate):
+        condition, params = "b.texto REGEXP ?", [predicate.value]
+    else:
+        condition, params = "b.texto GLOB ?", [f"*{database.glob_literal(predicate.value)}*"]
+    return (f"NOT {condition}" if predicate.negated else condition), params
+
+
+def compile_where(clauses: List[List[AnyPredicate]], column_types: Dict[str, str]) -> Optional[Tuple[str, tuple, bool]]:
+    """
+    Traduz as cláusulas de `parse_query` em uma condição SQL.
+
+    Args:
+        clauses (List[List[AnyPredicate]]): Disjunção de conjunções.
+        column_types (Dict[str, str]): Tipo declarado de cada coluna (`database.get_column_types`).
+
+    Returns:
+        Optional[Tuple[str, tuple, bool]]: (condição, parâmetros, usa a tabela-sombra de busca),
+        ou None se a consulta tiver termos sem tradução para SQL (busca aproximada).
+
+    Raises:
+        QueryError: Se um intervalo usar coluna inexistente (como na busca em memória).
+    """
+    check_range_columns(clauses, column_types)
+    if not clauses:
+        return "1", (), False
+    parts, params = [], []
+    uses_index = False
+    for clause in clauses:
+        conjunction = []
+        for predicate in clause:
+            if isinstance(predicate, FuzzyPredicate):
+                return None
+            uses_index = uses_index or isinstance(predicate, (Predicate, RegexPredicate))
+            condition, predicate_params = _predicate_condition(predicate, column_types)
+            conjunction.append(condition)
+            params.extend(predicate_params)
+        parts.append(f"({' AND '.join(conjunction)})")
+    return " OR ".join(parts), tuple(params), uses_index
+
+
+def _stream_from_dataframe(db_path: str, table_name: str, search_terms: List[str], columns: List[str]) -> Iterator[tuple]:
+    """Caminho em memória (busca aproximada, banco sem índice): filtra a base e gera as linhas encontradas."""
+    # Importação local: só este caminho precisa do motor em memória e do pandas
+    from core.app_logic import filter_view
+    from core.search_engine import attach_haystack
+
+    df = database.query_db(db_path, table_name)
+    search_index = database.load_search_haystack(db_path, table_name)
+    if search_index is not None:
+        attach_haystack(df, search_index[1], search_index[0])
+    positions = filter_view(df, search_terms)
+    view = df[columns].iloc[positions].astype(object)
+    yield from view.where(view.notna(), None).itertuples(index=False, name=None)
+
+
+def stream_query(db_path: str, table_name: str, search_terms: List[str], columns: List[str]) -> Iterator[tuple]:
+    """
+    Gera as linhas (tuplas das `columns`) que casam com a consulta, na ordem de rowid.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Tabela consultada.
+        search_terms (List[str]): Termos, como na busca interativa (cada item é uma alternativa OU).
+        columns (List[str]): Colunas de saída (devem existir na tabela).
+
+    Raises:
+        QueryError: Se a consulta for inválida (levantado já na chamada, antes da primeira linha).
+    """
+    clauses = parse_query(search_terms)
+    compiled = compile_where(clauses, database.get_column_types(db_path, table_name))
+    if compiled is None:
+        logger.info("Consulta com busca aproximada: usando o motor em memória.")
+        return _stream_from_dataframe(db_path, table_name, search_terms, columns)
+    where, params, uses_index = compiled
+    if uses_index and database.get_metadata(db_path, f"{table_name}{database.SEARCH_INDEX_SUFFIX}_colunas") is None:
+        logger.info("Índice de busca ainda não criado: usando o motor em memória.")
+        return _stream_from_dataframe(db_path, table_name, search_terms, columns)
+    logger.debug(f"Consulta traduzida para SQL: {where} {params}")
+    return database.stream_rows(
+        db_path, table_name, columns, where, params,
+        use_search_index=uses_index, functions={'regexp': (2, _regexp)}
+    )
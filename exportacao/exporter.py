@@ -1,4 +1,4 @@
-# exportacao/exporter.py 20250725 175000 (v3.1 - Tratamento de Erros e Logging)
+# exportacao/exporter.py 20250730 110000 (v3.2 - Mapeamento padrao pelo servico de configuracoes)
 """
 Modulo para exportar DataFrames para diferentes formatos de arquivo.
 """
@@ -6,11 +6,13 @@ Modulo para exportar DataFrames para diferentes formatos de arquivo.
 import pandas as pd
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from core.config_manager import DISPLAY_MAPPINGS_FILE, settings_service
 
 logger = logging.getLogger(__name__)
 
-def export_dataframe(df: pd.DataFrame, base_filename: str, output_dir: str, display_map: Dict[str, str]):
+def export_dataframe(df: pd.DataFrame, base_filename: str, output_dir: str, display_map: Optional[Dict[str, str]] = None):
     """
     Exporta um DataFrame para CSV, XLSX e JSON.
 
@@ -18,7 +20,8 @@ def export_dataframe(df: pd.DataFrame, base_filename: str, output_dir: str, disp
         df (pd.DataFrame): O DataFrame a ser exportado.
         base_filename (str): O nome base para os arquivos de exportacao.
         output_dir (str): O diretorio onde os arquivos serao salvos.
-        display_map (Dict[str, str]): Mapeamento de colunas internas para nomes de exibicao.
+        display_map (Optional[Dict[str, str]]): Mapeamento de colunas internas para nomes de exibicao
+            (padrao: display_mappings.json, lido pelo cache de `settings_service`).
     """
     if df.empty:
         logger.warning("DataFrame vazio fornecido para exportação.")
@@ -35,6 +38,8 @@ def export_dataframe(df: pd.DataFrame, base_filename: str, output_dir: str, disp
         return
 
     # Renomeia colunas para nomes de exibição
+    if display_map is None:
+        display_map = settings_service.load_json(DISPLAY_MAPPINGS_FILE, default={})
     df_to_export = df.rename(columns=display_map)
 
     # --- Exportacao ---
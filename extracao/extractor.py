@@ -1,4 +1,4 @@
-# extracao/extractor.py 20250725 101500 (v6.4 - Melhorias de Tipo, Sanitizacao, Logging)
+# extracao/extractor.py 20250729 170000 (v6.5 - Progresso por planilha)
 """
 Módulo responsável pela extração e normalização inicial de dados de arquivos Excel.
 
@@ -9,7 +9,7 @@ Lê arquivos .xlsx, identifica cabeçalhos, normaliza nomes de colunas usando
 import pandas as pd
 import json
 import os
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
 import logging
 
 logger = logging.getLogger(__name__)
@@ -88,12 +88,16 @@ def _normalize_datatypes(df: pd.DataFrame) -> pd.DataFrame:
     logger.debug("Normalização de tipos concluída.")
     return df_normalized
 
-def extract_data_from_excel(file_path: str) -> Optional[pd.DataFrame]:
+def extract_data_from_excel(
+    file_path: str, sheet_progress: Optional[Callable[[int, int, str], None]] = None
+) -> Optional[pd.DataFrame]:
     """
     Extrai dados de um único arquivo Excel (.xlsx).
 
     Args:
         file_path (str): Caminho completo para o arquivo Excel.
+        sheet_progress (Optional[Callable[[int, int, str], None]]): Chamada antes de cada
+            planilha com (número da planilha, 1-based; total de planilhas; nome da planilha).
 
     Returns:
         Optional[pd.DataFrame]: Um DataFrame com os dados extraídos e normalizados,
@@ -104,8 +108,10 @@ def extract_data_from_excel(file_path: str) -> Optional[pd.DataFrame]:
         all_sheets_data = []
         xl_file = pd.ExcelFile(file_path, engine='openpyxl') 
         
-        for sheet_name in xl_file.sheet_names:
+        for sheet_number, sheet_name in enumerate(xl_file.sheet_names, start=1):
             logger.debug(f"Processando planilha '{sheet_name}'...")
+            if sheet_progress is not None:
+                sheet_progress(sheet_number, len(xl_file.sheet_names), sheet_name)
             # Le a planilha inteira
             sheet_df = xl_file.parse(sheet_name, header=None) 
             
@@ -1,40 +1,60 @@
-# gui_ssa.py 20250725 173000 (PoC - GUI PyQt6 para SSA_Consulta_Rapida)
+# gui_ssa.py 20250801 120000 (PoC - GUI PyQt6 para SSA_Consulta_Rapida - lista de refinamentos renumerada)
 """
 Prova de Conceito Refinada de uma Interface Gráfica (GUI) para o projeto SSA_Consulta_Rapida usando PyQt6.
 
 Refinamentos em relação à PoC básica:
 1. Seleção de colunas com base em display_mappings.json e prioridade.
-2. Paginação simples para lidar com grandes conjuntos de dados.
-3. Uso de nomes de exibição para colunas.
-4. Feedback mais detalhado ao usuário.
-5. Estrutura mais preparada para expansão (ordenação, exportação).
-
-Para executar: python gui_ssa.py
-(Requer que o projeto ja tenha sido executado uma vez para criar o banco de dados ssas.db)
+2. Tabela virtual (QTableView + DataFrameTableModel): rola pelo resultado inteiro, sem paginação.
+   Ao abrir, a tabela do banco é lida em lotes conforme a rolagem (SqlTableModel); a base
+   completa só é carregada na memória na primeira busca.
+3. Uma única base imutável em memória; resultados de busca são arrays de posições sobre ela
+   (sem cópias do DataFrame). A barra de status mostra o uso de memória.
+4. Uso de nomes de exibição para colunas.
+5. Feedback mais detalhado ao usuário.
+6. Estrutura mais preparada para expansão (ordenação, exportação).
+7. Busca enquanto digita: espera uma pausa na digitação, descarta buscas superadas por
+   uma mais nova e refina o resultado anterior quando a consulta fica mais restritiva.
+8. Todo trabalho em segundo plano (carga, busca, importação, exportação, detalhes) passa
+   por um único executor (gui.task_runner), com prioridades e tarefas repetidas coalescidas.
+9. Larguras das colunas calculadas pelo catálogo de estatísticas gravado na importação
+   (core.column_stats), sem medir as células; sem catálogo, mede uma amostra de linhas.
+
+Para executar: python gui/gui_ssa.py
+(Sem o banco de dados ssas.db, use 'Importar Relatórios' para criá-lo a partir de docs_entrada)
 """
 
 import sys
 import os
 import pandas as pd
-import json
+
+try:
+    import psutil # Opcional: memória do processo no relatório da barra de status
+except ImportError:
+    psutil = None
 
 # --- Configuração do Path do Projeto ---
-project_root = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 # --- Importações do Projeto ---
-from core.app_logic import filter_dataframe
-from armazenamento.database import query_db
-from core.config_manager import load_settings # Para carregar display_mappings
+from core.app_logic import filter_view, run_importer_logic, load_dataset
+from core.search_engine import (
+    configure_parallel, is_refinement, QueryError, PARALLEL_MIN_ROWS, column_stats_of
+)
+from core.column_stats import load_column_stats
+from armazenamento.database import count_rows, get_row_by_rowid
+from core.config_manager import settings_service # Configurações e display_mappings (com cache)
+from gui.table_model import DataFrameTableModel, SqlTableModel, ROW_NUMBER_COLUMN, MAX_CELL_CHARS, format_cell
+from gui.task_runner import TaskRunner, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW, COALESCE_REPLACE
 
 # --- Importações do PyQt6 ---
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QPushButton, QLineEdit, QLabel, QTableWidget, QTableWidgetItem,
-    QHeaderView, QMessageBox, QProgressBar, QComboBox, QSpinBox, QAbstractItemView,
-    QMenu, QGroupBox, QTextEdit
+    QPushButton, QLineEdit, QLabel, QTableView,
+    QHeaderView, QMessageBox, QProgressBar, QComboBox, QAbstractItemView,
+    QMenu, QGroupBox, QTextEdit, QInputDialog
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QItemSelectionModel
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QItemSelectionModel
 from PyQt6.QtGui import QAction
 
 # --- Constantes ---
@@ -42,59 +62,72 @@ DB_PATH = os.path.join(project_root, 'data', 'ssas.db')
 TABLE_NAME = 'ssas'
 CONFIG_DIR = os.path.join(project_root, 'config')
 DISPLAY_MAPPINGS_FILE = os.path.join(CONFIG_DIR, 'display_mappings.json')
+EXPORT_DIR = os.path.join(project_root, 'docs_saida')
+# Chaves das tarefas no executor (tarefas com a mesma chave são coalescidas)
+LOAD_TASK = 'carga'
+MEMORY_TASK = 'memoria'
+SEARCH_TASK = 'busca'
+IMPORT_TASK = 'importacao'
+EXPORT_TASK = 'exportacao'
+DETAILS_TASK = 'detalhes'
+# Pausa na digitação (ms) antes de disparar a busca automática
+SEARCH_DEBOUNCE_MS = 300
+# Largura máxima (px) de uma coluna ajustada automaticamente e linhas usadas no ajuste
+MAX_COLUMN_WIDTH = 250
+COLUMN_WIDTH_SAMPLE_ROWS = 200
+# Margem (px) somada ao texto no ajuste pelo catálogo (bordas da célula e indicador de ordenação)
+COLUMN_PADDING_PX = 24
 
 # --- Funções Auxiliares ---
 
 def load_display_mappings():
     """Carrega o mapeamento de nomes internos para nomes de exibição."""
-    try:
-        with open(DISPLAY_MAPPINGS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Aviso: Erro ao carregar display_mappings.json: {e}. Usando nomes internos.")
-        return {}
+    return settings_service.load_json(DISPLAY_MAPPINGS_FILE, default={})
 
-# --- Worker Threads ---
+# --- Tarefas em Segundo Plano (executadas pelo TaskRunner) ---
 
-class DataLoaderWorker(QThread):
-    """Thread para carregar dados do banco."""
-    data_loaded = pyqtSignal(pd.DataFrame)
-    error_occurred = pyqtSignal(str)
+def load_base_task(handle, db_path, table_name) -> pd.DataFrame:
+    """Carrega a tabela inteira (base da busca em memória), pelo snapshot da importação quando válido."""
+    df = load_dataset(db_path, table_name)
+    if df is None:
+        raise RuntimeError("Falha ao carregar dados do banco.")
+    return df
 
-    def __init__(self, db_path, table_name):
-        super().__init__()
-        self.db_path = db_path
-        self.table_name = table_name
+def measure_memory_task(handle, df) -> int:
+    """Bytes ocupados pela base; a medição completa (inclui os textos) é lenta."""
+    return int(df.memory_usage(deep=True).sum())
 
-    def run(self):
-        try:
-            df = query_db(self.db_path, self.table_name)
-            if df is not None:
-                self.data_loaded.emit(df)
-            else:
-                self.error_occurred.emit("Falha ao carregar dados do banco.")
-        except Exception as e:
-            self.error_occurred.emit(f"Erro ao carregar dados: {e}")
-
-class FilterWorker(QThread):
-    """Thread para filtrar dados."""
-    filter_finished = pyqtSignal(pd.DataFrame) # Emite o DataFrame filtrado
-    error_occurred = pyqtSignal(str)
-
-    def __init__(self, df_completo, search_terms):
-        super().__init__()
-        self.df_completo = df_completo
-        self.search_terms = search_terms
+def filter_task(handle, df_base, search_terms, candidates):
+    """
+    Filtra a base e retorna (posições, termos): uma visão, não um DataFrame novo.
 
-    def run(self):
-        try:
-            if self.search_terms:
-                df_filtrado = filter_dataframe(self.df_completo, self.search_terms)
-            else:
-                df_filtrado = self.df_completo.copy()
-            self.filter_finished.emit(df_filtrado)
-        except Exception as e:
-            self.error_occurred.emit(f"Erro ao filtrar dados: {e}")
+    Uma busca superada é cancelada pelo executor; o pandas não é interrompido no meio,
+    mas o resultado dela é descartado.
+    """
+    positions = None
+    if search_terms and not handle.is_cancelled():
+        positions = filter_view(df_base, search_terms, candidates)
+    return positions, search_terms
+
+def import_task(handle, force_import=False) -> bool:
+    """Importa os relatórios novos; o progresso (etapa, atual, total, descrição) vai para a interface."""
+    return bool(run_importer_logic(
+        force_import=force_import,
+        progress_callback=lambda *progress: handle.report_progress(progress)
+    ))
+
+def export_task(handle, df, base_filename, output_dir, display_map) -> int:
+    """Exporta as linhas (CSV, XLSX e JSON) e retorna a quantidade exportada."""
+    from exportacao import exporter  # Importação local: o exportador só é carregado na primeira exportação
+    exporter.export_dataframe(df, base_filename, output_dir, display_map)
+    return len(df)
+
+def details_task(handle, read_row, display_map) -> str:
+    """Lê uma linha completa e a formata como 'Campo: valor', uma coluna por linha."""
+    row = read_row()
+    return "\n".join(
+        f"{display_map.get(col, col)}: {format_cell(value)}" for col, value in row.items()
+    )
 
 # --- Componentes da GUI ---
 
@@ -167,99 +200,6 @@ class ColumnSelector(QWidget):
         return self.selected_internal_columns
 
 
-class DataPaginator(QWidget):
-    """Widget para paginação de dados."""
-    page_changed = pyqtSignal(int) # Emite o número da nova página (1-based)
-
-    def __init__(self, df, page_size=50):
-        super().__init__()
-        self.df = df
-        self.page_size = page_size
-        self.current_page = 1
-        self.total_pages = 1
-        self.update_pagination_info()
-        self.init_ui()
-
-    def init_ui(self):
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        self.prev_button = QPushButton("Página Anterior")
-        self.prev_button.clicked.connect(self.prev_page)
-        self.prev_button.setEnabled(False)
-
-        self.page_info_label = QLabel("Página 1 de 1")
-
-        self.next_button = QPushButton("Próxima Página")
-        self.next_button.clicked.connect(self.next_page)
-        self.next_button.setEnabled(False)
-
-        # Controle de tamanho da página
-        page_size_layout = QHBoxLayout()
-        page_size_layout.addWidget(QLabel("Linhas por Página:"))
-        self.page_size_spinbox = QSpinBox()
-        self.page_size_spinbox.setRange(10, 500)
-        self.page_size_spinbox.setSingleStep(10)
-        self.page_size_spinbox.setValue(self.page_size)
-        self.page_size_spinbox.valueChanged.connect(self.change_page_size)
-        page_size_layout.addWidget(self.page_size_spinbox)
-
-        layout.addWidget(self.prev_button)
-        layout.addWidget(self.page_info_label)
-        layout.addWidget(self.next_button)
-        layout.addStretch()
-        layout.addLayout(page_size_layout)
-
-    def set_dataframe(self, df):
-        self.df = df
-        self.current_page = 1
-        self.update_pagination_info()
-        self.update_buttons()
-
-    def update_pagination_info(self):
-        if self.df is not None and not self.df.empty:
-            self.total_pages = (len(self.df) + self.page_size - 1) // self.page_size
-        else:
-            self.total_pages = 1
-            self.current_page = 1
-        self.page_info_label.setText(f"Página {self.current_page} de {self.total_pages}")
-
-    def update_buttons(self):
-        self.prev_button.setEnabled(self.current_page > 1)
-        self.next_button.setEnabled(self.current_page < self.total_pages)
-
-    def next_page(self):
-        if self.current_page < self.total_pages:
-            self.current_page += 1
-            self.update_pagination_info()
-            self.update_buttons()
-            self.page_changed.emit(self.current_page)
-
-    def prev_page(self):
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.update_pagination_info()
-            self.update_buttons()
-            self.page_changed.emit(self.current_page)
-
-    def change_page_size(self, new_size):
-        self.page_size = new_size
-        # Reset para a página 1 ao mudar o tamanho
-        self.current_page = 1
-        self.update_pagination_info()
-        self.update_buttons()
-        # Notifica que a página 1 (com novo tamanho) deve ser carregada
-        self.page_changed.emit(self.current_page)
-
-    def get_current_slice(self):
-        """Retorna o slice do DataFrame para a página atual."""
-        if self.df is None or self.df.empty:
-            return pd.DataFrame()
-        start_idx = (self.current_page - 1) * self.page_size
-        end_idx = start_idx + self.page_size
-        return self.df.iloc[start_idx:end_idx]
-
-
 # --- Janela Principal da Aplicacao ---
 class SSAMainWindow(QMainWindow):
     """
@@ -270,9 +210,33 @@ class SSAMainWindow(QMainWindow):
         self.setWindowTitle("Consulta Rápida de SSAs - GUI (PoC)")
         self.setGeometry(100, 100, 1200, 800)
 
-        self.df_completo = pd.DataFrame()
-        self.df_exibido = pd.DataFrame() # DataFrame filtrado
-        self.df_para_tabela = pd.DataFrame() # DataFrame paginado para exibição
+        self.df_completo = pd.DataFrame() # Base única, nunca modificada nem copiada
+        self.posicoes_exibidas = None # Visão exibida: posições na base (None = base inteira)
+        self.termos_exibidos = [] # Termos que geraram a visão (para refinar a próxima busca)
+        self.base_memory_bytes = 0
+        self.import_file_label = "" # Arquivo em importação (prefixo do progresso por planilha)
+        self.column_stats = {} # Catálogo de estatísticas por coluna (larguras sem medir células)
+
+        # Executor único do trabalho em segundo plano
+        self.task_runner = TaskRunner(parent=self)
+
+        # Busca ao digitar: a busca mais recente substitui as anteriores no executor
+        self.live_search = False
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(lambda: self.initiate_filtering(live=True))
+
+        # Modo paralelo da busca (settings.json -> search_settings)
+        try:
+            search_settings = settings_service.get().get("search_settings", {})
+        except Exception as e:
+            print(f"Aviso: Erro ao carregar configurações de busca: {e}.")
+            search_settings = {}
+        configure_parallel(
+            search_settings.get("parallel_workers", 1),
+            search_settings.get("parallel_min_rows", PARALLEL_MIN_ROWS)
+        )
 
         # Carrega mapeamentos de exibição
         self.display_map = load_display_mappings()
@@ -288,6 +252,10 @@ class SSAMainWindow(QMainWindow):
 
         self.init_ui()
 
+        # Primeira tela imediata: linhas lidas do banco sob demanda
+        if os.path.exists(DB_PATH):
+            QTimer.singleShot(0, self.load_data)
+
     def init_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -305,7 +273,17 @@ class SSAMainWindow(QMainWindow):
         self.progress_bar.setVisible(False)
         self.progress_bar.setRange(0, 0)
 
+        self.import_button = QPushButton("Importar Relatórios")
+        self.import_button.setToolTip("Importa os relatórios novos ou modificados de docs_entrada")
+        self.import_button.clicked.connect(self.start_import)
+
+        self.export_button = QPushButton("Exportar")
+        self.export_button.setToolTip("Exporta as linhas exibidas (CSV, XLSX e JSON) para docs_saida")
+        self.export_button.clicked.connect(self.start_export)
+
         toolbar_layout.addWidget(self.load_button)
+        toolbar_layout.addWidget(self.import_button)
+        toolbar_layout.addWidget(self.export_button)
         toolbar_layout.addWidget(self.status_label)
         toolbar_layout.addWidget(self.progress_bar)
         toolbar_layout.addStretch()
@@ -318,9 +296,11 @@ class SSAMainWindow(QMainWindow):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Digite termos separados por virgula...")
         self.search_input.returnPressed.connect(self.initiate_filtering)
+        # Reinicia a contagem a cada tecla: a busca só roda após uma pausa na digitação
+        self.search_input.textChanged.connect(self.search_timer.start)
         
         self.search_button = QPushButton("Buscar")
-        self.search_button.clicked.connect(self.initiate_filtering)
+        self.search_button.clicked.connect(lambda: self.initiate_filtering())
         
         self.clear_filter_button = QPushButton("Limpar Filtro")
         self.clear_filter_button.clicked.connect(self.clear_filter)
@@ -337,72 +317,172 @@ class SSAMainWindow(QMainWindow):
         self.column_selector.columns_changed.connect(self.on_columns_changed)
         main_layout.addWidget(self.column_selector)
 
-        # --- Paginador ---
-        self.paginator = DataPaginator(self.df_para_tabela)
-        self.paginator.page_changed.connect(self.display_current_page)
-        main_layout.addWidget(self.paginator)
-
-        # --- Tabela de Dados ---
-        self.table_widget = QTableWidget()
-        self.table_widget.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table_widget.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
-        self.table_widget.verticalHeader().setVisible(False)
+        # --- Tabela de Dados (virtual: só as células visíveis são consultadas) ---
+        self.table_model = DataFrameTableModel(self.internal_to_display, self)
+        self.sql_model = SqlTableModel(DB_PATH, TABLE_NAME, self.internal_to_display, parent=self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        # Ajuste de largura considera apenas uma amostra de linhas, não o resultado inteiro
+        self.table_view.horizontalHeader().setResizeContentsPrecision(COLUMN_WIDTH_SAMPLE_ROWS)
+        self.table_view.verticalHeader().setVisible(False)
+        # Altura fixa: a view não precisa medir cada linha para calcular a barra de rolagem
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         
-        # Conecta clique duplo para mostrar detalhes (placeholder)
-        self.table_widget.doubleClicked.connect(self.on_table_double_click)
+        # Clique duplo mostra todos os campos da linha
+        self.table_view.doubleClicked.connect(self.on_table_double_click)
+        # Ordenação pelo clique no cabeçalho (permutações em cache, ver DataFrameTableModel.sort)
+        self.table_view.horizontalHeader().setSectionsClickable(True)
+        self.table_view.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
+
+        main_layout.addWidget(self.table_view)
 
-        main_layout.addWidget(self.table_widget)
+        # --- Barra de Status (relatório de memória) ---
+        self.memory_label = QLabel("")
+        self.statusBar().addPermanentWidget(self.memory_label)
 
-        # --- Conecta Workers ---
-        self.data_loader_thread = None
-        self.filter_thread = None
+        # --- Indicador de ocupado: visível enquanto houver tarefas ativas ---
+        self.task_runner.active_changed.connect(self.on_active_tasks_changed)
 
     # --- Slots e Handlers ---
 
     def load_data(self):
+        """Exibe a tabela do banco imediatamente, lendo as linhas em lotes conforme a rolagem."""
         if not os.path.exists(DB_PATH):
-             QMessageBox.warning(self, "Erro", f"Banco de dados '{DB_PATH}' não encontrado. Execute o programa principal primeiro.")
+             QMessageBox.warning(
+                 self, "Erro",
+                 f"Banco de dados '{DB_PATH}' não encontrado. Use 'Importar Relatórios' para criá-lo."
+             )
              return
 
-        self.status_label.setText("Status: Carregando dados...")
-        self.progress_bar.setVisible(True)
+        # Descarta a base em memória: a próxima busca recarrega os dados atualizados
+        self.df_completo = pd.DataFrame()
+        self.posicoes_exibidas = None
+        self.termos_exibidos = []
+        self.base_memory_bytes = 0
+        self.task_runner.cancel(SEARCH_TASK)
+        self.column_stats = load_column_stats(DB_PATH, TABLE_NAME)
+        self.show_database_rows()
+        self.status_label.setText(
+            f"Status: {count_rows(DB_PATH, TABLE_NAME)} SSAs no banco (lidas ao rolar). "
+            "A base completa é carregada na primeira busca."
+        )
+        self.clear_filter_button.setEnabled(True)
+
+    def on_active_tasks_changed(self, active: int):
+        self.progress_bar.setVisible(active > 0)
+        if active == 0:
+            self.progress_bar.setRange(0, 0)
+
+    def start_full_load(self):
+        """Carrega a tabela inteira em segundo plano (necessária para a busca em memória)."""
+        if self.task_runner.is_active(LOAD_TASK):
+            return  # Carga já em andamento
+
+        self.status_label.setText("Status: Carregando a base completa para a busca...")
         self.load_button.setEnabled(False)
         self.search_button.setEnabled(False)
+        self.task_runner.submit(
+            LOAD_TASK, load_base_task, DB_PATH, TABLE_NAME, priority=PRIORITY_NORMAL,
+            on_result=self.on_data_loaded, on_error=self.on_load_error, on_finished=self.on_load_finished
+        )
+
+    def start_import(self):
+        """Importa os relatórios novos em segundo plano; a base é trocada ao final."""
+        if self.task_runner.is_active(IMPORT_TASK):
+            return  # Importação já em andamento
+
+        self.status_label.setText("Status: Procurando relatórios novos...")
+        self.import_button.setEnabled(False)
+        self.import_file_label = "Importando"
+        self.task_runner.submit(
+            IMPORT_TASK, import_task, priority=PRIORITY_NORMAL,
+            on_progress=self.on_import_progress, on_result=self.on_import_finished,
+            on_error=self.on_import_error, on_finished=lambda: self.import_button.setEnabled(True)
+        )
+
+    def on_import_progress(self, progress):
+        stage, current, total, description = progress
+        if stage == 'arquivo':
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(current - 1)
+            self.import_file_label = f"Importando {current}/{total}: {description}"
+            self.status_label.setText(f"Status: {self.import_file_label}")
+        elif stage == 'planilha':
+            self.status_label.setText(
+                f"Status: {self.import_file_label} (planilha {current}/{total}: {description})"
+            )
+        else:
+            self.progress_bar.setRange(0, 0)
+            self.status_label.setText(f"Status: {description}...")
 
-        self.data_loader_thread = DataLoaderWorker(DB_PATH, TABLE_NAME)
-        self.data_loader_thread.data_loaded.connect(self.on_data_loaded)
-        self.data_loader_thread.error_occurred.connect(self.on_load_error)
-        self.data_loader_thread.finished.connect(self.on_load_finished)
-        self.data_loader_thread.start()
+    def on_import_finished(self, updated: bool):
+        if not updated:
+            self.status_label.setText("Status: Nenhum relatório novo para importar.")
+            return
+        self.status_label.setText("Status: Importação concluída. Atualizando dados...")
+        if not self.df_completo.empty:
+            # Recarrega a base em segundo plano: a atual segue em uso até a nova chegar
+            # (on_data_loaded), e a busca exibida é refeita sobre ela (on_load_finished)
+            self.start_full_load()
+        else:
+            self.load_data()
+
+    def on_import_error(self, error_msg: str):
+        QMessageBox.critical(self, "Erro de Importação", f"Erro ao importar relatórios: {error_msg}")
+        self.status_label.setText("Status: Erro ao importar relatórios.")
 
     def on_data_loaded(self, df: pd.DataFrame):
-        self.df_completo = df.copy()
-        # Inicialmente, exibimos todos os dados
-        self.df_exibido = df.copy() 
-        # Atualiza o paginador com o DataFrame completo
-        self.paginator.set_dataframe(self.df_exibido)
-        # Exibe a primeira página
-        self.display_current_page(1)
+        # O DataFrame vem só do loader: é adotado como base, sem cópia
+        self.df_completo = df
+        # O loader já associou a versão dos dados (cache de resultados) e o catálogo
+        self.column_stats = column_stats_of(self.df_completo) or self.column_stats
+        # Inicialmente, a visão é a base inteira
+        self.posicoes_exibidas = None
+        self.termos_exibidos = []
+        self.task_runner.cancel(SEARCH_TASK) # Buscas sobre os dados antigos são descartadas
         self.status_label.setText(f"Status: {len(self.df_completo)} SSAs carregadas. Pronto para filtrar.")
         self.clear_filter_button.setEnabled(True)
+        self.update_memory_report()
+        self.task_runner.submit(
+            MEMORY_TASK, measure_memory_task, df, priority=PRIORITY_LOW, coalesce=COALESCE_REPLACE,
+            on_result=self.on_memory_measured
+        )
+
+    def on_memory_measured(self, base_bytes: int):
+        self.base_memory_bytes = base_bytes
+        self.update_memory_report()
 
     def on_load_error(self, error_msg: str):
-        QMessageBox.critical(self, "Erro de Carregamento", error_msg)
+        QMessageBox.critical(self, "Erro de Carregamento", f"Erro ao carregar dados: {error_msg}")
         self.status_label.setText("Status: Erro ao carregar dados.")
-        self.load_button.setEnabled(True)
-        self.search_button.setEnabled(True)
-        self.progress_bar.setVisible(False)
 
     def on_load_finished(self):
-        self.progress_bar.setVisible(False)
         self.load_button.setEnabled(True)
         self.search_button.setEnabled(True)
-        self.data_loader_thread = None
+        # Executa a busca que motivou a carga (ou a digitada durante ela); sem busca,
+        # exibe a base nova (ex: recarga após uma importação)
+        if not self.df_completo.empty:
+            if self.search_input.text().strip():
+                self.initiate_filtering(live=True)
+            else:
+                self.refresh_table()
+
+    def initiate_filtering(self, live: bool = False):
+        """
+        Inicia uma busca em segundo plano, superando qualquer busca anterior ainda em execução.
 
-    def initiate_filtering(self):
+        Args:
+            live (bool): True quando disparada pela digitação (erros vão para a barra de status).
+        """
+        self.search_timer.stop()
         if self.df_completo.empty:
-            QMessageBox.information(self, "Aviso", "Nenhum dado carregado para filtrar.")
+            if os.path.exists(DB_PATH):
+                self.start_full_load() # A busca é refeita ao fim da carga (on_load_finished)
+            elif not live:
+                QMessageBox.information(self, "Aviso", "Nenhum dado carregado para filtrar.")
             return
 
         search_text = self.search_input.text().strip()
@@ -410,128 +490,223 @@ class SSAMainWindow(QMainWindow):
         if search_text:
             search_terms = [term.strip() for term in search_text.split(',') if term.strip()]
 
-        self.status_label.setText("Status: Filtrando dados...")
-        self.progress_bar.setVisible(True)
-        self.load_button.setEnabled(False)
-        self.search_button.setEnabled(False)
+        if search_terms == self.termos_exibidos and not self.task_runner.is_active(SEARCH_TASK):
+            return  # Nada mudou (ex: Enter após a busca automática)
 
-        # Inicia a thread de filtragem
-        self.filter_thread = FilterWorker(self.df_completo, search_terms)
-        self.filter_thread.filter_finished.connect(self.on_filter_finished)
-        self.filter_thread.error_occurred.connect(self.on_filter_error)
-        self.filter_thread.finished.connect(self.on_filter_finished_cleanup)
-        self.filter_thread.start()
-
-    def on_filter_finished(self, df_filtrado: pd.DataFrame):
-        self.df_exibido = df_filtrado
-        # Atualiza o paginador com o DataFrame filtrado
-        self.paginator.set_dataframe(self.df_exibido)
-        # Exibe a primeira página dos resultados filtrados
-        self.display_current_page(1)
-        self.status_label.setText(f"Status: {len(self.df_exibido)} SSAs encontradas.")
+        # Consulta mais restritiva que a exibida: filtra só as posições da visão atual
+        candidates = None
+        try:
+            if self.termos_exibidos and search_terms and is_refinement(self.termos_exibidos, search_terms):
+                candidates = self.posicoes_exibidas
+        except QueryError:
+            pass  # A própria busca reporta o erro
+
+        self.status_label.setText("Status: Filtrando dados...")
+        self.live_search = live
+        # Substitui a busca anterior (se ainda na fila, nem chega a rodar)
+        self.task_runner.submit(
+            SEARCH_TASK, filter_task, self.df_completo, search_terms, candidates,
+            priority=PRIORITY_HIGH, coalesce=COALESCE_REPLACE,
+            on_result=self.on_filter_finished, on_error=self.on_filter_error
+        )
+
+    def on_filter_finished(self, result):
+        positions, search_terms = result
+        self.posicoes_exibidas = positions
+        self.termos_exibidos = search_terms
+        # Exibe os resultados filtrados
+        self.refresh_table()
+        self.status_label.setText(f"Status: {self.table_model.rowCount()} SSAs encontradas.")
+        self.update_memory_report()
 
     def on_filter_error(self, error_msg: str):
+        if self.live_search:
+            # Durante a digitação a consulta pode estar incompleta (ex: 're:(abc')
+            self.status_label.setText(f"Status: {error_msg}")
+            return
         QMessageBox.critical(self, "Erro de Filtro", error_msg)
         self.status_label.setText("Status: Erro ao aplicar filtro.")
 
-    def on_filter_finished_cleanup(self):
-        self.progress_bar.setVisible(False)
-        self.load_button.setEnabled(True)
-        self.search_button.setEnabled(True)
-        self.filter_thread = None
-
     def clear_filter(self):
         """Limpa o filtro e mostra todos os dados."""
+        self.search_input.blockSignals(True) # Evita disparar a busca automática
         self.search_input.clear()
-        self.df_exibido = self.df_completo.copy()
-        self.paginator.set_dataframe(self.df_exibido)
-        self.display_current_page(1)
-        self.status_label.setText(f"Status: Filtro limpo. {len(self.df_exibido)} SSAs exibidas.")
+        self.search_input.blockSignals(False)
+        self.search_timer.stop()
+        self.task_runner.cancel(SEARCH_TASK) # Descarta buscas em andamento
+        self.posicoes_exibidas = None
+        self.termos_exibidos = []
+        if self.df_completo.empty:
+            self.show_database_rows()
+            self.status_label.setText("Status: Filtro limpo.")
+            return
+        self.refresh_table()
+        self.status_label.setText(f"Status: Filtro limpo. {len(self.df_completo)} SSAs exibidas.")
+        self.update_memory_report()
+
+    def start_export(self):
+        """Exporta as linhas exibidas, na ordem exibida, em segundo plano."""
+        if self.task_runner.is_active(EXPORT_TASK):
+            self.status_label.setText("Status: Exportação já em andamento.")
+            return
+        # A cópia das linhas é feita na tarefa, fora da thread da interface
+        base, positions = None, None
+        if self.table_view.model() is self.table_model:
+            base, positions = self.df_completo, self.table_model.view_positions()
+        elif not os.path.exists(DB_PATH):
+            QMessageBox.information(self, "Aviso", "Nenhum dado para exportar.")
+            return
+        base_filename, ok = QInputDialog.getText(self, "Exportar", "Nome base dos arquivos:", text="consulta_ssa")
+        if not ok or not base_filename.strip():
+            return
+
+        def export_rows(handle):
+            if base is None: # Base ainda não carregada: lê a tabela do banco
+                rows = load_base_task(handle, DB_PATH, TABLE_NAME)
+            else:
+                rows = base if positions is None else base.iloc[positions]
+            return export_task(handle, rows, base_filename.strip(), EXPORT_DIR, self.internal_to_display)
+
+        self.status_label.setText("Status: Exportando...")
+        self.task_runner.submit(
+            EXPORT_TASK, export_rows, priority=PRIORITY_LOW,
+            on_result=lambda count: self.status_label.setText(
+                f"Status: {count} SSAs exportadas para {EXPORT_DIR}."
+            ),
+            on_error=lambda error_msg: QMessageBox.critical(self, "Erro de Exportação", error_msg)
+        )
 
     def on_columns_changed(self, new_columns):
         """Chamado quando a seleção de colunas muda."""
         self.visible_columns = new_columns
-        # Reexibe a página atual com as novas colunas
-        self.display_current_page(self.paginator.current_page)
-
-    def display_current_page(self, page_number):
-        """Exibe a página especificada do DataFrame filtrado."""
-        # Obtem o slice de dados para a página atual do paginator
-        self.df_para_tabela = self.paginator.get_current_slice()
-        
-        if self.df_para_tabela.empty:
-            self.table_widget.setRowCount(0)
-            self.table_widget.setColumnCount(0)
-            return
+        # Reexibe os dados com as novas colunas
+        if self.table_view.model() is self.sql_model:
+            self.show_database_rows()
+        else:
+            self.refresh_table()
 
-        # Seleciona apenas as colunas visíveis
-        cols_to_show = [col for col in self.visible_columns if col in self.df_para_tabela.columns]
+    def _columns_to_show(self, available_columns):
+        """Colunas visíveis existentes em `available_columns`, precedidas da numeração '#'."""
+        cols_to_show = [col for col in self.visible_columns if col in available_columns]
         if not cols_to_show:
             # Se nenhuma coluna selecionada for valida, mostra as padroes
-            cols_to_show = [col for col in self.default_columns if col in self.df_para_tabela.columns]
+            cols_to_show = [col for col in self.default_columns if col in available_columns]
             if not cols_to_show:
                  # Ultimo recurso: mostra todas
-                 cols_to_show = self.df_para_tabela.columns.tolist()
-        
-        display_df = self.df_para_tabela[cols_to_show].copy()
-
-        # Adiciona a coluna de índice '#'
-        if '#' not in display_df.columns:
-            display_df.insert(0, '#', range((self.paginator.current_page - 1) * self.paginator.page_size + 1, 
-                                            (self.paginator.current_page - 1) * self.paginator.page_size + 1 + len(display_df)))
-
-        # Configura a tabela
-        self.table_widget.setRowCount(len(display_df))
-        self.table_widget.setColumnCount(len(display_df.columns))
-        
-        # Define cabeçalhos de exibição
-        display_headers = []
-        for col in display_df.columns:
-            if col == '#':
-                display_headers.append('#')
+                 cols_to_show = list(available_columns)
+        return [ROW_NUMBER_COLUMN] + cols_to_show
+
+    def show_database_rows(self):
+        """Exibe a tabela do banco pelo modelo incremental (lotes lidos conforme a rolagem)."""
+        self.sql_model.set_columns(self._columns_to_show(self.sql_model.available_columns()))
+        self.table_view.setModel(self.sql_model)
+        self._update_sort_indicator()
+        self.table_view.scrollToTop()
+        self._fit_column_widths()
+
+    def refresh_table(self):
+        """Exibe a visão atual (posições sobre a base) inteira na tabela virtual."""
+        self.table_model.set_view(
+            self.df_completo, self.posicoes_exibidas, self._columns_to_show(self.df_completo.columns)
+        )
+        if self.table_view.model() is not self.table_model:
+            self.table_view.setModel(self.table_model)
+        self._update_sort_indicator()
+        self.table_view.scrollToTop()
+        self._fit_column_widths()
+
+    def on_header_clicked(self, section: int):
+        """Ordena pela coluna clicada; um novo clique na mesma coluna inverte o sentido."""
+        if self.table_view.model() is not self.table_model:
+            self.status_label.setText("Status: A ordenação usa a base completa, carregada na primeira busca.")
+            self._update_sort_indicator()
+            return
+        current_section, current_order = self.table_model.sort_state()
+        order = Qt.SortOrder.AscendingOrder
+        if section == current_section and current_order == Qt.SortOrder.AscendingOrder:
+            order = Qt.SortOrder.DescendingOrder
+        self.table_model.sort(section, order)
+        self._update_sort_indicator()
+        self.table_view.scrollToTop()
+
+    def _update_sort_indicator(self):
+        """Mostra no cabeçalho a coluna e o sentido da ordenação atual."""
+        header = self.table_view.horizontalHeader()
+        section, order = (-1, Qt.SortOrder.AscendingOrder)
+        if self.table_view.model() is self.table_model:
+            section, order = self.table_model.sort_state()
+        header.setSortIndicatorShown(section >= 0)
+        if section >= 0:
+            header.setSortIndicator(section, order)
+
+    def _fit_column_widths(self):
+        """
+        Ajusta a largura das colunas e limita as muito largas.
+
+        Com o catálogo de estatísticas, a largura sai do p95 de caracteres de cada coluna
+        (nenhuma célula é medida); sem catálogo, mede a amostra de linhas da view.
+        """
+        model = self.table_view.model()
+        if not self.column_stats:
+            self.table_view.resizeColumnsToContents()
+            for i in range(model.columnCount()):
+                 if self.table_view.columnWidth(i) > MAX_COLUMN_WIDTH:
+                     self.table_view.setColumnWidth(i, MAX_COLUMN_WIDTH)
+            return
+        metrics = self.table_view.fontMetrics()
+        char_width = metrics.horizontalAdvance('0')
+        for i in range(model.columnCount()):
+            col = model.column_name(i)
+            if col == ROW_NUMBER_COLUMN:
+                chars = len(str(max(model.rowCount(), 1)))
             else:
-                display_headers.append(self.internal_to_display.get(col, col))
-        self.table_widget.setHorizontalHeaderLabels(display_headers)
-
-        # Preenche os dados
-        for row_idx in range(len(display_df)):
-            for col_idx, col_name in enumerate(display_df.columns):
-                value = display_df.iloc[row_idx, col_idx]
-                item_text = "" if pd.isna(value) else str(value)
-                
-                # Trunca texto muito longo para a tabela
-                if len(item_text) > 50:
-                    item_text = item_text[:47] + "..."
-                    
-                item = QTableWidgetItem(item_text)
-                item.setTextAlignment(Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft)
-                # Armazena o índice da linha original nos dados filtrados para referência
-                if col_name == '#': 
-                    item.setData(Qt.ItemDataRole.UserRole, row_idx + (self.paginator.current_page - 1) * self.paginator.page_size)
-                self.table_widget.setItem(row_idx, col_idx, item)
-        
-        # Ajusta largura das colunas
-        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        for i in range(self.table_widget.columnCount()):
-             width = self.table_widget.columnWidth(i)
-             if width > 250:
-                 self.table_widget.setColumnWidth(i, 250)
+                stats = self.column_stats.get(col)
+                chars = min(stats.width_p95, MAX_CELL_CHARS) if stats is not None else MAX_CELL_CHARS
+            header = str(model.headerData(i, Qt.Orientation.Horizontal))
+            width = max(chars * char_width, metrics.horizontalAdvance(header)) + COLUMN_PADDING_PX
+            self.table_view.setColumnWidth(i, min(width, MAX_COLUMN_WIDTH))
+
+    def update_memory_report(self):
+        """Mostra na barra de status o uso de memória: processo, base e visão atual."""
+        parts = []
+        if psutil is not None:
+            parts.append(f"processo {psutil.Process().memory_info().rss / 2**20:.0f} MB")
+        if self.base_memory_bytes:
+            parts.append(f"base {self.base_memory_bytes / 2**20:.0f} MB")
+        if self.posicoes_exibidas is not None:
+            parts.append(
+                f"visão {len(self.posicoes_exibidas)} linhas em {self.posicoes_exibidas.nbytes / 2**10:.0f} KB de índices"
+            )
+        self.memory_label.setText(f"Memória: {', '.join(parts)}" if parts else "")
 
     def on_table_double_click(self, index):
-        """Placeholder para ação de clique duplo (ex: mostrar detalhes)."""
+        """Mostra todos os campos da linha clicada (lidos em segundo plano)."""
         row = index.row()
-        # O item da coluna '#' contém o índice da linha original
-        index_item = self.table_widget.item(row, 0) # Assume '#' é a primeira coluna
-        if index_item:
-            original_index = index_item.data(Qt.ItemDataRole.UserRole)
-            if original_index is not None and 0 <= original_index < len(self.df_exibido):
-                # Aqui você chamaria uma função para mostrar detalhes
-                # Ex: show_details_window(self.df_exibido.iloc[original_index])
-                QMessageBox.information(self, "Detalhes", 
-                    f"Detalhes para SSA na linha {original_index + 1} (página {self.paginator.current_page})\n"
-                    f"Dados: {self.df_exibido.iloc[original_index].to_dict()}")
-            else:
-                 QMessageBox.information(self, "Info", "Não foi possível encontrar os dados detalhados para esta linha.")
+        model = self.table_view.model()
+        if not 0 <= row < model.rowCount():
+            QMessageBox.information(self, "Info", "Não foi possível encontrar os dados detalhados para esta linha.")
+            return
+        # A chave da linha é resolvida aqui, na thread da interface; a leitura fica no executor
+        if model is self.sql_model:
+            rowid = self.sql_model.rowid(row)
+            key = f"{DETAILS_TASK}:rowid:{rowid}"
+            read_row = lambda: pd.Series(get_row_by_rowid(DB_PATH, TABLE_NAME, rowid) or {})
+        else:
+            position = self.table_model.base_position(row)
+            df = self.df_completo
+            key = f"{DETAILS_TASK}:{position}"
+            read_row = lambda: df.iloc[position]
+        self.task_runner.submit(
+            key, details_task, read_row, self.internal_to_display, priority=PRIORITY_HIGH,
+            on_result=lambda text: QMessageBox.information(self, f"Detalhes da linha {row + 1}", text),
+            on_error=lambda error_msg: QMessageBox.critical(self, "Erro", f"Erro ao ler detalhes: {error_msg}")
+        )
+
+    def closeEvent(self, event):
+        """Cancela as buscas pendentes e aguarda as tarefas em execução antes de fechar."""
+        self.task_runner.cancel(SEARCH_TASK)
+        self.task_runner.wait_for_done()
+        super().closeEvent(event)
 
 # --- Ponto de Entrada ---
 if __name__ == '__main__':
@@ -0,0 +1,256 @@
+# gui/table_model.py 20250801 120000 (v1.6 - Leitura da linha completa fica na tarefa de detalhes)
+"""
+Modelo de tabela (QAbstractTableModel) sobre os arrays das colunas de um DataFrame.
+
+Um resultado de busca é uma *visão*: um array de posições sobre a base única, e não
+uma cópia das linhas. `data()` lê `coluna[posições[linha]]`.
+
+Ao contrário do preenchimento com um QTableWidgetItem por célula, nenhum objeto é criado
+por célula: a QTableView pede apenas as células visíveis, e `data()` formata o valor
+no momento em que ele é desenhado. Assim a tabela rola pelo resultado inteiro, sem
+paginação.
+
+A ordenação (sort(), clique no cabeçalho) também é uma visão: as posições exibidas são
+as da busca filtradas pela permutação da coluna, guardada em cache na base
+(`core.search_engine.sort_view`). Alternar o sentido ou voltar a uma coluna já
+ordenada não ordena de novo; ao recarregar os dados, a base nova começa sem cache.
+
+`SqlTableModel` vai além: lê as linhas do SQLite em lotes (canFetchMore/fetchMore),
+apenas à medida que o usuário rola, para exibir a primeira tela sem carregar a tabela.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from armazenamento.database import fetch_rows_after, get_table_columns
+from core.search_engine import sort_view
+
+# Coluna virtual com o número da linha no resultado (1-based)
+ROW_NUMBER_COLUMN = '#'
+# Textos maiores são truncados na célula (o texto completo fica na dica de ferramenta)
+MAX_CELL_CHARS = 50
+# Linhas lidas do banco a cada fetchMore()
+FETCH_BATCH_SIZE = 256
+# Marcador interno da coluna de numeração
+_ROW_NUMBER = object()
+
+
+def format_cell(value) -> str:
+    """Converte um valor de célula em texto de exibição ('' para valores nulos)."""
+    if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return str(value)
+
+
+def _cell_data(value, row: int, role: int):
+    """Resposta de data() para o valor de uma célula (`_ROW_NUMBER` = coluna '#')."""
+    if role == Qt.ItemDataRole.DisplayRole:
+        if value is _ROW_NUMBER:
+            return str(row + 1)
+        text = format_cell(value)
+        return text if len(text) <= MAX_CELL_CHARS else text[:MAX_CELL_CHARS - 3] + "..."
+    if role == Qt.ItemDataRole.ToolTipRole and value is not _ROW_NUMBER:
+        text = format_cell(value)
+        return text if len(text) > MAX_CELL_CHARS else None
+    if role == Qt.ItemDataRole.TextAlignmentRole:
+        return int(Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft)
+    return None
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """Modelo somente leitura que expõe uma visão (posições) sobre colunas de um DataFrame base."""
+
+    def __init__(self, display_map: Optional[Dict[str, str]] = None, parent=None):
+        super().__init__(parent)
+        self.display_map = display_map or {}
+        self._df = pd.DataFrame()
+        self._view_positions: Optional[np.ndarray] = None  # Visão recebida (ordem da busca)
+        self._positions: Optional[np.ndarray] = None  # Visão exibida (ordenada, se houver ordenação)
+        self._sort: Optional[Tuple[str, bool]] = None  # (coluna, crescente)
+        self._columns: List[str] = []
+        self._arrays: List[Optional[np.ndarray]] = []
+
+    # --- Carga de dados ---
+
+    def set_view(self, df: pd.DataFrame, positions: Optional[np.ndarray], columns: List[str]):
+        """
+        Substitui os dados exibidos.
+
+        Args:
+            df (pd.DataFrame): Base (não é copiada).
+            positions (Optional[np.ndarray]): Posições das linhas exibidas, na ordem (None = todas).
+            columns (List[str]): Colunas visíveis, na ordem; '#' é a numeração das linhas.
+        """
+        self.beginResetModel()
+        self._df = df
+        self._view_positions = positions
+        self._columns = [col for col in columns if col == ROW_NUMBER_COLUMN or col in df.columns]
+        self._apply_sort()
+        # Um array por coluna (sem cópia para colunas NumPy/objeto): data() faz só indexação
+        self._arrays = [
+            None if col == ROW_NUMBER_COLUMN else df[col].to_numpy()
+            for col in self._columns
+        ]
+        self.endResetModel()
+
+    def set_columns(self, columns: List[str]):
+        """Troca as colunas visíveis mantendo a mesma visão."""
+        self.set_view(self._df, self._view_positions, columns)
+
+    # --- Ordenação ---
+
+    def _apply_sort(self):
+        """Recalcula as posições exibidas a partir da visão recebida e da ordenação atual."""
+        if self._sort is None or self._sort[0] not in self._df.columns:
+            self._positions = self._view_positions
+        else:
+            self._positions = sort_view(self._df, self._view_positions, *self._sort)
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        """
+        Ordena a visão pela coluna `column` (a coluna '#' volta à ordem da busca).
+
+        A ordenação é mantida nas próximas visões (novas buscas), até ser trocada.
+        """
+        col = self._columns[column] if 0 <= column < len(self._columns) else ROW_NUMBER_COLUMN
+        self.beginResetModel()
+        self._sort = None if col == ROW_NUMBER_COLUMN else (col, order == Qt.SortOrder.AscendingOrder)
+        self._apply_sort()
+        self.endResetModel()
+
+    def sort_state(self) -> Tuple[int, Qt.SortOrder]:
+        """Seção ordenada (-1 se nenhuma visível) e sentido, para o indicador do cabeçalho."""
+        if self._sort is None or self._sort[0] not in self._columns:
+            return -1, Qt.SortOrder.AscendingOrder
+        order = Qt.SortOrder.AscendingOrder if self._sort[1] else Qt.SortOrder.DescendingOrder
+        return self._columns.index(self._sort[0]), order
+
+    def column_name(self, section: int) -> str:
+        """Nome interno da coluna exibida na seção `section` ('#' = numeração)."""
+        return self._columns[section]
+
+    def base_position(self, row: int) -> int:
+        """Posição, na base, da linha `row` da tabela."""
+        return row if self._positions is None else int(self._positions[row])
+
+    def view_positions(self) -> Optional[np.ndarray]:
+        """Posições exibidas, na ordem exibida (None = base inteira, sem ordenação)."""
+        return self._positions
+
+    # --- Interface do QAbstractTableModel ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._df) if self._positions is None else len(self._positions)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        array = self._arrays[index.column()]
+        value = _ROW_NUMBER if array is None else array[self.base_position(index.row())]
+        return _cell_data(value, index.row(), role)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            col = self._columns[section]
+            return col if col == ROW_NUMBER_COLUMN else self.display_map.get(col, col)
+        return str(section + 1)
+
+
+class SqlTableModel(QAbstractTableModel):
+    """
+    Modelo somente leitura que lê a tabela do SQLite em lotes, sob demanda.
+
+    A QTableView chama canFetchMore()/fetchMore() ao chegar ao fim das linhas já lidas;
+    cada lote continua do último rowid lido (paginação por chave). Só as colunas
+    visíveis são lidas, e a memória cresce apenas com o que o usuário rolou.
+    """
+
+    def __init__(self, db_path: str, table_name: str, display_map: Optional[Dict[str, str]] = None,
+                 batch_size: int = FETCH_BATCH_SIZE, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.table_name = table_name
+        self.display_map = display_map or {}
+        self.batch_size = batch_size
+        self._columns: List[str] = []
+        self._tuple_positions: List[Optional[int]] = []  # Coluna visível -> posição na tupla lida
+        self._rows: List[tuple] = []  # (rowid, *valores das colunas lidas)
+        self._exhausted = True
+
+    def available_columns(self) -> List[str]:
+        """Colunas existentes na tabela do banco."""
+        return get_table_columns(self.db_path, self.table_name)
+
+    def set_columns(self, columns: List[str]):
+        """Define as colunas visíveis ('#' = numeração) e recomeça a leitura do início."""
+        existing = set(self.available_columns())
+        self.beginResetModel()
+        self._columns = [col for col in columns if col == ROW_NUMBER_COLUMN or col in existing]
+        # rowid ocupa a posição 0; '#' não é lida do banco
+        sql_columns = [col for col in self._columns if col != ROW_NUMBER_COLUMN]
+        self._tuple_positions = [
+            None if col == ROW_NUMBER_COLUMN else 1 + sql_columns.index(col) for col in self._columns
+        ]
+        self._rows = []
+        self._exhausted = False
+        self.endResetModel()
+
+    def column_name(self, section: int) -> str:
+        """Nome interno da coluna exibida na seção `section` ('#' = numeração)."""
+        return self._columns[section]
+
+    def rowid(self, row: int) -> int:
+        """rowid, no banco, da linha `row` da tabela."""
+        return self._rows[row][0]
+
+    # --- Leitura incremental ---
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        last_rowid = self._rows[-1][0] if self._rows else 0
+        sql_columns = [col for col in self._columns if col != ROW_NUMBER_COLUMN]
+        batch = fetch_rows_after(self.db_path, self.table_name, sql_columns, last_rowid, self.batch_size)
+        self._exhausted = len(batch) < self.batch_size
+        if not batch:
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(batch) - 1)
+        self._rows.extend(batch)
+        self.endInsertRows()
+
+    # --- Interface do QAbstractTableModel ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        position = self._tuple_positions[index.column()]
+        value = _ROW_NUMBER if position is None else self._rows[index.row()][position]
+        return _cell_data(value, index.row(), role)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            col = self._columns[section]
+            return col if col == ROW_NUMBER_COLUMN else self.display_map.get(col, col)
+        return str(section + 1)
@@ -0,0 +1,219 @@
+# gui/task_runner.py 20250729 180000 (v1.0 - Executor de tarefas da GUI sobre QThreadPool)
+"""
+Executor único para o trabalho em segundo plano da GUI (carga, busca, importação,
+exportação e detalhes).
+
+Em vez de uma subclasse de QThread criada e destruída a cada ação, as tarefas são
+QRunnables executados por um QThreadPool compartilhado:
+
+- Cada tarefa tem uma chave. Ao enviar uma tarefa cuja chave já está pendente ou em
+  execução, ela é *coalescida*: com `COALESCE_JOIN` a tarefa existente é reaproveitada
+  (ex: dois cliques em "Carregar"); com `COALESCE_REPLACE` a anterior é cancelada — e
+  retirada da fila, se ainda não começou — e a nova toma o lugar dela (ex: busca ao digitar).
+- Prioridades decidem a ordem da fila quando todas as threads estão ocupadas: a busca
+  e os detalhes passam à frente da exportação.
+- A função da tarefa recebe um `TaskHandle` como primeiro argumento, para consultar
+  `is_cancelled()` e informar progresso (`report_progress`).
+- Resultado, erro, progresso e fim chegam por sinais e são entregues aos callbacks na
+  thread da interface. Tarefas canceladas não entregam resultado nem erro.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# Prioridades (maior = sai antes da fila)
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 0
+
+# Política para uma tarefa com a mesma chave de outra ainda ativa
+COALESCE_JOIN = 'join'
+COALESCE_REPLACE = 'replace'
+
+# Threads do pool: tarefas longas (importação, exportação) não podem travar a busca,
+# mesmo em máquinas com um único núcleo
+MIN_POOL_THREADS = 4
+
+
+class TaskSignals(QObject):
+    """Sinais emitidos pela thread do pool para a thread da interface."""
+    result = pyqtSignal(object, object) # Handle, resultado
+    error = pyqtSignal(object, str) # Handle, mensagem
+    progress = pyqtSignal(object, object) # Handle, dados do progresso
+    finished = pyqtSignal(object) # Handle (sempre emitido, mesmo se cancelada)
+
+
+class TaskHandle:
+    """Referência a uma tarefa enviada: cancelamento e progresso."""
+
+    def __init__(self, key: str, signals: TaskSignals):
+        self.key = key
+        self._signals = signals
+        self._cancelled = threading.Event()
+        self.runnable: Optional[QRunnable] = None
+        self.callbacks: Dict[str, Optional[Callable]] = {}
+
+    def cancel(self):
+        """Marca a tarefa como superada: ela não entrega resultado (o código em execução não é interrompido)."""
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def report_progress(self, payload: Any):
+        """Envia dados de progresso ao callback `on_progress` (chamado pela função da tarefa)."""
+        if not self.is_cancelled():
+            self._signals.progress.emit(self, payload)
+
+
+class _TaskRunnable(QRunnable):
+    """Executa `func(handle, *args, **kwargs)` em uma thread do pool."""
+
+    def __init__(self, handle: TaskHandle, func: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        self.setAutoDelete(False) # O handle mantém a referência até o fim
+        self.handle = handle
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        signals = self.handle._signals
+        try:
+            if self.handle.is_cancelled():
+                return
+            result = self.func(self.handle, *self.args, **self.kwargs)
+            if not self.handle.is_cancelled():
+                signals.result.emit(self.handle, result)
+        except Exception as e:
+            logger.error(f"Erro na tarefa '{self.handle.key}': {e}", exc_info=True)
+            if not self.handle.is_cancelled():
+                signals.error.emit(self.handle, str(e))
+        finally:
+            signals.finished.emit(self.handle)
+
+
+class TaskRunner(QObject):
+    """
+    Executor de tarefas da GUI. Deve ser criado na thread da interface.
+
+    Args:
+        max_threads (Optional[int]): Threads do pool (padrão: o maior entre o número de
+            núcleos e `MIN_POOL_THREADS`).
+    """
+    active_changed = pyqtSignal(int) # Quantidade de tarefas ativas (para indicadores de ocupado)
+
+    def __init__(self, max_threads: Optional[int] = None, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads or max(QThreadPool.globalInstance().maxThreadCount(), MIN_POOL_THREADS))
+        self._active: Dict[str, TaskHandle] = {}
+        self._running = set() # Handles ainda não finalizados (inclusive os substituídos)
+        self._signals = TaskSignals()
+        self._signals.result.connect(self._on_result)
+        self._signals.error.connect(self._on_error)
+        self._signals.progress.connect(self._on_progress)
+        self._signals.finished.connect(self._on_finished)
+
+    def submit(
+        self,
+        key: str,
+        func: Callable,
+        *args,
+        priority: int = PRIORITY_NORMAL,
+        coalesce: str = COALESCE_JOIN,
+        on_result: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[str], None]] = None,
+        on_progress: Optional[Callable[[Any], None]] = None,
+        on_finished: Optional[Callable[[], None]] = None,
+        **kwargs
+    ) -> TaskHandle:
+        """
+        Envia uma tarefa ao pool.
+
+        Args:
+            key (str): Chave para coalescer tarefas repetidas (ex: 'busca', 'detalhes:42').
+            func (Callable): Função executada no pool, chamada como `func(handle, *args, **kwargs)`.
+            priority (int): Prioridade na fila (`PRIORITY_*`).
+            coalesce (str): `COALESCE_JOIN` reaproveita a tarefa ativa de mesma chave;
+                `COALESCE_REPLACE` a cancela e envia a nova.
+            on_result, on_error, on_progress, on_finished: Callbacks executados na thread da
+                interface. `on_finished` é sempre chamado, mesmo para tarefas canceladas.
+
+        Returns:
+            TaskHandle: A tarefa enviada (ou a existente, se coalescida com `COALESCE_JOIN`).
+        """
+        existing = self._active.get(key)
+        if existing is not None and not existing.is_cancelled():
+            if coalesce == COALESCE_JOIN:
+                logger.debug(f"Tarefa '{key}' já ativa: reaproveitada.")
+                return existing
+            self.cancel(key)
+
+        handle = TaskHandle(key, self._signals)
+        handle.callbacks = {
+            'result': on_result, 'error': on_error, 'progress': on_progress, 'finished': on_finished,
+        }
+        handle.runnable = _TaskRunnable(handle, func, args, kwargs)
+        self._active[key] = handle
+        self._running.add(handle)
+        self._pool.start(handle.runnable, priority)
+        self.active_changed.emit(len(self._running))
+        return handle
+
+    def cancel(self, key: str):
+        """Cancela a tarefa ativa com a chave `key`; se ainda estiver na fila, nem chega a rodar."""
+        handle = self._active.pop(key, None)
+        if handle is None:
+            return
+        handle.cancel()
+        if self._pool.tryTake(handle.runnable):
+            logger.debug(f"Tarefa '{key}' retirada da fila.")
+            self._on_finished(handle)
+
+    def is_active(self, key: str) -> bool:
+        """True se há uma tarefa não cancelada com a chave `key`."""
+        return key in self._active
+
+    def active_count(self) -> int:
+        """Quantidade de tarefas ainda não finalizadas (inclusive as canceladas em execução)."""
+        return len(self._running)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Aguarda o fim das tarefas do pool (ex: ao fechar a janela)."""
+        return self._pool.waitForDone(msecs)
+
+    # --- Entrega na thread da interface ---
+
+    @staticmethod
+    def _call(handle: TaskHandle, name: str, *args):
+        callback = handle.callbacks.get(name)
+        if callback is not None:
+            callback(*args)
+
+    def _on_result(self, handle: TaskHandle, result):
+        if not handle.is_cancelled():
+            self._call(handle, 'result', result)
+
+    def _on_error(self, handle: TaskHandle, message: str):
+        if not handle.is_cancelled():
+            self._call(handle, 'error', message)
+
+    def _on_progress(self, handle: TaskHandle, payload):
+        if not handle.is_cancelled():
+            self._call(handle, 'progress', payload)
+
+    def _on_finished(self, handle: TaskHandle):
+        if handle not in self._running:
+            return
+        self._running.discard(handle)
+        if self._active.get(handle.key) is handle:
+            del self._active[handle.key]
+        handle.runnable = None
+        self._call(handle, 'finished')
+        self.active_changed.emit(len(self._running))
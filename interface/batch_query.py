@@ -0,0 +1,107 @@
+# interface/batch_query.py 20250730 160000 (v1.1 - Motor de consulta importado sob demanda)
+"""
+Modo de consulta não interativo (`main.py query "<termos>"`), para cron e scripts.
+
+Filtra direto no SQLite (`core.sql_query`) e escreve cada linha na saída assim que
+ela é lida: nem o DataFrame da base nem as páginas da tabela são montados. Os logs
+vão para stderr; stdout recebe apenas os dados.
+
+Formatos:
+    - tsv: cabeçalho + uma linha por registro; tabulações e quebras de linha dos
+      valores viram espaço e valores nulos ficam vazios.
+    - csv: CSV padrão (módulo csv), com cabeçalho.
+    - ndjson: um objeto JSON por linha, com os nomes internos das colunas.
+"""
+
+import csv
+import json
+import logging
+import sys
+from typing import Iterable, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('tsv', 'ndjson', 'csv')
+# Valores da saída TSV: separadores de campo/registro viram espaço
+_TSV_ESCAPES = str.maketrans({'\t': ' ', '\n': ' ', '\r': ' '})
+
+# Códigos de saída
+EXIT_OK = 0
+EXIT_QUERY_ERROR = 2
+
+
+def _tsv_value(value) -> str:
+    return '' if value is None else str(value).translate(_TSV_ESCAPES)
+
+
+def write_rows(rows: Iterable[tuple], columns: List[str], output_format: str, out: TextIO) -> int:
+    """
+    Escreve as linhas no formato pedido, uma a uma.
+
+    Returns:
+        int: Quantidade de linhas escritas.
+    """
+    count = 0
+    if output_format == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(['' if value is None else value for value in row])
+    elif output_format == 'ndjson':
+        for count, row in enumerate(rows, start=1):
+            out.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + '\n')
+    else:
+        out.write('\t'.join(columns) + '\n')
+        for count, row in enumerate(rows, start=1):
+            out.write('\t'.join(map(_tsv_value, row)) + '\n')
+    return count
+
+
+def run_query(
+    db_path: str,
+    table_name: str,
+    search_terms: List[str],
+    output_format: str = 'tsv',
+    columns: Optional[List[str]] = None,
+    out: Optional[TextIO] = None
+) -> int:
+    """
+    Executa uma consulta e escreve o resultado em `out` (padrão: stdout).
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Tabela consultada.
+        search_terms (List[str]): Termos, como na busca interativa (vírgula = OU, '&' = E).
+        output_format (str): Um de `OUTPUT_FORMATS`.
+        columns (Optional[List[str]]): Colunas de saída (nomes internos); None = todas.
+        out (Optional[TextIO]): Destino dos dados.
+
+    Returns:
+        int: Código de saída do processo (`EXIT_OK` ou `EXIT_QUERY_ERROR`).
+    """
+    # Importação local: o módulo é lido pelo main.py (OUTPUT_FORMATS) sem carregar o pandas
+    from armazenamento.database import get_table_columns
+    from core.search_engine import QueryError
+    from core.sql_query import stream_query
+
+    out = out or sys.stdout
+    table_columns = get_table_columns(db_path, table_name)
+    if not table_columns:
+        logger.error(f"Tabela '{table_name}' não encontrada em '{db_path}'.")
+        return EXIT_QUERY_ERROR
+    columns = columns or table_columns
+    unknown = [col for col in columns if col not in table_columns]
+    if unknown:
+        logger.error(f"Colunas inexistentes: {', '.join(unknown)}. Disponíveis: {', '.join(table_columns)}")
+        return EXIT_QUERY_ERROR
+
+    terms = [term.strip() for raw in search_terms for term in raw.split(',') if term.strip()]
+    try:
+        rows = stream_query(db_path, table_name, terms, columns)
+        count = write_rows(rows, columns, output_format, out)
+    except QueryError as e:
+        logger.error(f"Consulta inválida: {e}")
+        return EXIT_QUERY_ERROR
+    out.flush()
+    logger.info(f"Consulta concluída: {count} linha(s) escritas ({output_format}).")
+    return EXIT_OK
@@ -1,26 +1,31 @@
-# interface/cli.py 20250725 160000 (v5.3 - Refatorado, Command Pattern, Integrado)
+# interface/cli.py 20250801 100000 (v5.9 - Espera da importacao em segundo plano centralizada)
 """
 Interface de Linha de Comando (CLI) para interação com o usuário.
 
 Permite pesquisar, filtrar, ordenar, exportar e visualizar detalhes das SSAs.
+
+Importar o módulo não carrega o pandas: a base, o motor de busca e a tabela são
+importados ao carregar o estado inicial; o ranking e o exportador (openpyxl), só
+quando o comando correspondente é usado.
 """
 
 import os
 import sys
 import logging
-import pandas as pd
-from typing import Tuple, List, Dict, Any
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, List, Dict, Any
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from core.background_import import BackgroundImport
 
 # Adiciona o diretório raiz do projeto ao sys.path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-# Importações relativas
-from armazenamento.database import query_db
-from core.app_logic import run_importer_logic, filter_dataframe
-from core.config_manager import load_settings, handle_config_command
+# Importações relativas (apenas módulos leves; os demais são importados no primeiro uso)
+from core.app_logic import run_importer_logic, filter_dataframe, load_dataset
+from core.config_manager import settings_service, handle_config_command
 from interface.display import pretty_print_details
-from interface.table_printer import pretty_print_df # Importa a versão revisada
 
 # Configura logger específico para este módulo
 logger = logging.getLogger(__name__)
@@ -28,9 +33,13 @@ APP_VERSION = "4.0.0"
 
 # --- Funções Auxiliares Refatoradas ---
 
-def _apply_default_filters(df: pd.DataFrame, settings: dict) -> pd.DataFrame:
+def _show_table(df: 'pd.DataFrame', display_map: dict, settings: dict):
+    """Imprime a tabela paginada (o renderizador e o pandas são importados no primeiro uso)."""
+    from interface.table_printer import pretty_print_df
+    pretty_print_df(df, display_map, settings)
+
+def _apply_default_filters(df: 'pd.DataFrame', settings: dict) -> 'pd.DataFrame':
     """Aplica os filtros padrão definidos nas configurações."""
-    import pandas as pd # Import local para evitar problemas de importacao circular
     default_filters = settings.get("default_filters", [])
     if default_filters:
         logger.debug(f"Aplicando filtros padrão: {default_filters}")
@@ -48,9 +57,18 @@ def _get_initial_state(
     Returns:
         Tuple[pd.DataFrame, List[str]]: DataFrame inicial e lista de termos de filtro.
     """
+    # Primeiro uso da base: carrega pandas e o motor de busca
+    from core.search_engine import PARALLEL_MIN_ROWS, configure_parallel
+
     logger.debug("Carregando estado inicial...")
+    search_settings = settings.get("search_settings", {})
+    configure_parallel(
+        search_settings.get("parallel_workers", 1),
+        search_settings.get("parallel_min_rows", PARALLEL_MIN_ROWS)
+    )
     try:
-        initial_df = query_db(db_path, table_name)
+        # Snapshot da última importação (ou SQL), com texto pesquisável, versão e catálogo
+        initial_df = load_dataset(db_path, table_name)
         initial_df = _apply_default_filters(initial_df, settings)
         default_filter_terms = settings.get("default_filters", [])
         logger.debug("Estado inicial carregado.")
@@ -61,10 +79,26 @@ def _get_initial_state(
         import pandas as pd
         return pd.DataFrame(), []
 
+def _wait_for_background_import(background_import: Optional['BackgroundImport']):
+    """Espera a importação em segundo plano, se ainda estiver rodando (Ctrl+C a abandona e sai)."""
+    if background_import is not None:
+        background_import.wait_or_abandon()
+
+def _reload_state(
+    db_path: str, table_name: str, settings: dict, background_import: Optional['BackgroundImport'] = None
+) -> Tuple['pd.DataFrame', List[str]]:
+    """Recarrega o estado inicial; com importação em segundo plano, espera o fim dela e a marca como vista."""
+    # Ler o banco no meio da importação misturaria tabela, índice de busca e catálogo de versões diferentes
+    _wait_for_background_import(background_import)
+    if background_import is not None:
+        background_import.acknowledge()
+    return _get_initial_state(db_path, table_name, settings)
+
 # --- Handlers de Comandos ---
 
-def _handle_quit():
+def _handle_quit(background_import: Optional['BackgroundImport'] = None):
     """Handler para o comando de sair."""
+    _wait_for_background_import(background_import)
     print("Saindo...")
     sys.exit(0)
 
@@ -81,11 +115,20 @@ Comandos disponíveis:
   -c             : Abre o menu de configurações.
   -ord <Nº>      : Ordena pela coluna de índice <Nº> (crescente).
   -ordi <Nº>     : Ordena pela coluna de índice <Nº> (decrescente).
+  -rank [k]      : Mostra as k SSAs mais relevantes para a última pesquisa (padrão: 50).
   -h             : Mostra esta ajuda.
   -q, sair, exit : Sai do programa.
 Pesquisa:
   Digite um ou mais termos separados por vírgula para filtrar os resultados.
   Exemplo: 'ADM, MEL3, 2025' filtra por Situação ADM, Executor MEL3 ou Nº SSA 2025.
+  Use '&' para exigir todos os termos e '!' para excluir um termo.
+  Exemplo: 'MEL3 & bomba & !ADM' filtra MEL3 com 'bomba' que não estejam em ADM.
+  Intervalos (semana_cadastro, semana_programada, semana_executada, numero_ssa, data_cadastro):
+  Exemplo: 'semana_cadastro:202518..202522', 'numero_ssa>=2025000', 'data_cadastro:30d'.
+  Use '~' para busca aproximada em equipamento/localização (tolera erros de digitação).
+  Exemplo: '~bomab recalqe' encontra 'BOMBA DE RECALQUE'.
+  Use 're:' para expressões regulares ('^' e '$' ancoram em cada coluna; use '|' em vez de vírgula).
+  Exemplo: 're:^MEL[0-9]', 're:bomba.*vazamento'.
 """
     print(help_text)
 
@@ -125,27 +168,35 @@ def _handle_back(results_stack: list):
     else:
         print("Nenhum filtro anterior para restaurar.")
 
-def _handle_reset(db_path: str, table_name: str, results_stack: list, display_map: dict, settings: dict):
+def _handle_reset(
+    db_path: str, table_name: str, results_stack: list, display_map: dict, settings: dict,
+    background_import: Optional['BackgroundImport'] = None
+):
     """Handler para o comando de resetar."""
+    initial_df_reset, initial_filter_terms_reset = _reload_state(db_path, table_name, settings, background_import)
     print("...todos os filtros foram zerados e a base completa (ou com filtros padrão) foi recarregada.")
-    initial_df_reset, initial_filter_terms_reset = _get_initial_state(db_path, table_name, settings)
     results_stack.clear()
     results_stack.append((initial_df_reset, initial_filter_terms_reset))
     # Exibe o novo estado
-    pretty_print_df(results_stack[-1][0], display_map, settings)
+    _show_table(results_stack[-1][0], display_map, settings)
 
-def _handle_rescan(db_path: str, table_name: str, results_stack: list, display_map: dict, settings: dict):
+def _handle_rescan(
+    db_path: str, table_name: str, results_stack: list, display_map: dict, settings: dict,
+    background_import: Optional['BackgroundImport'] = None
+):
     """Handler para o comando de reanalisar."""
+    # Duas importações ao mesmo tempo gravariam os mesmos relatórios duas vezes
+    _wait_for_background_import(background_import)
     print("Forçando reanálise dos relatórios...")
     try:
         if run_importer_logic(force_import=True):
             print("Base de dados atualizada. Recarregando...")
-            initial_df_rescan, initial_filter_terms_rescan = _get_initial_state(db_path, table_name, settings)
+            initial_df_rescan, initial_filter_terms_rescan = _reload_state(db_path, table_name, settings, background_import)
             results_stack.clear()
             results_stack.append((initial_df_rescan, initial_filter_terms_rescan))
             print("Dados recarregados.")
             # Chama a exibição após rescan
-            pretty_print_df(results_stack[-1][0], display_map, settings)
+            _show_table(results_stack[-1][0], display_map, settings)
         else:
             print("Nenhuma alteração detectada durante o rescan.")
     except Exception as e:
@@ -153,6 +204,8 @@ def _handle_rescan(db_path: str, table_name: str, results_stack: list, display_m
 
 def _handle_sort(parts: List[str], results_stack: list, display_map: dict, settings: dict, ascending: bool):
     """Handler para os comandos de ordenação (-ord, -ordi)."""
+    from core.search_engine import take_rows, get_sort_order
+
     current_df, current_filter_terms = results_stack[-1]
     try:
         if len(parts) < 2 or not parts[1].isdigit():
@@ -166,16 +219,36 @@ def _handle_sort(parts: List[str], results_stack: list, display_map: dict, setti
         # Para simplificar esta implementação, vamos ordenar pelas colunas do DataFrame atual.
         if 0 <= col_index <= len(current_df.columns):
             col_name = current_df.columns[col_index - 1] # Ajuste para 1-based index do usuário
-            sorted_df = current_df.sort_values(by=col_name, ascending=ascending, na_position='last')
+            # Permutação em cache por coluna/sentido: alternar -ord/-ordi não reordena de novo
+            sorted_df = take_rows(current_df, get_sort_order(current_df, col_name, ascending))
             # Empilha o resultado ordenado
             results_stack.append((sorted_df, current_filter_terms))
             print(f"Resultados ordenados por '{col_name}' ({'asc' if ascending else 'desc'}).")
-            pretty_print_df(sorted_df, display_map, settings)
+            _show_table(sorted_df, display_map, settings)
         else:
             print("Erro: Índice da coluna inválido.")
     except Exception as e:
         print(f"Erro ao ordenar: {e}")
 
+def _handle_rank(parts: List[str], results_stack: list, display_map: dict, settings: dict):
+    """Handler para o comando de ranking por relevância (-rank [k])."""
+    from core.ranking import rank_positions, DEFAULT_TOP_K
+    from core.search_engine import QueryError, take_rows
+
+    current_df, current_filter_terms = results_stack[-1]
+    if len(parts) > 1 and not parts[1].isdigit():
+        print("Erro: use -rank [k]. Exemplo: -rank 20")
+        return
+    k = int(parts[1]) if len(parts) > 1 else DEFAULT_TOP_K
+    try:
+        ranked_df = take_rows(current_df, rank_positions(current_df, current_filter_terms, k))
+    except QueryError as e:
+        print(f"Erro na consulta: {e}")
+        return
+    results_stack.append((ranked_df, current_filter_terms))
+    print(f"{len(ranked_df)} SSAs mais relevantes de {len(current_df)}.")
+    _show_table(ranked_df, display_map, settings)
+
 # --- Loop Principal Refatorado ---
 
 # Mapeamento de comandos para funções
@@ -195,17 +268,37 @@ COMMAND_HANDLERS = {
     'config': handle_config_command,
 }
 
-def start_cli_loop(db_path: str, table_name: str):
-    """Inicia o loop principal da interface de linha de comando."""
+def start_cli_loop(
+    db_path: str,
+    table_name: str,
+    on_ready: Optional[Callable[[], None]] = None,
+    background_import: Optional['BackgroundImport'] = None
+):
+    """
+    Inicia o loop principal da interface de linha de comando.
+
+    Args:
+        db_path (str): Caminho para o banco de dados.
+        table_name (str): Tabela consultada.
+        on_ready (Optional[Callable[[], None]]): Chamado uma vez, antes do primeiro prompt
+            (ex: para medir o tempo de inicialização).
+        background_import (Optional[BackgroundImport]): Importação de novos relatórios,
+            iniciada assim que a base atual é carregada; o prompt avisa quando ela termina.
+    """
+    from core.search_engine import QueryError
+
     logger.debug("Iniciando loop da CLI...")
     
-    settings = load_settings()
+    settings = settings_service.get()
     display_map = settings.get("display_mappings", {})
     output_dir = os.path.join(project_root, 'docs_saida')
     
     # --- Estado Inicial ---
     initial_df, initial_filter_terms = _get_initial_state(db_path, table_name, settings)
     results_stack = [(initial_df, initial_filter_terms)]
+    if background_import is not None:
+        # A base atual já está na memória: a importação não concorre com a leitura
+        background_import.start()
 
     # --- Exibição Inicial ---
     print(f"\n--- Consulta Rápida de SSAs {APP_VERSION} ---")
@@ -221,20 +314,23 @@ def start_cli_loop(db_path: str, table_name: str):
         print("Pesquisar (virgulas para multiplos termos):")
         
         logger.debug("Chamando pretty_print_df inicial.")
-        pretty_print_df(initial_df, display_map, settings)
+        _show_table(initial_df, display_map, settings)
     else:
         print("Nenhum dado disponível para exibição.")
         # Mesmo com dados vazios, entra no loop para permitir rescan, etc.
         
 
+    if on_ready is not None:
+        on_ready()
+
     # --- Loop Principal ---
     # Comandos que requerem lógica inline ou handlers não mapeados diretamente
-    INLINE_COMMAND_PREFIXES = ['-d', '-detalhe', '-e', '-exportar', '-ord', '-ordi']
+    INLINE_COMMAND_PREFIXES = ['-d', '-detalhe', '-e', '-exportar', '-ord', '-ordi', '-rank']
 
     while True:
         try:
-            # Recarrega configurações a cada iteração para refletir mudanças
-            settings = load_settings() 
+            # Configurações pelo cache: o arquivo só é relido se tiver mudado
+            settings = settings_service.get()
             display_map = settings.get("display_mappings", {}) # Atualiza display_map também
             
             current_df, current_filter_terms = results_stack[-1]
@@ -244,7 +340,9 @@ def start_cli_loop(db_path: str, table_name: str):
             if current_filter_terms:
                 filter_status_runtime_text = f" - Filtro(s) Aplicado(s): {', '.join(current_filter_terms)}"
             
+            notice = background_import.notice() if background_import is not None else None
             prompt_text = (
+                (f"{notice}\n" if notice else "") +
                 f"Filtrando {len(current_df)} SSAs{filter_status_runtime_text}\n"
                 f"Comandos: -d(etalhes), -v(oltar filtro), -e(xportar), -r(eset), -c(onfigurar), -h(elp), -q(uit)\n"
                 f"Pesquisar (virgulas para multiplos termos): "
@@ -261,22 +359,26 @@ def start_cli_loop(db_path: str, table_name: str):
             if command in COMMAND_HANDLERS:
                 handler = COMMAND_HANDLERS[command]
                 # Chama handlers específicos com argumentos
-                if command in ['-v', 'voltar']:
+                if command in ['-q', 'sair', 'exit', 'quit']:
+                    handler(background_import)
+                elif command in ['-v', 'voltar']:
                     handler(results_stack)
                 elif command in ['-r', 'resetar']:
-                    handler(db_path, table_name, results_stack, display_map, settings)
+                    handler(db_path, table_name, results_stack, display_map, settings, background_import)
                 elif command in ['-rescan']:
-                    handler(db_path, table_name, results_stack, display_map, settings)
+                    handler(db_path, table_name, results_stack, display_map, settings, background_import)
                 elif command in ['-c', 'config']:
                      # O handler de config pode modificar settings
                      handler()
                      # Após configurar, força um refresh do estado e exibição
-                     settings = load_settings()
+                     settings = settings_service.get()
                      display_map = settings.get("display_mappings", {})
                      # Recarrega o estado inicial com as novas configurações
-                     initial_df_after_config, initial_filter_terms_after_config = _get_initial_state(db_path, table_name, settings)
+                     initial_df_after_config, initial_filter_terms_after_config = _reload_state(
+                         db_path, table_name, settings, background_import
+                     )
                      results_stack = [(initial_df_after_config, initial_filter_terms_after_config)]
-                     pretty_print_df(initial_df_after_config, display_map, settings)
+                     _show_table(initial_df_after_config, display_map, settings)
                 else:
                     # Handlers simples que não precisam de argumentos específicos do loop
                     handler()
@@ -290,6 +392,8 @@ def start_cli_loop(db_path: str, table_name: str):
                 elif command in ['-ord', '-ordi']:
                     ascending = (command == '-ord')
                     _handle_sort(parts, results_stack, display_map, settings, ascending)
+                elif command == '-rank':
+                    _handle_rank(parts, results_stack, display_map, settings)
             
             # --- 3. Tratamento como Pesquisa/Busca ---
             else:
@@ -297,12 +401,16 @@ def start_cli_loop(db_path: str, table_name: str):
                 search_terms_input = user_input.split(',')
                 processed_search_terms = [term.strip() for term in search_terms_input if term.strip()]
                 if processed_search_terms: # Só filtra se houver termos
-                    new_filtered_df = filter_dataframe(current_df, processed_search_terms)
+                    try:
+                        new_filtered_df = filter_dataframe(current_df, processed_search_terms)
+                    except QueryError as e:
+                        print(f"Erro na consulta: {e}")
+                        continue
                     if new_filtered_df.empty:
                         print("Nenhum resultado encontrado para o filtro. Tente outros termos.")
                     else:
                         results_stack.append((new_filtered_df, processed_search_terms))
-                        pretty_print_df(new_filtered_df, display_map, settings)
+                        _show_table(new_filtered_df, display_map, settings)
                 else:
                     # Se o usuário digitou algo que não é comando nem termo (só espaços?), apenas continua
                     continue
@@ -1,27 +1,20 @@
-# interface/command_handlers.py 20250723 163500 (v1.0 - Funcoes de Tratamento de Comandos)
+# interface/command_handlers.py 20250730 110000 (v1.1 - Configuracoes pelo servico compartilhado)
 import os
-import json
 
 # Importacoes relativas necessarias para as funcoes
 # Supondo que 'config' esta no root do projeto para os settings
 # Isso sera ajustado via sys.path em cli.py/main.py se necessario
-from core.config_manager import load_settings
+from core.config_manager import CONFIG_DIR, settings_service
 
 def _load_mappings_handler(file_name: str) -> dict:
-    """Carrega mapeamentos de configuracao de arquivos JSON."""
-    path = os.path.join('config', file_name)
-    try:
-        with open(path, 'r', encoding='utf-8') as f: return json.load(f)
-    except: return {}
+    """Carrega mapeamentos de configuracao de arquivos JSON (pelo cache do servico de configuracoes)."""
+    return settings_service.load_json(os.path.join(CONFIG_DIR, file_name), default={})
 
 def _save_settings_handler(settings: dict):
-    """Salva as configuracoes atualizadas de volta ao settings.json."""
-    settings_path = os.path.join('config', 'settings.json')
+    """Salva as configuracoes atualizadas (dentro do menu, a gravacao fica para a saida do menu)."""
     try:
-        with open(settings_path, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=4)
-        print(f"Configuracoes salvas em '{settings_path}'.")
-    except IOError as e:
+        settings_service.save(settings)
+    except OSError as e:
         print(f"ERRO: Nao foi possivel salvar as configuracoes. Erro: {e}")
 
 def print_help():
@@ -40,9 +33,25 @@ def print_help():
     print("="*50)
 
 def handle_config_command():
-    """Gerencia o menu de configuracoes interativo."""
+    """
+    Gerencia o menu de configuracoes interativo.
+
+    As alteracoes feitas no menu sao gravadas de uma vez, ao sair dele.
+    """
+    try:
+        with settings_service.batch():
+            _config_menu_loop()
+            changed = settings_service.has_pending_changes()
+    except OSError as e:
+        print(f"ERRO: Nao foi possivel salvar as configuracoes. Erro: {e}")
+        return
+    if changed:
+        print(f"Configuracoes salvas em '{settings_service.settings_file}'.")
+
+def _config_menu_loop():
+    """Laco do menu principal de configuracoes."""
     while True:
-        current_settings = load_settings()
+        current_settings = settings_service.get()
         print("\n" + "="*50 + "\nMENU DE CONFIGURAÇÕES\n" + "="*50)
         print("1. Configuracoes de Exibicao")
         print("2. Preferencias do Usuario")
@@ -1,19 +1,59 @@
-# interface/display.py 20250725 174500 (v10.12 - Tratamento de Erros Aprimorado)
-import pandas as pd
-from typing import Dict, Any
+# interface/display.py 20250730 160000 (v10.13 - Detalhes sem depender do pandas)
+"""
+Exibição dos detalhes de uma SSA.
+
+O módulo não importa o pandas: o layout dos detalhes (`format_details`) também é
+usado pela consulta rápida `main.py ssa <numero>`, que lê o registro direto do
+SQLite. Uma pd.Series só pode chegar aqui se o pandas já estiver carregado.
+"""
+
 import sys
 import logging
+from typing import Any, Dict, Mapping
 
 logger = logging.getLogger(__name__)
 
-# Importa a funcao de impressao de tabela do novo modulo
-# (Assumindo que table_printer.py esteja em interface/table_printer.py)
-# from interface.table_printer import pretty_print_df 
+# Largura da moldura e da coluna de nomes dos campos
+DETAILS_RULE_WIDTH = 50
+DETAILS_LABEL_WIDTH = 25
+# Textos tratados como valor ausente (comparados sem bordas e sem caixa)
+NULL_TEXTS = frozenset(['none', 'nan', ''])
+
+def _is_missing(value: Any) -> bool:
+    """True para None, NaN, NA/NaT do pandas e textos que representam nulo."""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() in NULL_TEXTS
+    try:
+        return bool(value != value)  # NaN e NaT são diferentes de si mesmos
+    except TypeError:
+        return True  # pd.NA: a comparação é ambígua
+
+def format_details(record: Mapping[str, Any], display_map: Dict[str, str]) -> str:
+    """
+    Monta o texto dos detalhes de uma SSA (moldura, número e um campo por linha).
+
+    Args:
+        record (Mapping[str, Any]): Campos da SSA (nome interno -> valor), na ordem de exibição.
+        display_map (Dict[str, str]): Mapeamento de nomes internos para nomes de exibição.
+
+    Returns:
+        str: Texto pronto para impressão (sem quebra de linha final).
+    """
+    rule = "=" * DETAILS_RULE_WIDTH
+    lines = ["", rule, f" DETALHES DA SSA: {record.get('numero_ssa', 'N/A')}", rule]
+    for key, value in record.items():
+        header = display_map.get(key, key)
+        display_value = '-' if _is_missing(value) else str(value)
+        lines.append(f"{header + ':':<{DETAILS_LABEL_WIDTH}} {display_value}")
+    lines.append(rule)
+    return "\n".join(lines)
 
 def pretty_print_details(series: Any, display_map: Dict[str, str]):
     """
     Imprime os detalhes de uma unica linha (SSA) de forma legivel.
-    
+
     Args:
         series (Any): Uma linha do DataFrame (pd.Series) ou um dicionário.
         display_map (Dict[str, str]): Mapeamento de nomes internos para nomes de exibição.
@@ -24,37 +64,18 @@ def pretty_print_details(series: Any, display_map: Dict[str, str]):
         print("Erro: Configuração de exibição inválida.")
         return
 
-    # Tenta converter para Series se for um dicionário
-    if isinstance(series, dict):
-        try:
-            series = pd.Series(series)
-        except Exception as e:
-            logger.error(f"Erro ao converter dict para Series: {e}")
-            print("Erro: Dados da SSA inválidos.")
-            return
-    elif not isinstance(series, pd.Series):
+    # Sem o pandas carregado, o valor não pode ser uma Series: não há por que importá-lo
+    pandas = sys.modules.get('pandas')
+    if pandas is not None and isinstance(series, pandas.Series):
+        series = dict(series.items())
+    elif not isinstance(series, dict):
         logger.error(f"Erro em pretty_print_details: 'series' deve ser pd.Series ou dict, recebido {type(series)}.")
         print("Erro: Formato de dados da SSA inválido.")
         return
 
     # --- Impressão ---
     try:
-        print("\n" + "="*50)
-        ssa_number = series.get('numero_ssa', 'N/A')
-        print(f" DETALHES DA SSA: {ssa_number}")
-        print("="*50)
-        
-        # Itera sobre os itens da Series
-        for key, value in series.items():
-            header = display_map.get(key, key)
-            # Trata valores NA/NaN/nulos de forma mais robusta
-            if pd.isna(value) or value is None or (isinstance(value, str) and value.strip().lower() in ['none', 'nan', '']):
-                display_value = '-'
-            else:
-                display_value = str(value)
-            print(f"{header+':':<25} {display_value}")
-            
-        print("="*50)
+        print(format_details(series, display_map))
     except Exception as e:
         logger.error(f"Erro inesperado em pretty_print_details: {e}")
         print("Erro: Falha ao exibir os detalhes da SSA.")
@@ -0,0 +1,76 @@
+# interface/quick_lookup.py 20250730 160000 (v1.0 - Consulta rapida de uma SSA sem pandas)
+"""
+Consulta rápida de uma única SSA (`main.py ssa <numero>`).
+
+Caminho de inicialização mínimo: só `sqlite3` e módulos leves do projeto são
+importados (nada de pandas, openpyxl ou do importador), a verificação de novos
+relatórios é pulada e a linha é lida pelo índice de `numero_ssa` criado na
+importação. O resultado usa o mesmo layout de `interface.display.pretty_print_details`.
+"""
+
+import os
+import sqlite3
+import logging
+from typing import Dict, List, Optional
+
+from interface.display import format_details
+
+logger = logging.getLogger(__name__)
+
+NUMBER_COLUMN = 'numero_ssa'
+
+# Códigos de saída
+EXIT_OK = 0
+EXIT_NOT_FOUND = 1
+EXIT_ERROR = 2
+
+
+def find_ssas(db_path: str, table_name: str, numero: str) -> Optional[List[Dict]]:
+    """
+    Lê as linhas da SSA `numero` (a mesma SSA pode vir de mais de um relatório).
+
+    O número é passado como texto: a afinidade da coluna o converte para o tipo gravado,
+    e a comparação de igualdade usa o índice da coluna.
+
+    Returns:
+        Optional[List[Dict]]: Linhas encontradas (nome da coluna -> valor), na ordem de
+        rowid; None se o banco ou a coluna `numero_ssa` não existirem.
+    """
+    if not os.path.exists(db_path):
+        logger.error(f"Banco de dados '{db_path}' não encontrado.")
+        return None
+    # Somente leitura: a consulta rápida nunca cria nem altera o banco
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        conn.row_factory = sqlite3.Row
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+        if NUMBER_COLUMN not in columns:
+            logger.error(f"Coluna '{NUMBER_COLUMN}' não encontrada na tabela '{table_name}'. Reimporte os relatórios.")
+            return None
+        cursor = conn.execute(
+            f'SELECT * FROM "{table_name}" WHERE "{NUMBER_COLUMN}" = ? ORDER BY rowid', (numero.strip(),)
+        )
+        return [dict(row) for row in cursor]
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao consultar a SSA {numero}: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def run_lookup(db_path: str, table_name: str, numero: str, display_map: Dict[str, str]) -> int:
+    """
+    Imprime os detalhes da SSA `numero`.
+
+    Returns:
+        int: Código de saída (`EXIT_OK`, `EXIT_NOT_FOUND` ou `EXIT_ERROR`).
+    """
+    rows = find_ssas(db_path, table_name, numero)
+    if rows is None:
+        return EXIT_ERROR
+    if not rows:
+        print(f"SSA {numero} não encontrada.")
+        return EXIT_NOT_FOUND
+    for row in rows:
+        print(format_details(row, display_map))
+    return EXIT_OK
@@ -1,12 +1,47 @@
-# interface/table_printer.py 20250724 160000 (v1.15 - Consolidado Final)
+# interface/table_printer.py 20250802 090000 (v1.20 - NUL nao agrupa textos distintos na sanitizacao)
+"""
+Impressão paginada e formatada de resultados no terminal.
+
+Só as linhas da página prestes a ser exibida são formatadas (sanitização, datas,
+truncamento) e renderizadas: o tempo até a primeira página não depende do tamanho do
+resultado. Páginas já renderizadas ficam em um LRU para a navegação de volta.
+
+A tabela mantém o visual 'presto' do tabulate, mas é desenhada por um renderizador
+próprio de largura fixa: as larguras estimadas uma única vez na seleção de colunas
+valem para todas as páginas, cada linha é montada por um modelo de formatação
+pronto (textos longos são truncados com '...', sem quebra de linha) e cada página é
+escrita com um único `sys.stdout.write`.
+
+Quando a base tem o catálogo de estatísticas da importação associado
+(`core.column_stats`), as larguras vêm do p95 gravado no catálogo; a amostragem
+das primeiras linhas fica apenas para DataFrames sem catálogo.
+"""
 
 import pandas as pd
-from tabulate import tabulate
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
 import os
-import re
+import sys
 import unicodedata
 import math
+import numpy as np
+
+from core.column_stats import display_width
+from core.search_engine import column_stats_of
+
+# Páginas renderizadas mantidas para voltar ('b') sem formatá-las de novo
+PAGE_CACHE_SIZE = 16
+# Textos exibidos como '-' (comparados sem bordas e sem caixa)
+NULL_DISPLAY_TOKENS = frozenset(['none', 'nan', 'nat', ''])
+# Tabela de bytes.translate: caracteres de controle ASCII (0x00-0x1F, 0x7F) viram espaço
+_CONTROL_TO_SPACE = bytes(0x20 if (code < 0x20 or code == 0x7F) else code for code in range(256))
+# Largura das datas exibidas (dd/mm/aaaa), independente do formato armazenado
+DATE_DISPLAY_WIDTH = 10
+# Marcador de texto truncado
+TRUNCATION_MARK = '...'
+# Limites da largura estimada de uma coluna de dados
+MIN_COLUMN_WIDTH = 5
+MAX_COLUMN_WIDTH = 70
 
 def get_terminal_size():
     """Obtem a altura e largura do terminal."""
@@ -17,27 +52,58 @@ def get_terminal_size():
         # Valores padrão conservadores
         return 24, 80
 
+def _first_valid_values(series: pd.Series, count: int) -> pd.Series:
+    """Primeiros `count` valores não nulos, examinando só o início da coluna enquanto bastar."""
+    window = count
+    while True:
+        sample = series.iloc[:window].dropna()
+        if len(sample) >= count or window >= len(series):
+            return sample.head(count)
+        window *= 4
+
 def _estimate_column_width(series: pd.Series, header: str) -> int:
     """Estima a largura necessária para uma coluna."""
     max_header_width = len(str(header))
-    # Amostra para performance
-    sample_data = series.dropna().astype(str).head(100)
+    # Amostra para performance (sem percorrer a coluna inteira)
+    sample_data = _first_valid_values(series, 100).astype(str)
     if len(sample_data) == 0:
         return max_header_width
     # Considera o 95º percentil para evitar outliers muito largos
     max_data_width = sample_data.str.len().quantile(0.95, interpolation='lower')
-    estimated_width = max(max_header_width, int(max_data_width) if pd.notna(max_data_width) else 0, 5)
+    estimated_width = max(max_header_width, int(max_data_width) if pd.notna(max_data_width) else 0, MIN_COLUMN_WIDTH)
     # Limite máximo para evitar colunas extremamente largas
-    return min(estimated_width, 70)
+    return min(estimated_width, MAX_COLUMN_WIDTH)
+
+def _estimate_column_widths(df: pd.DataFrame, display_map: Dict[str, str]) -> Dict[str, int]:
+    """Larguras estimadas de todas as colunas exibíveis (e da numeração '#')."""
+    estimated_widths = {'#': max(4, len(str(len(df))))} # Cabe o maior número de linha
+    catalog = column_stats_of(df)
+    for col in df.columns:
+        if col.startswith('Unnamed:'):
+            continue
+        renamed_col = display_map.get(col, col)
+        if col == 'data_cadastro':
+            estimated_widths[col] = max(len(str(renamed_col)), DATE_DISPLAY_WIDTH)
+        elif col in catalog:
+            estimated_widths[col] = display_width(catalog[col], renamed_col, MAX_COLUMN_WIDTH, MIN_COLUMN_WIDTH)
+        else:
+            estimated_widths[col] = _estimate_column_width(df[col], renamed_col)
+    return estimated_widths
 
 def _select_columns_for_width(
     df: pd.DataFrame,
     display_map: Dict[str, str],
     available_width: int,
     essential_columns: List[str],
-    priority_order: List[str]
+    priority_order: List[str],
+    estimated_widths: Optional[Dict[str, int]] = None
 ) -> list:
-    """Seleciona colunas priorizando as essenciais e distribuindo o espaço."""
+    """
+    Seleciona colunas priorizando as essenciais e distribuindo o espaço.
+
+    `estimated_widths` (de `_estimate_column_widths`) permite reutilizar as larguras na
+    renderização; se omitido, é calculado aqui.
+    """
     valid_cols = [col for col in df.columns if not col.startswith('Unnamed:')]
 
     # Cria lista ordenada: essenciais primeiro, depois prioridade, depois o resto
@@ -59,10 +125,8 @@ def _select_columns_for_width(
             ordered_cols.append(col)
 
     # Calcula larguras estimadas
-    estimated_widths = {'#': 4} # Largura fixa para '#'
-    for col in valid_cols:
-        renamed_col = display_map.get(col, col)
-        estimated_widths[col] = _estimate_column_width(df[col], renamed_col)
+    if estimated_widths is None:
+        estimated_widths = _estimate_column_widths(df, display_map)
 
     selected_columns = ['#'] # Sempre inclui '#'
     total_width = estimated_widths['#'] + 3 # Espaço inicial
@@ -94,6 +158,135 @@ def paginate_dataframe(df: pd.DataFrame, page_size: int):
         end_idx = min(start_idx + page_size, len(df))
         yield df.iloc[start_idx:end_idx]
 
+def _sanitize_display_text(text: str) -> str:
+    """
+    Texto de exibição: ASCII (acentos removidos via NFKD), controles e quebras viram
+    espaço, espaços repetidos colapsados e bordas removidas.
+    """
+    if text.strip().lower() in NULL_DISPLAY_TOKENS:
+        return '-'
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+    return b' '.join(text.encode('ascii', 'ignore').translate(_CONTROL_TO_SPACE).split()).decode('ascii')
+
+def _sanitize_text_column(series: pd.Series) -> pd.Series:
+    """
+    Converte valores de uma coluna de texto para exibição ('-' para nulos, ASCII, sem controles).
+
+    Cada valor distinto é sanitizado uma única vez (pd.factorize) e o resultado é
+    distribuído às linhas por indexação, em vez de quatro `apply` por célula.
+    """
+    null_mask = series.isna().to_numpy()
+    # A tabela hash do pandas corta textos no primeiro NUL ('a\x00b' e 'a' viram um só
+    # valor). O \x01 tem a mesma saída na sanitização (vira espaço e não é removido por
+    # strip), então a troca não altera o texto exibido.
+    texts = series.astype(str).str.replace('\x00', '\x01', regex=False)
+    codes, uniques = pd.factorize(texts)
+    cleaned = np.array([_sanitize_display_text(text) for text in uniques], dtype=object)
+    values = cleaned[codes]
+    values[null_mask] = '-'
+    return pd.Series(values, index=series.index, dtype=object)
+
+def _guess_date_format(series: pd.Series) -> Optional[str]:
+    """Formato de data inferido do primeiro valor válido da coluna inteira (o mesmo para todas as páginas)."""
+    first_valid = _first_valid_values(series, 1)
+    if first_valid.empty or not isinstance(first_valid.iloc[0], str):
+        return None
+    return pd.tseries.api.guess_datetime_format(first_valid.iloc[0])
+
+def _format_number(value) -> str:
+    """Número para exibição: inteiros sem casas decimais, nulos como '-'."""
+    if pd.isna(value):
+        return '-'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _fit_width(text: str, width: int) -> str:
+    """Trunca `text` em `width` caracteres, terminando com '...' quando cortado."""
+    if len(text) <= width:
+        return text
+    return text[:max(0, width - len(TRUNCATION_MARK))] + TRUNCATION_MARK[:width]
+
+class _PageRenderer:
+    """
+    Formata e renderiza as páginas de um DataFrame sob demanda, em largura fixa (visual 'presto').
+
+    Cada página é formatada a partir das suas próprias linhas; as `PAGE_CACHE_SIZE`
+    páginas renderizadas mais recentemente ficam guardadas (LRU).
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        columns: List[str],
+        headers: List[str],
+        widths: List[int],
+        page_size: int,
+    ):
+        self.df = df
+        self.columns = columns
+        self.cols_to_display = [col for col in columns if col != '#']
+        self.headers = headers
+        self.widths = widths
+        self.page_size = page_size
+        self.page_count = math.ceil(len(df) / page_size)
+        self.date_format = None
+        if 'data_cadastro' in self.cols_to_display:
+            self.date_format = _guess_date_format(df['data_cadastro'])
+
+        # Numéricos alinhados à direita (como no tabulate); modelos prontos para cada linha
+        self.numeric = [
+            col == '#' or (col in df.columns and pd.api.types.is_numeric_dtype(df[col])) for col in columns
+        ]
+        self.row_template = ' ' + ' | '.join(
+            f"{{:{'>' if numeric else '<'}{width}}}" for numeric, width in zip(self.numeric, widths)
+        )
+        self.separator = '+'.join('-' * (width + 2) for width in widths)
+        self._pages: 'OrderedDict[int, str]' = OrderedDict()
+
+    def _format_page(self, page_index: int) -> List[List[str]]:
+        """Textos da página, coluna a coluna (com a numeração '#'), já ajustados às larguras."""
+        start = page_index * self.page_size
+        page_df = self.df.iloc[start:start + self.page_size][self.cols_to_display].copy()
+
+        # Formatação específica para data_cadastro
+        if 'data_cadastro' in page_df.columns:
+            page_df['data_cadastro'] = pd.to_datetime(
+                page_df['data_cadastro'], format=self.date_format, errors='coerce'
+            ).dt.strftime('%d/%m/%Y')
+
+        formatted = []
+        for col, numeric, width in zip(self.columns, self.numeric, self.widths):
+            if col == '#':
+                # Numeração global das linhas
+                texts = [str(number) for number in range(start + 1, start + len(page_df) + 1)]
+            elif numeric:
+                texts = [_format_number(value) for value in page_df[col]]
+            else:
+                # Sanitização agressiva de strings
+                texts = _sanitize_text_column(page_df[col].astype(object)).tolist()
+            formatted.append([_fit_width(text, width) for text in texts])
+        return formatted
+
+    def render(self, page_index: int) -> str:
+        """Tabela da página `page_index` (0-based), com cabeçalho apenas na primeira."""
+        if page_index in self._pages:
+            self._pages.move_to_end(page_index)
+            return self._pages[page_index]
+        lines = []
+        if page_index == 0: # Cabeçalho só na 1ª
+            headers = [_fit_width(header, width) for header, width in zip(self.headers, self.widths)]
+            lines.append(self.row_template.format(*headers))
+            lines.append(self.separator)
+        template = self.row_template.format
+        lines.extend(template(*row) for row in zip(*self._format_page(page_index)))
+        table = '\n'.join(line.rstrip() for line in lines)
+        self._pages[page_index] = table
+        if len(self._pages) > PAGE_CACHE_SIZE:
+            self._pages.popitem(last=False)
+        return table
+
 def pretty_print_df(df: pd.DataFrame, display_map: Dict[str, str], settings: dict):
     """Imprime o DataFrame de forma paginada e formatada."""
     if df.empty:
@@ -124,8 +317,11 @@ def pretty_print_df(df: pd.DataFrame, display_map: Dict[str, str], settings: dic
     ]
 
     # --- Seleção Inteligente de Colunas ---
+    # Larguras estimadas uma única vez: usadas na seleção e em todas as páginas
+    estimated_widths = _estimate_column_widths(df, display_map)
     selected_cols = _select_columns_for_width(
-        df, display_map, available_width, essential_columns_in_order, subsequent_priority
+        df, display_map, available_width, essential_columns_in_order, subsequent_priority,
+        estimated_widths
     )
 
     if not selected_cols or (len(selected_cols) == 1 and selected_cols[0] == '#'):
@@ -137,137 +333,67 @@ def pretty_print_df(df: pd.DataFrame, display_map: Dict[str, str], settings: dic
         print("Nenhuma coluna de dados para exibição foi encontrada.")
         return
 
-    # --- Processamento Inicial dos Dados ---
-    working_df = df[cols_to_display].copy()
-
-    # Formatação específica para data_cadastro
-    if 'data_cadastro' in working_df.columns:
-        working_df['data_cadastro'] = pd.to_datetime(working_df['data_cadastro'], errors='coerce').dt.strftime('%d/%m/%Y')
-
-    # Sanitização agressiva de strings
-    for col in working_df.columns:
-        if pd.api.types.is_object_dtype(working_df[col]) or pd.api.types.is_string_dtype(working_df[col]):
-            # Converte para string, substitui valores nulos/inválidos
-            working_df[col] = working_df[col].apply(
-                lambda x: '-' if pd.isna(x) or str(x).strip().lower() in ['none', 'nan', 'nat', ''] else str(x)
-            )
-            # Normalização Unicode
-            working_df[col] = working_df[col].apply(
-                lambda x: unicodedata.normalize('NFKD', x).encode('ascii', 'ignore').decode('utf-8')
-            )
-            # Remove caracteres de controle e substitui quebras por espaço
-            working_df[col] = working_df[col].apply(
-                lambda x: re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\n\r\t]+', ' ', x)
-            )
-            # Normaliza espaços e remove bordas
-            working_df[col] = working_df[col].str.replace(r'\s+', ' ', regex=True).str.strip()
-
-    # Truncar colunas de descrição de forma mais inteligente
-    cols_to_truncate = ['descricao_ssa', 'descricao_execucao']
-    for col in cols_to_truncate:
-        if col in working_df.columns:
-             # Calcula largura máxima com base no espaço disponível e número de colunas
-             # Prioriza um mínimo de 30 caracteres para descrições
-             base_width = max(30, (terminal_width // max(2, len(cols_to_display))))
-             max_len = min(base_width, 100) # Limite máximo
-             working_df[col] = working_df[col].str.slice(0, max_len) + '...'
-
     # --- Preparação Final para Exibição ---
-    # Adiciona coluna de índice
-    working_df.insert(0, '#', range(1, len(working_df) + 1))
-    
-    # Renomeia colunas para exibição
-    renamed_columns = {'#': '#'}
-    for internal_col in cols_to_display:
-        renamed_columns[internal_col] = display_map.get(internal_col, internal_col)
-    working_df.rename(columns=renamed_columns, inplace=True)
-
-    # Prepara cabeçalhos e larguras para `tabulate`
-    final_headers = [renamed_columns.get(col, col) for col in selected_cols]
-    
-    # Calcula larguras máximas para `tabulate`
-    # Tenta distribuir o espaço igualmente, mas respeita limites
-    num_cols = len(final_headers)
-    # Espaço médio por coluna, com mínimo e máximo
-    avg_width_per_col = max(8, min(50, (terminal_width - 10) // max(1, num_cols)))
-    final_max_widths = [avg_width_per_col] * num_cols
-    # Ajusta colunas específicas se necessário
-    # Por exemplo, dá um pouco mais de espaço para descrições se elas estiverem presentes
-    desc_indices = [i for i, h in enumerate(final_headers) if 'descricao' in h.lower()]
-    if desc_indices:
-        extra_space = 10 # Espaço extra total para descrições
-        extra_per_desc = extra_space // len(desc_indices)
-        for i in desc_indices:
-            final_max_widths[i] = min(60, final_max_widths[i] + extra_per_desc)
-
+    # Cabeçalhos com nomes de exibição
+    final_headers = ['#'] + [display_map.get(col, col) for col in cols_to_display]
+    # Uma coluna forçada (não coube) é limitada à largura disponível
+    data_width_limit = max(5, available_width - estimated_widths['#'] - 6)
+    final_widths = [estimated_widths['#']] + [
+        min(estimated_widths.get(col, 10), data_width_limit) for col in cols_to_display
+    ]
 
     # --- Paginação ---
     page_size_data_lines = max(1, terminal_height - 5) # Linhas para dados
     auto_scroll = settings.get('user_preferences', {}).get('auto_scroll_to_end', False)
-    
+
+    # Páginas formatadas e renderizadas apenas quando exibidas
+    renderer = _PageRenderer(df, selected_cols, final_headers, final_widths, page_size_data_lines)
+    total_pages = renderer.page_count
+
     # Controle de auto-scroll para muitas páginas
-    total_pages = math.ceil(len(working_df) / page_size_data_lines) if page_size_data_lines > 0 else 1
     max_auto_scroll_pages = settings.get('display_settings', {}).get('max_auto_scroll_pages', 3)
-    
     if auto_scroll and total_pages > max_auto_scroll_pages:
-        # print(f"Aviso: Muitas páginas ({total_pages}). Scroll automático desativado temporariamente.")
-        # print("Use o comando 'f' após a primeira página se desejar rolar até o final.")
         auto_scroll = False # Desativa silenciosamente ou com aviso sutil
 
-    # Gera páginas
-    page_generator = paginate_dataframe(working_df, page_size_data_lines)
-    pages = list(page_generator)
-
-    if not pages:
-        print("Nenhum dado para exibir após o processamento.")
-        return
-
     # Loop de exibição
     current_page_index = 0
-    while current_page_index < len(pages):
+    while current_page_index < total_pages:
         try:
-            current_page_df = pages[current_page_index]
-            
-            # Gera e imprime a tabela para a página atual
-            page_table_str = tabulate(
-                current_page_df,
-                headers=final_headers if current_page_index == 0 else [], # Cabeçalho só na 1ª
-                tablefmt='presto',
-                showindex=False,
-                maxcolwidths=final_max_widths
-            )
-            print(page_table_str)
+            # Gera (ou reaproveita) e escreve a página atual de uma só vez
+            sys.stdout.write(renderer.render(current_page_index) + '\n')
 
             current_page_index += 1
 
             # Verifica se há mais páginas
-            if current_page_index < len(pages):
+            if current_page_index < total_pages:
                 if auto_scroll:
                     continue # Vai para a próxima página automaticamente
+                prompt_text = (
+                    f"\n-- Página {current_page_index} de {total_pages} | "
+                    "Enter: continuar, 'b': voltar, 'f': até o final, 'q': sair --"
+                )
+                try:
+                    user_input = input(prompt_text).strip().lower()
+                except KeyboardInterrupt:
+                    print("\n...exibição interrompida.")
+                    break
+
+                if user_input == 'q':
+                    print("\n...exibição interrompida.")
+                    break
+                elif user_input == 'f':
+                    auto_scroll = True # Ativa scroll automático para o restante
+                elif user_input == 'b':
+                    current_page_index = max(0, current_page_index - 2) # Página anterior
+                elif user_input == '':
+                    continue # Vai para a próxima página
                 else:
-                    remaining_pages = len(pages) - current_page_index
-                    prompt_text = f"\n-- Mais ({remaining_pages} pág. restante(s)) | Enter: continuar, 'f': até o final, 'q': sair --"
-                    try:
-                        user_input = input(prompt_text).strip().lower()
-                    except KeyboardInterrupt:
-                        print("\n...exibição interrompida.")
-                        break
-
-                    if user_input == 'q':
-                        print("\n...exibição interrompida.")
-                        break
-                    elif user_input == 'f':
-                        auto_scroll = True # Ativa scroll automático para o restante
-                    elif user_input == '':
-                        continue # Vai para a próxima página
-                    else:
-                        print("Comando inválido.")
-                        current_page_index -= 1 # Refaz a página atual
+                    print("Comando inválido.")
+                    current_page_index -= 1 # Refaz a página atual
 
         except KeyboardInterrupt:
             print("\n...exibição interrompida.")
             break
         except Exception as e:
             # Erro silencioso ou log simples para não quebrar a interface
-            # print(f"\nErro durante exibição página {current_page_index + 1}: {e}")
             current_page_index += 1 # Tenta continuar com a próxima página
@@ -1,14 +1,28 @@
-# main.py 20250725 100000 (v2.0 - Refatorado com argparse, logging, função main)
+# main.py 20250801 100000 (v2.5 - Toda saida da CLI espera a importacao em segundo plano)
 """
 Ponto de entrada da aplicação de Consulta Rápida de SSAs.
 
 Orquestra a preparação do ambiente, verificação de arquivos, importação de dados
 e inicialização da interface de linha de comando.
+
+Uso:
+    python main.py                                   # CLI interativa
+    python main.py --background-import               # CLI na base atual; importa em segundo plano
+    python main.py query "MEL3 & !ADM" --format ndjson --columns numero_ssa,situacao
+    python main.py ssa 202511031                     # Detalhes de uma SSA (sem importação)
+
+Os módulos pesados (pandas, importador, CLI) são importados apenas depois da leitura
+dos argumentos, para que `ssa` não pague por eles. Com `--log-level DEBUG`, o tempo de
+inicialização a frio (importações, verificação de relatórios e primeiro prompt) é registrado.
 """
 
+import time
+_START = time.perf_counter()  # Referência do tempo de inicialização a frio
+
 import os
 import sys
 import argparse
+import contextlib
 import logging
 from datetime import datetime
 
@@ -25,12 +39,19 @@ logger = logging.getLogger(__name__)
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
+# Apenas módulos leves aqui (sem pandas): ver `ssa` em main()
 from utils import setup_project_structure
-from core.app_logic import run_importer_logic
-from interface.cli import start_cli_loop
-from core.config_manager import ensure_default_settings
+from interface.batch_query import OUTPUT_FORMATS
+from core.config_manager import ensure_default_settings, settings_service
 
 APP_VERSION = "4.0.0"
+DB_PATH = os.path.join(project_root, 'data', 'ssas.db')
+TABLE_NAME = 'ssas'
+DISPLAY_MAPPINGS_PATH = os.path.join(project_root, 'config', 'display_mappings.json')
+
+def _elapsed_ms() -> float:
+    """Milissegundos desde o carregamento deste módulo."""
+    return (time.perf_counter() - _START) * 1000
 
 def main(cli_args=None):
     """
@@ -49,48 +70,113 @@ def main(cli_args=None):
         action='store_true',
         help='Força a reimportação de todos os arquivos Excel, ignorando o cache.'
     )
+    parser.add_argument(
+        '--background-import',
+        action='store_true',
+        help='Abre a CLI na base atual e importa os relatórios novos em segundo plano\n'
+             '(apenas no modo interativo; o prompt avisa quando terminar).'
+    )
     parser.add_argument(
         '--log-level',
         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
         default='INFO',
         help='Define o nível de detalhe dos logs (padrão: INFO)'
     )
+    subparsers = parser.add_subparsers(dest='command', metavar='comando')
+    query_parser = subparsers.add_parser(
+        'query',
+        help='Consulta não interativa: importa novidades, filtra e escreve o resultado em stdout.'
+    )
+    query_parser.add_argument(
+        'terms', nargs='+',
+        help="Termos de busca, com a mesma sintaxe da CLI (vírgula = OU, '&' = E, '!' = NÃO)."
+    )
+    query_parser.add_argument(
+        '--format', choices=OUTPUT_FORMATS, default='tsv',
+        help='Formato da saída (padrão: tsv).'
+    )
+    query_parser.add_argument(
+        '--columns',
+        help='Colunas da saída, pelos nomes internos e separadas por vírgula (padrão: todas).'
+    )
+    ssa_parser = subparsers.add_parser(
+        'ssa',
+        help='Mostra os detalhes de uma SSA direto do banco, sem verificar novos relatórios.'
+    )
+    ssa_parser.add_argument('numero', help='Número da SSA.')
     # Permite que argparse use `cli_args` para testes
     args = parser.parse_args(cli_args) if cli_args is not None else parser.parse_args()
     
     # Atualiza o nível de log com base no argumento
     logger.setLevel(getattr(logging, args.log_level))
 
+    if args.command == 'ssa':
+        # Caminho rápido: só sqlite3, sem preparação de pastas nem importação
+        from interface.quick_lookup import run_lookup
+        display_map = settings_service.load_json(DISPLAY_MAPPINGS_PATH, default={})
+        sys.exit(run_lookup(DB_PATH, TABLE_NAME, args.numero, display_map))
+
+    # Módulos pesados (pandas, openpyxl pelo importador), carregados só aqui
+    from core.app_logic import run_importer_logic
+    from interface.cli import start_cli_loop
+    logger.debug(f"Inicialização a frio: módulos carregados em {_elapsed_ms():.0f} ms.")
+
     logger.info("=" * 50)
     logger.info(f" Iniciando Consulta Rapida de SSAs {APP_VERSION} ")
     logger.info("=" * 50)
 
+    # No modo query, stdout é reservado aos dados: mensagens da preparação e da importação vão para stderr
+    quiet_stdout = contextlib.redirect_stdout(sys.stderr) if args.command == 'query' else contextlib.nullcontext()
+
     try:
-        # --- 1. Preparação do Ambiente ---
-        logger.debug("Verificando/criando estrutura de pastas...")
-        setup_project_structure.setup_dirs()
-        logger.info("Estrutura de pastas verificada.")
-
-        # --- 2. Configuração ---
-        logger.debug("Garantindo configurações padrão...")
-        ensure_default_settings()
-        logger.debug("Configurações padrão verificadas.")
-
-        # --- 3. Importação de Dados ---
-        # Determina se a reimportação é forçada
-        force_import = args.force_rescan
-        logger.info(f"Iniciando processo de importação (force_rescan={force_import})...")
-        db_updated = run_importer_logic(force_import=force_import)
-        if db_updated:
-            logger.info("Banco de dados atualizado com sucesso.")
-        else:
-            logger.info("Nenhum novo ou modificado relatório encontrado.")
+        with quiet_stdout:
+            # --- 1. Preparação do Ambiente ---
+            logger.debug("Verificando/criando estrutura de pastas...")
+            setup_project_structure.setup_dirs()
+            logger.info("Estrutura de pastas verificada.")
+
+            # --- 2. Configuração ---
+            logger.debug("Garantindo configurações padrão...")
+            ensure_default_settings()
+            logger.debug("Configurações padrão verificadas.")
+
+            # --- 3. Importação de Dados ---
+            # Determina se a reimportação é forçada
+            force_import = args.force_rescan
+            background_import = None
+            if args.background_import and args.command is None:
+                # A CLI abre na base atual; a importação começa assim que ela for carregada
+                from core.background_import import BackgroundImport
+                background_import = BackgroundImport(force_import=force_import)
+                logger.info(f"Importação em segundo plano agendada (force_rescan={force_import}).")
+            else:
+                logger.info(f"Iniciando processo de importação (force_rescan={force_import})...")
+                db_updated = run_importer_logic(force_import=force_import)
+                if db_updated:
+                    logger.info("Banco de dados atualizado com sucesso.")
+                else:
+                    logger.info("Nenhum novo ou modificado relatório encontrado.")
+                logger.debug(f"Inicialização a frio: verificação de relatórios concluída em {_elapsed_ms():.0f} ms.")
 
         # --- 4. Início da CLI ---
-        db_path = os.path.join(project_root, 'data', 'ssas.db')
-        table_name = 'ssas'
+        db_path = DB_PATH
+        table_name = TABLE_NAME
+        if args.command == 'query':
+            columns = [col.strip() for col in args.columns.split(',') if col.strip()] if args.columns else None
+            sys.exit(_run_query_command(db_path, table_name, args.terms, args.format, columns))
         logger.info("Iniciando interface de linha de comando...")
-        start_cli_loop(db_path, table_name)
+        try:
+            start_cli_loop(
+                db_path, table_name,
+                on_ready=lambda: logger.debug(f"Inicialização a frio: primeiro prompt em {_elapsed_ms():.0f} ms."),
+                background_import=background_import
+            )
+        finally:
+            # Qualquer saída (-q, Ctrl+C, erro inesperado) espera a importação, avisando no console;
+            # um segundo Ctrl+C a abandona
+            if background_import is not None:
+                with contextlib.suppress(KeyboardInterrupt):
+                    background_import.wait_or_abandon()
 
     except KeyboardInterrupt:
         logger.info("\nOperação interrompida pelo usuário. Saindo...")
@@ -101,6 +187,16 @@ def main(cli_args=None):
 
     logger.info("Aplicação encerrada normalmente.")
 
+def _run_query_command(db_path, table_name, terms, output_format, columns) -> int:
+    """Executa o subcomando query; uma saída fechada antes do fim (ex: `| head`) não é erro."""
+    from interface.batch_query import run_query
+    try:
+        return run_query(db_path, table_name, terms, output_format, columns)
+    except BrokenPipeError:
+        # Evita o segundo BrokenPipeError ao fechar o stdout na saída do interpretador
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
 if __name__ == "__main__":
     # Permite que o script seja executado diretamente
     main()
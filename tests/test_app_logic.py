@@ -0,0 +1,43 @@
+# tests/test_app_logic.py
+"""
+Testes unitários para a importação de relatórios em core.app_logic.
+"""
+
+import pandas as pd
+import os
+import sys
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from core.app_logic import run_importer_logic
+
+# --- Testes ---
+
+def test_run_importer_logic_reports_progress(tmp_path):
+    """
+    Testa se a importação informa o progresso por arquivo, por planilha e dos índices.
+    """
+    # 1. Preparação: um relatório com duas planilhas
+    docs_dir = tmp_path / 'docs_entrada'
+    docs_dir.mkdir()
+    with pd.ExcelWriter(docs_dir / 'relatorio.xlsx') as writer:
+        pd.DataFrame({'Número da SSA': [1, 2], 'Situação': ['ADM', 'APG']}).to_excel(writer, sheet_name='A', index=False)
+        pd.DataFrame({'Número da SSA': [3], 'Situação': ['ADM']}).to_excel(writer, sheet_name='B', index=False)
+    events = []
+
+    # 2. Ação
+    updated = run_importer_logic(
+        docs_dir=str(docs_dir), data_dir=str(tmp_path / 'data'),
+        progress_callback=lambda *event: events.append(event)
+    )
+
+    # 3. Verificação
+    assert updated
+    assert events == [
+        ('arquivo', 1, 1, 'relatorio.xlsx'),
+        ('planilha', 1, 2, 'A'),
+        ('planilha', 2, 2, 'B'),
+        ('indices', 0, 1, 'Atualizando índices de busca'),
+    ]
@@ -0,0 +1,144 @@
+# tests/test_background_import.py
+"""
+Testes unitários para a importação em segundo plano (core.background_import) e seu uso pela CLI.
+"""
+
+import pytest
+import logging
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from core.background_import import BackgroundImport
+from interface import cli
+
+# --- Fixtures ---
+
+class _ListHandler(logging.Handler):
+    """Guarda as mensagens que passam pelos filtros do handler."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+@pytest.fixture
+def root_handler():
+    """Handler temporário no logger raiz (onde a importação silencia as próprias mensagens)."""
+    handler = _ListHandler()
+    root = logging.getLogger()
+    previous_level = root.level
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    yield handler
+    root.removeHandler(handler)
+    root.setLevel(previous_level)
+
+# --- Testes ---
+
+def test_notice_after_import():
+    """O aviso só aparece quando a importação termina, com a contagem, até ser reconhecido."""
+    release = threading.Event()
+
+    def importer(force_import):
+        release.wait(5)
+        return ['a.xlsx', 'b.xlsx']
+
+    job = BackgroundImport(importer=importer)
+    assert job.notice() is None and job.wait()
+    assert job.start() and not job.start()
+    assert job.is_running() and job.notice() is None
+    release.set()
+    assert job.wait(5)
+    assert job.notice() == "2 novos relatórios importados — digite -r para atualizar"
+    job.acknowledge()
+    assert job.notice() is None
+
+@pytest.mark.parametrize('imported, expected', [
+    (['a.xlsx'], "1 novo relatório importado — digite -r para atualizar"),
+    ([], None),
+])
+def test_notice_counts(imported, expected):
+    """Singular para um relatório; nada a avisar quando nenhum relatório é novo."""
+    job = BackgroundImport(importer=lambda force_import: imported)
+    job.start()
+    job.wait(5)
+    assert job.notice() == expected
+
+def test_import_error_is_reported(root_handler):
+    """Um erro na importação vira aviso no prompt, sem derrubar a CLI."""
+    def importer(force_import):
+        raise RuntimeError("planilha corrompida")
+
+    job = BackgroundImport(importer=importer)
+    job.start()
+    job.wait(5)
+    assert job.imported == [] and isinstance(job.error, RuntimeError)
+    assert "planilha corrompida" in job.notice()
+    assert any("planilha corrompida" in message for message in root_handler.messages)
+
+def test_import_info_logs_are_quiet(root_handler):
+    """INFO da thread da importação não chega ao console; avisos e as demais threads, sim."""
+    def importer(force_import):
+        logging.getLogger('core.app_logic').info("importando relatorio")
+        logging.getLogger('core.app_logic').warning("planilha sem dados")
+        return []
+
+    job = BackgroundImport(force_import=True, importer=importer)
+    job.start()
+    job.wait(5)
+    logging.getLogger('interface.cli').info("mensagem da CLI")
+    assert root_handler.messages == ["planilha sem dados", "mensagem da CLI"]
+    assert root_handler.filters == []
+
+def test_cli_reload_waits_for_import():
+    """-r durante a importação espera o fim dela, recarrega a base e apaga o aviso."""
+    release = threading.Event()
+    job = BackgroundImport(importer=lambda force_import: release.wait(5) and ['a.xlsx'])
+    job.start()
+    threading.Timer(0.05, release.set).start()
+    with patch.object(cli, '_get_initial_state', return_value=('df', [])) as mock_state:
+        assert cli._reload_state('ssas.db', 'ssas', {}, job) == ('df', [])
+    mock_state.assert_called_once()
+    assert not job.is_running()
+    assert job.notice() is None
+
+def test_wait_or_abandon(capsys):
+    """A espera avisa no console; Ctrl+C a abandona e as esperas seguintes não bloqueiam."""
+    release = threading.Event()
+    job = BackgroundImport(importer=lambda force_import: release.wait(5) and [])
+    job.start()
+    with patch.object(job, 'wait', side_effect=KeyboardInterrupt), pytest.raises(KeyboardInterrupt):
+        job.wait_or_abandon()
+    assert job.abandoned and job.is_running()
+    assert "Aguardando a importação" in capsys.readouterr().out
+    job.wait_or_abandon()  # Já abandonada: retorna sem esperar
+    release.set()
+    assert job.wait(5)
+
+def test_main_waits_for_import_on_unexpected_exit(capsys):
+    """Saídas fora do -q (ex: erro inesperado na CLI) também esperam a importação, com aviso."""
+    import main
+    release = threading.Event()
+    job = BackgroundImport(importer=lambda force_import: release.wait(5) and [])
+
+    def failing_cli_loop(db_path, table_name, on_ready=None, background_import=None):
+        background_import.start()
+        threading.Timer(0.05, release.set).start()
+        sys.exit(1)
+
+    with patch('core.background_import.BackgroundImport', return_value=job), \
+         patch('interface.cli.start_cli_loop', side_effect=failing_cli_loop), \
+         patch('main.setup_project_structure.setup_dirs'), patch('main.ensure_default_settings'), \
+         pytest.raises(SystemExit) as exit_info:
+        main.main(['--background-import'])
+    assert exit_info.value.code == 1
+    assert not job.is_running()
+    assert "Aguardando a importação" in capsys.readouterr().out
@@ -0,0 +1,78 @@
+# tests/test_batch_query.py
+"""
+Testes unitários para o modo de consulta não interativo (interface.batch_query / core.sql_query).
+"""
+
+import pytest
+import pandas as pd
+import json
+import os
+import sys
+from io import StringIO
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from armazenamento.database import insert_dataframe_to_db, rebuild_search_index, query_db
+from core.app_logic import filter_view
+from core.sql_query import stream_query
+from interface.batch_query import run_query, EXIT_OK, EXIT_QUERY_ERROR
+
+# --- Fixtures ---
+
+@pytest.fixture
+def indexed_db(tmp_path):
+    """Banco temporário com a tabela 'ssas' e a tabela-sombra de busca."""
+    db_path = str(tmp_path / 'ssas.db')
+    df = pd.DataFrame({
+        'numero_ssa': [2025001, 2025002, 2025003, None],
+        'setor_executor': ['MEL3', 'MEL3', 'IEE3', 'IEQ1'],
+        'situacao': ['ADM', 'APG', 'ADM', None],
+        'descricao_ssa': ['Bomba com vazamento', 'Execução\tparcial', 'Painel CISCO', 'Falha no painel'],
+        'data_cadastro': ['2025-06-01 08:00:00', '2025-06-15', '2025-07-01 09:00:00', None],  # Formatos misturados
+    })
+    insert_dataframe_to_db(df, db_path, 'ssas')
+    rebuild_search_index(db_path, 'ssas')
+    return db_path
+
+# --- Testes ---
+
+@pytest.mark.parametrize('terms', [
+    ['mel3 & !adm'],
+    ['execucao', 'iee3'],
+    ['re:^iee|^ieq'],
+    ['numero_ssa>=2025002'],
+    ['!numero_ssa>=2025002'],
+    ['data_cadastro:01/06/2025..15/06/2025'],
+    ['!data_cadastro<15/06/2025 & painel'],
+])
+def test_stream_query_matches_in_memory_search(indexed_db, terms):
+    """A consulta traduzida para SQL retorna as mesmas linhas, na mesma ordem, que a busca em memória."""
+    df = query_db(indexed_db, 'ssas')
+    expected = df['setor_executor'].iloc[filter_view(df, terms)].tolist()
+    assert [row[0] for row in stream_query(indexed_db, 'ssas', terms, ['setor_executor'])] == expected
+
+def test_run_query_formats(indexed_db):
+    """TSV escapa tabulações e deixa nulos vazios; NDJSON usa os nomes internos das colunas."""
+    out = StringIO()
+    assert run_query(indexed_db, 'ssas', ['mel3'], 'tsv', ['setor_executor', 'descricao_ssa'], out) == EXIT_OK
+    assert out.getvalue().splitlines() == [
+        'setor_executor\tdescricao_ssa', 'MEL3\tBomba com vazamento', 'MEL3\tExecução parcial'
+    ]
+
+    out = StringIO()
+    assert run_query(indexed_db, 'ssas', ['ieq1'], 'ndjson', ['setor_executor', 'situacao'], out) == EXIT_OK
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [{'setor_executor': 'IEQ1', 'situacao': None}]
+
+    out = StringIO()
+    assert run_query(indexed_db, 'ssas', ['adm, ieq1'], 'csv', ['numero_ssa'], out) == EXIT_OK
+    assert out.getvalue().splitlines() == ['numero_ssa', '2025001.0', '2025003.0', '""']
+
+def test_run_query_errors(indexed_db):
+    """Colunas inexistentes e consultas inválidas retornam código de erro, sem escrever dados."""
+    out = StringIO()
+    assert run_query(indexed_db, 'ssas', ['mel3'], 'tsv', ['inexistente'], out) == EXIT_QUERY_ERROR
+    assert run_query(indexed_db, 'ssas', ['re:('], 'tsv', None, out) == EXIT_QUERY_ERROR
+    assert run_query(indexed_db, 'ssas', ['!semana_cadastro:202518..202522'], 'tsv', None, out) == EXIT_QUERY_ERROR
+    assert out.getvalue() == ''
@@ -0,0 +1,107 @@
+# tests/test_config_manager.py
+"""
+Testes unitários para o módulo core.config_manager.
+"""
+
+import pytest
+import json
+import os
+import sys
+from unittest.mock import patch
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from core.config_manager import SettingsService, write_json_atomic
+
+# --- Fixtures ---
+
+@pytest.fixture
+def service(tmp_path):
+    """Serviço sobre arquivos de configuração temporários."""
+    settings_file = tmp_path / 'settings.json'
+    settings_file.write_text(json.dumps({'user_preferences': {'auto_scroll_to_end': False}}), encoding='utf-8')
+    return SettingsService(str(settings_file), str(tmp_path / 'default_settings.json'))
+
+# --- Testes ---
+
+def test_get_uses_cache_until_file_changes(service):
+    """O arquivo só é relido quando a assinatura (inode/mtime/tamanho) muda."""
+    first = service.get()
+    with patch('builtins.open', side_effect=AssertionError("não deveria reler")):
+        assert service.get() == first
+
+    # Edição externa: a troca do arquivo é percebida na próxima leitura
+    write_json_atomic(service.settings_file, {'user_preferences': {'auto_scroll_to_end': True}})
+    assert service.get()['user_preferences']['auto_scroll_to_end'] is True
+
+def test_get_falls_back_to_defaults(tmp_path):
+    """Sem o arquivo do usuário, lê o padrão; sem nenhum dos dois, propaga o erro."""
+    default_file = tmp_path / 'default_settings.json'
+    service = SettingsService(str(tmp_path / 'settings.json'), str(default_file))
+    with pytest.raises(FileNotFoundError):
+        service.get()
+    default_file.write_text('{"default_filters": ["MEL3"]}', encoding='utf-8')
+    assert service.get() == {'default_filters': ['MEL3']}
+
+def test_save_is_atomic_and_updates_cache(service, tmp_path):
+    """A gravação troca o arquivo inteiro (sem temporários restantes) e já deixa o cache atualizado."""
+    settings = service.get()
+    settings['default_filters'] = ['IEE3']
+    assert service.save(settings)
+    assert json.loads(open(service.settings_file, encoding='utf-8').read())['default_filters'] == ['IEE3']
+    assert sorted(os.listdir(tmp_path)) == ['settings.json']
+    with patch('builtins.open', side_effect=AssertionError("não deveria reler")):
+        assert service.get() == settings
+
+@pytest.mark.skipif(os.name == 'nt', reason="permissões POSIX")
+def test_write_json_atomic_keeps_file_mode(tmp_path):
+    """O arquivo gravado mantém as permissões do original; um arquivo novo segue a umask."""
+    path = tmp_path / 'settings.json'
+    path.write_text('{}', encoding='utf-8')
+    os.chmod(path, 0o644)
+    write_json_atomic(str(path), {'a': 1})
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+    new_path = tmp_path / 'novo.json'
+    with patch('core.config_manager._UMASK', 0o027):
+        write_json_atomic(str(new_path), {})
+    assert os.stat(new_path).st_mode & 0o777 == 0o640
+
+def test_batch_writes_once(service):
+    """Dentro de batch(), as gravações são adiadas e feitas uma vez ao sair do bloco."""
+    with patch('core.config_manager.write_json_atomic', wraps=write_json_atomic) as mock_write:
+        with service.batch():
+            settings = service.get()
+            for value in (True, False, True):
+                settings['user_preferences']['auto_scroll_to_end'] = value
+                assert service.save(settings) is False
+            assert service.has_pending_changes()
+            assert mock_write.call_count == 0
+        assert mock_write.call_count == 1
+    assert not service.has_pending_changes()
+    assert json.load(open(service.settings_file, encoding='utf-8'))['user_preferences']['auto_scroll_to_end'] is True
+
+def test_load_json_default_on_error(tmp_path):
+    """Arquivos ausentes ou inválidos retornam o padrão informado."""
+    service = SettingsService(str(tmp_path / 'settings.json'))
+    broken = tmp_path / 'display_mappings.json'
+    broken.write_text('{inválido', encoding='utf-8')
+    assert service.load_json(str(broken), default={}) == {}
+    assert service.load_json(str(tmp_path / 'ausente.json'), default={}) == {}
+
+def test_failed_save_keeps_memory_in_sync_with_disk(service, tmp_path):
+    """Alterar o dicionário lido não altera o cache; se a gravação falhar, vale o que está no disco."""
+    settings = service.get()
+    settings['default_filters'] = ['IEE3']
+    assert 'default_filters' not in service.get()
+    with patch('core.config_manager.write_json_atomic', side_effect=OSError("disco cheio")):
+        with pytest.raises(OSError):
+            service.save(settings)
+    assert 'default_filters' not in service.get()
+
+    # Sem o arquivo do usuário, as configurações padrão em cache também não são alteradas
+    defaults = SettingsService(str(tmp_path / 'ausente.json'), service.settings_file)
+    defaults.get()['user_preferences']['auto_scroll_to_end'] = True
+    assert defaults.get()['user_preferences']['auto_scroll_to_end'] is False
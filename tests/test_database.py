@@ -17,7 +17,12 @@ sys.path.insert(0, project_root)
 
 # Importa as funções a serem testadas
 # Assumindo que database.py esteja em armazenamento/database.py
-from armazenamento.database import get_db_connection, initialize_database, query_db, insert_dataframe_to_db
+from armazenamento.database import (
+    get_db_connection, initialize_database, query_db, insert_dataframe_to_db, ensure_indexes, query_range,
+    rebuild_search_index, load_search_haystack, search_db, get_table_columns, count_rows, fetch_rows_after,
+    get_row_by_rowid, save_column_stats, load_column_stats
+)
+from core.column_stats import rebuild_column_stats, load_column_stats as load_catalog
 
 # --- Fixtures ---
 
@@ -176,3 +181,76 @@ def test_insert_dataframe_to_db_empty_df(temp_db_path):
     # Verifica que a tabela ainda existe e está vazia
     df_result = query_db(temp_db_path, table_name)
     assert df_result.empty
+
+def test_ensure_indexes_and_query_range(temp_db_path, sample_dataframe):
+    """Testa a criação de índices e a consulta por intervalo."""
+    table_name = 'teste_intervalo'
+    insert_dataframe_to_db(sample_dataframe, temp_db_path, table_name)
+
+    indexed = ensure_indexes(temp_db_path, table_name, ['idade', 'coluna_inexistente'])
+    assert indexed == ['idade']
+    with get_db_connection(temp_db_path) as conn:
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM teste_intervalo WHERE idade >= 26").fetchall()
+    assert any('idx_teste_intervalo_idade' in str(row) for row in plan)
+
+    df_result = query_range(temp_db_path, table_name, 'idade', low=26, high=35)
+    assert df_result['nome'].tolist() == ['Alice', 'Charlie']
+
+def test_rebuild_search_index_and_search_db(temp_db_path):
+    """Testa a busca insensível a acentos feita dentro do SQLite."""
+    table_name = 'teste_busca'
+    df = pd.DataFrame({
+        'id': [1, 2, 3],
+        'descricao': ['Execução parcial', 'Bomba 50%', None],
+        'setor': ['MEL3', 'IEE3', 'MEL3']
+    })
+    insert_dataframe_to_db(df, temp_db_path, table_name)
+
+    assert rebuild_search_index(temp_db_path, table_name) is True
+    with get_db_connection(temp_db_path) as conn:
+        assert conn.execute("SELECT fold('ÇÃO')").fetchone()[0] == 'cao'
+
+    assert search_db(temp_db_path, table_name, ['execucao'])['id'].tolist() == [1]
+    assert search_db(temp_db_path, table_name, ['MEL3'])['id'].tolist() == [1, 3]
+    assert search_db(temp_db_path, table_name, ['50%'])['id'].tolist() == [2]
+    assert search_db(temp_db_path, table_name, ['mel3', 'parcial'])['id'].tolist() == [1]
+
+    columns, haystack = load_search_haystack(temp_db_path, table_name)
+    assert columns == ['descricao', 'setor']
+    assert haystack[0] == 'execucao parcial\x1fmel3'
+
+def test_fetch_rows_after_keyset_batches(temp_db_path, sample_dataframe):
+    """Lotes por rowid percorrem a tabela inteira sem repetir linhas."""
+    insert_dataframe_to_db(sample_dataframe, temp_db_path, 'pessoas')
+    assert get_table_columns(temp_db_path, 'pessoas') == ['id', 'nome', 'idade']
+    assert count_rows(temp_db_path, 'pessoas') == 3
+
+    first = fetch_rows_after(temp_db_path, 'pessoas', ['nome'], 0, 2)
+    second = fetch_rows_after(temp_db_path, 'pessoas', ['nome'], first[-1][0], 2)
+    assert [row[1] for row in first + second] == ['Alice', 'Bob', 'Charlie']
+    assert len(second) < 2  # Fim da tabela
+    assert get_row_by_rowid(temp_db_path, 'pessoas', second[0][0]) == {'id': 3, 'nome': 'Charlie', 'idade': 35}
+
+def test_column_stats_catalog_round_trip(temp_db_path):
+    """O catálogo é gravado pelo importador e relido por coluna; sem catálogo, None."""
+    assert load_column_stats(temp_db_path, 'ssas') is None
+    df = pd.DataFrame({
+        'numero_ssa': [2025001, 2025002, None, 2025010],
+        'descricao': ['curta', 'uma descricao longa', None, None],
+        'data_cadastro': ['2025-01-01', '2025-01-31', None, '2025-01-11'],
+    })
+    insert_dataframe_to_db(df, temp_db_path, 'ssas')
+    assert load_catalog(temp_db_path, 'ssas') == {}
+
+    assert rebuild_column_stats(temp_db_path, 'ssas')
+    catalog = load_catalog(temp_db_path, 'ssas')
+    assert catalog['descricao'].null_fraction == 0.5
+    assert catalog['descricao'].width_max == len('uma descricao longa')
+    assert catalog['numero_ssa'].distinct == 3
+    assert catalog['numero_ssa'].width_p95 == 7  # Exibido sem '.0'
+    assert (catalog['numero_ssa'].min_key, catalog['numero_ssa'].max_key) == (2025001.0, 2025010.0)
+    assert catalog['data_cadastro'].min_key == float(pd.Timestamp('2025-01-01').value)
+    assert catalog['descricao'].min_key is None
+
+    assert save_column_stats(temp_db_path, 'ssas', [])
+    assert load_column_stats(temp_db_path, 'ssas') == []
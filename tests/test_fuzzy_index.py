@@ -0,0 +1,67 @@
+# tests/test_fuzzy_index.py
+"""
+Testes unitários para o módulo core.fuzzy_index.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from core.fuzzy_index import FuzzyIndex, bounded_edit_distance, max_distance_for
+
+# --- Fixtures ---
+
+@pytest.fixture
+def sample_dataframe():
+    """DataFrame com nomes de equipamentos e locais com erros de digitação."""
+    return pd.DataFrame({
+        'equipamento': ['BOMBA DE RECALQUE 01', 'BOMAB RECALQE 02', 'VÁLVULA GAVETA', None],
+        'descricao_localizacao': ['CASA DE FORÇA', 'VERTEDOURO', 'CASA DE FORCA', 'VERTEDORO'],
+    })
+
+# --- Testes ---
+
+def test_bounded_edit_distance():
+    """Testa a distância limitada, incluindo transposições."""
+    assert bounded_edit_distance('bomba', 'bomba', 0) == 0
+    assert bounded_edit_distance('bomab', 'bomba', 1) == 1  # Transposição
+    assert bounded_edit_distance('kitten', 'sitting', 3) == 3
+    assert bounded_edit_distance('kitten', 'sitting', 2) is None
+    assert bounded_edit_distance('a', 'abcd', 2) is None  # Diferença de tamanho
+
+def test_max_distance_for():
+    """Palavras curtas toleram menos erros."""
+    assert max_distance_for('ab') == 0
+    assert max_distance_for('bomba') == 2
+    assert max_distance_for('transformador') == 3
+
+def test_row_distances(sample_dataframe):
+    """Linhas com palavras próximas recebem a menor distância; as demais, infinito."""
+    index = FuzzyIndex(sample_dataframe)
+    distances = index.row_distances('recalque')
+    assert distances[0] == 0
+    assert distances[1] == 1
+    assert np.isinf(distances[2]) and np.isinf(distances[3])
+
+def test_row_distances_multiple_words_and_columns(sample_dataframe):
+    """Todas as palavras precisam casar; as colunas são pesquisadas em conjunto."""
+    index = FuzzyIndex(sample_dataframe)
+    assert np.isfinite(index.row_distances('valvula forca')).tolist() == [False, False, True, False]
+    assert np.isfinite(index.row_distances('vertedouro')).tolist() == [False, True, False, True]
+
+def test_row_distances_texts_with_nul():
+    """Valores que só diferem depois de um NUL não viram um só valor (o hash do pandas os juntaria)."""
+    index = FuzzyIndex(pd.DataFrame({'equipamento': ['BOMBA\x00RECALQUE', 'BOMBA']}))
+    assert np.isfinite(index.row_distances('recalque')).tolist() == [True, False]
+    assert np.isfinite(index.row_distances('bomba')).tolist() == [True, True]
+
+def test_subset(sample_dataframe):
+    """O subconjunto reaproveita o vocabulário e mapeia as linhas selecionadas."""
+    index = FuzzyIndex(sample_dataframe).subset(np.array([3, 1]))
+    assert np.isfinite(index.row_distances('vertedouro')).tolist() == [True, True]
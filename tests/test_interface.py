@@ -66,5 +66,3 @@ def test_filter_dataframe_no_results():
     # 3. Verificação
     # Esperamos um DataFrame vazio.
     assert filtered_df.empty
-
-
@@ -0,0 +1,114 @@
+# tests/test_quick_lookup.py
+"""
+Testes unitários para a consulta rápida de uma SSA (interface.quick_lookup, `main.py ssa`).
+"""
+
+import pytest
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from io import StringIO
+from unittest.mock import patch
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from interface.display import pretty_print_details
+from interface.quick_lookup import find_ssas, run_lookup, EXIT_OK, EXIT_NOT_FOUND, EXIT_ERROR
+
+# Orçamento da consulta rápida, do import de main.py até a SSA impressa (sem a
+# inicialização do interpretador). Tempo depende da máquina: só é verificado com
+# SSA_TIMING_TESTS=1.
+STARTUP_BUDGET_SECONDS = 0.1
+TIMING_TESTS = os.environ.get('SSA_TIMING_TESTS') == '1'
+
+# --- Fixtures ---
+
+@pytest.fixture
+def lookup_db(tmp_path):
+    """Banco temporário com a tabela 'ssas' e o índice de numero_ssa."""
+    db_path = str(tmp_path / 'ssas.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE ssas (numero_ssa INTEGER, setor_executor TEXT, situacao TEXT, descricao_ssa TEXT)')
+    conn.executemany('INSERT INTO ssas VALUES (?, ?, ?, ?)', [
+        (2025001, 'MEL3', 'ADM', 'Bomba com vazamento'),
+        (2025002, 'IEE3', None, 'nan'),
+    ])
+    conn.execute('CREATE INDEX idx_ssas_numero_ssa ON ssas (numero_ssa)')
+    conn.commit()
+    conn.close()
+    return db_path
+
+# --- Testes ---
+
+def test_find_ssas_uses_index(lookup_db):
+    """A busca pelo número (texto) encontra a linha e usa o índice da coluna."""
+    assert find_ssas(lookup_db, 'ssas', ' 2025001 ') == [
+        {'numero_ssa': 2025001, 'setor_executor': 'MEL3', 'situacao': 'ADM', 'descricao_ssa': 'Bomba com vazamento'}
+    ]
+    conn = sqlite3.connect(lookup_db)
+    plan = conn.execute('EXPLAIN QUERY PLAN SELECT * FROM ssas WHERE "numero_ssa" = ?', ('2025001',)).fetchall()
+    conn.close()
+    assert 'idx_ssas_numero_ssa' in str(plan)
+    assert find_ssas(lookup_db, 'ssas', '999') == []
+    assert find_ssas(str(os.path.join(os.path.dirname(lookup_db), 'ausente.db')), 'ssas', '1') is None
+
+def test_run_lookup_matches_details_layout(lookup_db):
+    """A saída é a mesma de pretty_print_details para o mesmo registro."""
+    display_map = {'numero_ssa': 'Nº SSA', 'situacao': 'Situação'}
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        assert run_lookup(lookup_db, 'ssas', '2025002', display_map) == EXIT_OK
+    with patch('sys.stdout', new_callable=StringIO) as expected_stdout:
+        pretty_print_details(
+            {'numero_ssa': 2025002, 'setor_executor': 'IEE3', 'situacao': None, 'descricao_ssa': 'nan'}, display_map
+        )
+    assert mock_stdout.getvalue() == expected_stdout.getvalue()
+    assert "Situação:" in mock_stdout.getvalue()
+
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        assert run_lookup(lookup_db, 'ssas', '999', display_map) == EXIT_NOT_FOUND
+    assert "SSA 999 não encontrada." in mock_stdout.getvalue()
+
+def test_run_lookup_without_number_column(tmp_path):
+    """Bancos sem a coluna numero_ssa resultam em erro, sem exceção."""
+    db_path = str(tmp_path / 'antigo.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE ssas (descricao TEXT)')
+    conn.close()
+    assert run_lookup(db_path, 'ssas', '1', {}) == EXIT_ERROR
+
+def _run_main_ssa(db_path: str) -> tuple:
+    """Roda `main.py ssa 2025001` num interpretador novo; retorna (relatório, stdout)."""
+    script = f"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {project_root!r})
+import main
+main.DB_PATH = {db_path!r}
+try:
+    main.main(['ssa', '2025001'])
+except SystemExit as e:
+    code = e.code
+elapsed = time.perf_counter() - start
+heavy = [name for name in ('pandas', 'numpy', 'openpyxl', 'core.app_logic') if name in sys.modules]
+sys.stderr.write(json.dumps({{'code': code, 'elapsed': elapsed, 'heavy': heavy}}))
+"""
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, cwd=project_root)
+    return json.loads(result.stderr.strip().splitlines()[-1]), result.stdout
+
+def test_main_ssa_skips_heavy_imports(lookup_db):
+    """`main.py ssa` imprime a SSA sem importar pandas, openpyxl ou o importador."""
+    report, stdout = _run_main_ssa(lookup_db)
+    assert report['code'] == EXIT_OK
+    assert "DETALHES DA SSA: 2025001" in stdout
+    assert report['heavy'] == []
+
+@pytest.mark.skipif(not TIMING_TESTS, reason="orçamento de tempo: defina SSA_TIMING_TESTS=1")
+def test_main_ssa_startup_time(lookup_db):
+    """`main.py ssa` responde dentro do orçamento."""
+    report, _ = _run_main_ssa(lookup_db)
+    assert report['code'] == EXIT_OK
+    assert report['elapsed'] < STARTUP_BUDGET_SECONDS, f"Consulta rápida levou {report['elapsed']:.3f}s"
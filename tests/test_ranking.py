@@ -0,0 +1,54 @@
+# tests/test_ranking.py
+"""
+Testes unitários para o módulo core.ranking.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from core.ranking import score_rows, rank_positions
+
+# --- Fixtures ---
+
+@pytest.fixture
+def sample_dataframe():
+    """Cria um DataFrame de exemplo com datas de cadastro iguais (sem efeito de recência)."""
+    return pd.DataFrame({
+        'numero_ssa': ['2025001', '2025002', '2025003', '2025004'],
+        'equipamento': ['PAINEL', 'BOMBA', 'MOTOR', 'MOTOR'],
+        'descricao_ssa': ['Bomba e bomba', 'Troca', 'Bomba', 'Nada'],
+        'data_cadastro': ['2025-06-01'] * 4,
+    })
+
+# --- Testes ---
+
+def test_field_weights_and_frequency(sample_dataframe):
+    """Equipamento pesa mais que a descrição, e a frequência do termo soma pontos."""
+    scores = score_rows(sample_dataframe, ['bomba'])
+    assert scores[1] > scores[0] > scores[2] > scores[3]
+
+def test_numero_ssa_outranks_other_fields(sample_dataframe):
+    """Um termo que casa com o Nº SSA coloca a SSA no topo."""
+    assert rank_positions(sample_dataframe, ['2025004', 'motor'], k=1).tolist() == [3]
+
+def test_recency_breaks_ties():
+    """Com a mesma relevância textual, a SSA mais recente vem primeiro."""
+    df = pd.DataFrame({
+        'descricao_ssa': ['bomba', 'bomba', 'bomba'],
+        'data_cadastro': ['2025-01-01', '2025-06-30', None],
+    })
+    assert rank_positions(df, ['bomba']).tolist() == [1, 0, 2]
+
+def test_rank_positions_top_k(sample_dataframe):
+    """Retorna no máximo k posições, ordenadas da maior para a menor pontuação."""
+    positions = rank_positions(sample_dataframe, ['bomba'], k=2)
+    assert positions.tolist() == [1, 0]
+    assert rank_positions(sample_dataframe, ['bomba'], k=0).size == 0
+    assert isinstance(rank_positions(sample_dataframe.iloc[:0], ['bomba']), np.ndarray)
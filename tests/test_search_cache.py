@@ -0,0 +1,106 @@
+# tests/test_search_cache.py
+"""
+Testes unitários para o módulo core.search_cache e seu uso em filter_dataframe.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+from unittest.mock import patch
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from core.search_cache import SearchResultCache, frame_fingerprint, search_cache
+from core.search_engine import tag_dataset_version, normalize_query
+from core.app_logic import filter_dataframe, filter_view
+
+# --- Fixtures ---
+
+@pytest.fixture
+def sample_dataframe():
+    """Cria um DataFrame de exemplo para testes."""
+    return pd.DataFrame({
+        'setor_executor': ['MEL3', 'MEL3', 'IEE3'],
+        'situacao': ['ADM', 'APG', 'ADM'],
+    })
+
+@pytest.fixture(autouse=True)
+def empty_shared_cache():
+    """Isola os testes do cache compartilhado."""
+    search_cache.clear()
+    yield
+    search_cache.clear()
+
+# --- Testes ---
+
+def test_cache_lru_eviction():
+    """Ao exceder o limite de entradas, a menos usada recentemente é descartada."""
+    cache = SearchResultCache(max_entries=2)
+    cache.put('a', np.array([0]))
+    cache.put('b', np.array([1]))
+    assert cache.get('a') is not None  # 'a' passa a ser a mais recente
+    cache.put('c', np.array([2]))
+    assert cache.get('b') is None
+    assert cache.get('a').tolist() == [0]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_cache_position_budget():
+    """O total de posições guardadas respeita o limite configurado."""
+    cache = SearchResultCache(max_positions=5)
+    cache.put('a', np.arange(3))
+    cache.put('b', np.arange(3))
+    cache.put('grande', np.arange(10))  # Maior que o limite: não é guardado
+    assert len(cache) == 1
+    assert cache.get('b') is not None and cache.get('grande') is None
+
+def test_normalize_query_equivalent_forms():
+    """Consultas equivalentes geram a mesma chave."""
+    assert normalize_query(['ADM', ' mel3']) == normalize_query(['MEL3', 'adm'])
+    assert normalize_query(['a & !b']) == normalize_query(['!B & a'])
+    assert normalize_query(['a & b']) != normalize_query(['a', 'b'])
+
+def test_filter_dataframe_uses_cache(sample_dataframe):
+    """Com versão de dados conhecida, a segunda busca equivalente é um acerto de cache."""
+    tag_dataset_version(sample_dataframe, 'v1')
+    hits_before = search_cache.hits
+    first = filter_dataframe(sample_dataframe, ['mel3 & adm'])
+    second = filter_dataframe(sample_dataframe, ['ADM & MEL3'])
+    assert first.index.tolist() == second.index.tolist() == [0]
+    assert (search_cache.hits - hits_before, len(search_cache)) == (1, 1)
+
+def test_filter_dataframe_without_version_skips_cache(sample_dataframe):
+    """Sem versão de dados, o cache não é usado."""
+    filter_dataframe(sample_dataframe, ['mel3'])
+    assert len(search_cache) == 0
+
+def test_cache_key_changes_with_version_and_frame(sample_dataframe):
+    """Nova versão ou outro subconjunto de linhas não reaproveitam resultados antigos."""
+    hits_before = search_cache.hits
+    tag_dataset_version(sample_dataframe, 'v1')
+    filter_dataframe(sample_dataframe, ['adm'])
+    tag_dataset_version(sample_dataframe, 'v2')
+    filter_dataframe(sample_dataframe, ['adm'])
+    subset = filter_dataframe(sample_dataframe, ['mel3'])  # Herda a versão 'v2'
+    assert filter_dataframe(subset, ['adm']).index.tolist() == [0]
+    assert search_cache.hits == hits_before
+    assert frame_fingerprint(subset) != frame_fingerprint(sample_dataframe)
+
+def test_filter_view_caches_per_candidate_set(sample_dataframe):
+    """Buscas restritas a visões diferentes não compartilham a entrada de cache."""
+    tag_dataset_version(sample_dataframe, 'v1')
+    assert filter_view(sample_dataframe, ['adm'], np.array([2, 1])).tolist() == [2]
+    assert filter_view(sample_dataframe, ['adm'], np.array([0, 1])).tolist() == [0]
+    assert filter_view(sample_dataframe, ['adm']).tolist() == [0, 2]
+    assert len(search_cache) == 3
+
+def test_frame_fingerprint_computed_once(sample_dataframe):
+    """O hash do índice é feito uma vez por DataFrame, e refeito se o índice for trocado."""
+    first = frame_fingerprint(sample_dataframe)
+    with patch('pandas.util.hash_pandas_object', side_effect=AssertionError("não deveria recalcular")):
+        assert frame_fingerprint(sample_dataframe) == first
+    sample_dataframe.index = sample_dataframe.index[::-1]
+    assert frame_fingerprint(sample_dataframe) != first
@@ -0,0 +1,257 @@
+# tests/test_search_engine.py
+"""
+Testes unitários para o módulo core.search_engine.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from core.search_engine import (
+    Predicate, RangePredicate, RegexPredicate, QueryError, parse_query, build_haystack, filter_positions,
+    attach_haystack, haystack_columns, get_haystack, take_rows, configure_parallel, parallel_match,
+    is_refinement, get_sort_order, sort_view, estimate_selectivity, attach_column_stats, column_stats_of,
+    _frame_artifacts
+)
+from core.column_stats import compute_column_stats
+
+# --- Fixtures ---
+
+@pytest.fixture
+def sample_dataframe():
+    """Cria um DataFrame de exemplo para testes."""
+    data = {
+        'setor_executor': ['MEL3', 'MEL3', 'IEE3', 'IEQ1'],
+        'situacao': ['ADM', 'APG', 'ADM', None],
+        'descricao_ssa': ['Bomba com vazamento', 'Troca de bomba', 'Painel CISCO', 'Falha no painel'],
+        'numero_ssa': [2025001, 2025002, 2025003, 2025004]
+    }
+    return pd.DataFrame(data)
+
+# --- Testes ---
+
+def test_parse_query_operators():
+    """Testa a conversão de termos em cláusulas OU de predicados E/NAO."""
+    clauses = parse_query(['MEL3 & !ADM', ' IEE3 ', '&', '!'])
+    assert clauses == [
+        [Predicate('mel3', False), Predicate('adm', True)],
+        [Predicate('iee3', False)],
+    ]
+
+def test_build_haystack_ignores_nulls(sample_dataframe):
+    """Valores nulos não devem gerar texto pesquisável ('nan'/'none')."""
+    haystack = build_haystack(sample_dataframe)
+    assert len(haystack) == len(sample_dataframe)
+    assert 'none' not in haystack[3] and 'nan' not in haystack[3]
+
+def test_filter_positions_or(sample_dataframe):
+    """Termos separados por vírgula são alternativas (OU)."""
+    positions = filter_positions(sample_dataframe, ['iee3', 'ieq1'])
+    assert positions.tolist() == [2, 3]
+
+def test_filter_positions_and_not(sample_dataframe):
+    """'&' exige todos os termos e '!' exclui linhas."""
+    assert filter_positions(sample_dataframe, ['mel3 & bomba']).tolist() == [0, 1]
+    assert filter_positions(sample_dataframe, ['mel3 & bomba & !adm']).tolist() == [1]
+    assert filter_positions(sample_dataframe, ['!painel']).tolist() == [0, 1]
+
+def test_filter_positions_short_circuit(sample_dataframe):
+    """Uma cláusula E sem candidatos deve retornar vazio sem erro."""
+    positions = filter_positions(sample_dataframe, ['inexistente & mel3 & !adm'])
+    assert isinstance(positions, np.ndarray)
+    assert positions.size == 0
+
+def test_filter_positions_candidates_keep_order(sample_dataframe):
+    """Com posições candidatas, só elas são pesquisadas e a ordem delas é mantida."""
+    assert filter_positions(sample_dataframe, ['bomba'], np.array([1, 3, 0])).tolist() == [1, 0]
+    assert filter_positions(sample_dataframe, [' '], np.array([2, 0])).tolist() == [2, 0]
+
+def test_filter_positions_no_terms(sample_dataframe):
+    """Sem termos válidos, todas as linhas são retornadas."""
+    assert filter_positions(sample_dataframe, ['  ']).tolist() == [0, 1, 2, 3]
+
+def test_is_refinement():
+    """Consultas mais restritivas podem reaproveitar o resultado anterior."""
+    assert is_refinement(['MEL'], ['MEL3'])
+    assert is_refinement(['bomba'], ['bomba & !adm'])
+    assert is_refinement(['mel', 'iee'], ['mel3'])
+    assert not is_refinement(['!ab'], ['!abc & x'])
+    assert is_refinement(['!abc'], ['!ab'])
+    assert is_refinement([], ['qualquer'])
+    assert not is_refinement(['MEL3'], ['MEL'])
+    assert not is_refinement(['mel3'], ['mel3', 'iee3'])
+    assert not is_refinement(['~bomba'], ['~bombas'])
+
+# --- Intervalos ---
+
+@pytest.fixture
+def range_dataframe():
+    """DataFrame com colunas de semana e data para testes de intervalo."""
+    return pd.DataFrame({
+        'semana_cadastro': [202517, 202518, None, 202522, 202530],
+        'data_cadastro': ['2025-06-01 10:00:00', '2025-06-30 08:00:00', None, '2025-07-01 00:00:00', 'x'],
+        'situacao': ['ADM', 'APG', 'ADM', 'APG', 'ADM']
+    })
+
+def test_parse_range_predicate():
+    """Termos 'coluna:a..b' em colunas conhecidas viram RangePredicate."""
+    clauses = parse_query(['semana_cadastro:202518..202522', 'equipamento:bomba'])
+    assert clauses[0][0] == RangePredicate('semana_cadastro', 202518.0, 202522.0)
+    assert clauses[1][0] == Predicate('equipamento:bomba')
+
+def test_filter_positions_numeric_range(range_dataframe):
+    """Intervalos numéricos inclusivos, abertos e negados."""
+    assert filter_positions(range_dataframe, ['semana_cadastro:202518..202522']).tolist() == [1, 3]
+    assert filter_positions(range_dataframe, ['semana_cadastro>202518']).tolist() == [3, 4]
+    assert filter_positions(range_dataframe, ['semana_cadastro:202522..']).tolist() == [3, 4]
+    assert filter_positions(range_dataframe, ['!semana_cadastro:..202518']).tolist() == [2, 3, 4]
+
+def test_filter_positions_date_range(range_dataframe):
+    """Intervalos de data incluem o dia inteiro do limite superior."""
+    assert filter_positions(range_dataframe, ['data_cadastro:01/06/2025..30/06/2025']).tolist() == [0, 1]
+    assert filter_positions(range_dataframe, ['data_cadastro<30/06/2025']).tolist() == [0]
+    assert filter_positions(range_dataframe, ['data_cadastro>=2025-06-30 & apg']).tolist() == [1, 3]
+
+def test_filter_positions_date_range_mixed_formats():
+    """Datas com e sem hora na mesma coluna são lidas cada uma no seu formato."""
+    df = pd.DataFrame({'data_cadastro': ['2025-05-01 10:00:00', '2025-06-15', '2025-06-20 08:00:00', '2025-07-01']})
+    assert filter_positions(df, ['data_cadastro:01/06/2025..30/06/2025']).tolist() == [1, 2]
+    assert filter_positions(df, ['!data_cadastro:01/06/2025..30/06/2025']).tolist() == [0, 3]
+
+def test_filter_positions_invalid_range(range_dataframe):
+    """Valores inválidos em intervalos geram QueryError."""
+    with pytest.raises(QueryError):
+        filter_positions(range_dataframe, ['semana_cadastro:abc'])
+
+@pytest.mark.parametrize('term', ['semana_cadastro:202518..202522', '!semana_cadastro:202518..202522'])
+def test_filter_positions_range_on_missing_column(sample_dataframe, term):
+    """Intervalo sobre coluna ausente (negado ou não) é erro, e não 'nenhuma'/'todas' as linhas."""
+    with pytest.raises(QueryError, match="semana_cadastro"):
+        filter_positions(sample_dataframe, [term])
+
+# --- Acentos ---
+
+def test_filter_positions_accent_insensitive():
+    """'execucao' deve encontrar 'Execução' e vice-versa."""
+    df = pd.DataFrame({'descricao_execucao': ['Execução parcial', 'Sem execucao', 'Outro']})
+    assert filter_positions(df, ['execucao']).tolist() == [0, 1]
+    assert filter_positions(df, ['EXECUÇÃO & !parcial']).tolist() == [1]
+
+def test_attach_haystack_checks_columns(sample_dataframe):
+    """Texto pré-calculado só é aceito se as colunas e o tamanho coincidirem."""
+    precomputed = ['x'] * len(sample_dataframe)
+    assert not attach_haystack(sample_dataframe, precomputed, ['outra_coluna'])
+    assert not attach_haystack(sample_dataframe, precomputed[:-1])
+    assert attach_haystack(sample_dataframe, precomputed, haystack_columns(sample_dataframe))
+    assert filter_positions(sample_dataframe, ['x']).tolist() == [0, 1, 2, 3]
+
+def test_take_rows_propagates_haystack(sample_dataframe):
+    """O subconjunto filtrado reaproveita o texto pesquisável do DataFrame de origem."""
+    subset = take_rows(sample_dataframe, np.array([1, 3]))
+    assert get_haystack(subset).tolist() == get_haystack(sample_dataframe)[[1, 3]].tolist()
+
+# --- Busca aproximada ---
+
+def test_filter_positions_fuzzy_ranked():
+    """'~termo' tolera erros de digitação e ordena pela distância."""
+    df = pd.DataFrame({
+        'equipamento': ['BOMBA RECALQE', 'PAINEL', 'BOMBA RECALQUE', 'MOTOR'],
+        'descricao_localizacao': ['CASA DE FORCA'] * 4,
+        'situacao': ['ADM', 'ADM', 'APG', 'ADM']
+    })
+    assert filter_positions(df, ['~recalque']).tolist() == [2, 0]
+    assert filter_positions(df, ['~recalque & adm']).tolist() == [0]
+    assert filter_positions(df, ['!~recalque']).tolist() == [1, 3]
+
+# --- Expressões regulares ---
+
+def test_filter_positions_regex_mode(sample_dataframe):
+    """'re:' aceita padrões; '^'/'$' ancoram em cada coluna e o '.' não atravessa colunas."""
+    assert parse_query(['re:^MEL[0-9]'])[0][0] == RegexPredicate('^MEL[0-9]')
+    assert filter_positions(sample_dataframe, ['re:^MEL[0-9]$']).tolist() == [0, 1]
+    assert filter_positions(sample_dataframe, ['re:bomba.*vazamento']).tolist() == [0]
+    assert filter_positions(sample_dataframe, ['re:mel3.*bomba']).tolist() == []
+    assert filter_positions(sample_dataframe, ['!re:^i']).tolist() == [0, 1]
+
+@pytest.mark.parametrize('pattern, expected', [
+    ('(?P<Equip>bomba).*(?P=Equip)', [0]),
+    ('(?:PAINEL|painel) cisco', [1]),
+    ('(?<!x)Bomba(?= com)', [0, 2]),
+    ('(?#Comentario)BOMBA com', [0, 2]),
+])
+def test_filter_positions_regex_group_headers(pattern, expected):
+    """Cabeçalhos '(?...)' não vão para minúsculas (o resto do padrão, sim)."""
+    df = pd.DataFrame({'descricao_ssa': ['Bomba com vazamento na bomba', 'Painel CISCO', 'Bomba com defeito']})
+    assert filter_positions(df, ['re:' + pattern]).tolist() == expected
+
+def test_filter_positions_literal_ignores_metacharacters():
+    """Sem 're:', metacaracteres são procurados literalmente."""
+    df = pd.DataFrame({'descricao_ssa': ['valor a.b', 'valor axb', 'custo (R$)']})
+    assert filter_positions(df, ['a.b']).tolist() == [0]
+    assert filter_positions(df, ['(r$)']).tolist() == [2]
+
+def test_invalid_regex_raises_query_error(sample_dataframe):
+    """Padrões inválidos geram QueryError já na leitura da consulta."""
+    with pytest.raises(QueryError):
+        parse_query(['re:(abc'])
+
+# --- Busca paralela ---
+
+def test_parallel_match_preserves_order():
+    """Os blocos avaliados em paralelo são reunidos na ordem original das linhas."""
+    haystack = np.array([f"linha {i} {'bomba' if i % 3 == 0 else 'painel'}" for i in range(101)], dtype=object)
+    candidates = np.arange(1, 101, 2)
+    configure_parallel(4, min_rows=1)
+    try:
+        mask = parallel_match(haystack, candidates, Predicate('bomba'), 4)
+        df = pd.DataFrame({'descricao_ssa': haystack})
+        parallel_positions = filter_positions(df, ['bomba & !linha 3'])
+    finally:
+        configure_parallel(1)
+    assert candidates[mask].tolist() == [i for i in candidates if i % 3 == 0]
+    assert parallel_positions.tolist() == filter_positions(df, ['bomba & !linha 3']).tolist()
+
+# --- Ordenação ---
+
+def test_get_sort_order_nulls_last_and_cached(sample_dataframe):
+    """Permutação estável com nulos no fim nos dois sentidos, calculada uma vez por coluna/sentido."""
+    ascending = get_sort_order(sample_dataframe, 'situacao')
+    assert ascending.tolist() == [0, 2, 1, 3]
+    assert get_sort_order(sample_dataframe, 'situacao', ascending=False).tolist() == [1, 0, 2, 3]
+    assert get_sort_order(sample_dataframe, 'situacao') is ascending
+    assert get_sort_order(sample_dataframe, 'numero_ssa', ascending=False).tolist() == [3, 2, 1, 0]
+
+def test_get_sort_order_texts_with_nul():
+    """Textos que só diferem depois de um NUL têm chaves distintas (o hash do pandas os juntaria)."""
+    df = pd.DataFrame({'descricao_ssa': ['a\x00z', 'a', 'a\x00b', 'c', 'a\x00z'], 'misto': ['b\x00', 1, 'b', 'a', 2]})
+    assert get_sort_order(df, 'descricao_ssa').tolist() == [1, 2, 0, 4, 3]
+    assert get_sort_order(df, 'misto').tolist() == [1, 4, 3, 2, 0]
+
+def test_sort_view_restricts_cached_order(sample_dataframe):
+    """Uma visão é ordenada filtrando a permutação da base, sem perder nem repetir linhas."""
+    assert sort_view(sample_dataframe, np.array([3, 1, 0]), 'setor_executor').tolist() == [3, 0, 1]
+    assert sort_view(sample_dataframe, None, 'setor_executor', False).tolist() == [0, 1, 3, 2]
+    # Um DataFrame novo (dados recarregados) não reaproveita a permutação do anterior
+    reloaded = sample_dataframe.iloc[::-1].reset_index(drop=True)
+    assert get_sort_order(reloaded, 'setor_executor').tolist() == [1, 0, 2, 3]
+
+# --- Catálogo de estatísticas ---
+
+def test_estimate_selectivity_uses_column_stats(sample_dataframe):
+    """Com catálogo, intervalos são estimados pelo mínimo/máximo, sem construir o índice ordenado."""
+    attach_column_stats(sample_dataframe, compute_column_stats(sample_dataframe))
+    estimate = estimate_selectivity(sample_dataframe, None, RangePredicate('numero_ssa', low=2025003))
+    assert estimate == pytest.approx(1 / 3)
+    negated = RangePredicate('numero_ssa', high=2024000, negated=True)
+    assert estimate_selectivity(sample_dataframe, None, negated) == 1.0
+    assert _frame_artifacts(sample_dataframe)['indexes'] == {}
+    # O resultado da busca continua exato, e os subconjuntos herdam o catálogo
+    assert filter_positions(sample_dataframe, ['numero_ssa>=2025003']).tolist() == [2, 3]
+    subset = take_rows(sample_dataframe, np.array([0, 1]))
+    assert column_stats_of(subset) is column_stats_of(sample_dataframe)
@@ -0,0 +1,91 @@
+# tests/test_snapshot.py
+"""
+Testes unitários para o snapshot colunar da base (armazenamento.snapshot) e a carga compartilhada (load_dataset).
+"""
+
+import pytest
+import pandas as pd
+import os
+import sys
+from pandas.testing import assert_frame_equal
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from armazenamento import snapshot
+from armazenamento.database import (
+    insert_dataframe_to_db, rebuild_search_index, bump_dataset_version, query_db, load_search_haystack
+)
+from core.app_logic import load_dataset
+from core.search_engine import get_haystack, dataset_version_of
+
+# --- Fixtures ---
+
+@pytest.fixture
+def imported_db(tmp_path):
+    """Banco temporário como o importador o deixa: tabela, tabela-sombra e id de importação."""
+    db_path = str(tmp_path / 'ssas.db')
+    df = pd.DataFrame({
+        'numero_ssa': [2025001, 2025002, 2025003],
+        'setor_executor': ['MEL3', 'IEE3', None],
+        'descricao_ssa': ['Bomba com vazamento', 'Execução parcial', 'Painel'],
+        'semana_cadastro': [202518.0, None, 202522.0],
+    })
+    insert_dataframe_to_db(df, db_path, 'ssas')
+    rebuild_search_index(db_path, 'ssas')
+    import_id = bump_dataset_version(db_path)
+    return db_path, import_id
+
+# --- Testes ---
+
+def test_load_dataset_without_pyarrow(imported_db, monkeypatch):
+    """Sem pyarrow, nada é gravado e a base vem do SQL com texto pesquisável e versão."""
+    db_path, import_id = imported_db
+    monkeypatch.setattr(snapshot, 'pa', None)
+    assert not snapshot.write_snapshot(db_path, 'ssas', import_id)
+    assert not os.path.exists(snapshot.snapshot_path(db_path, 'ssas', import_id))
+
+    df = load_dataset(db_path, 'ssas')
+    assert_frame_equal(df, query_db(db_path, 'ssas'))
+    assert list(get_haystack(df)) == load_search_haystack(db_path, 'ssas')[1]
+    assert dataset_version_of(df) == import_id
+
+def test_snapshot_roundtrip(imported_db):
+    """O snapshot reproduz a leitura pelo SQL (tipos e texto pesquisável) para o mesmo id de importação."""
+    pytest.importorskip('pyarrow')
+    db_path, import_id = imported_db
+    assert snapshot.write_snapshot(db_path, 'ssas', import_id)
+
+    df, (columns, texts) = snapshot.load_snapshot(db_path, 'ssas', import_id)
+    expected_columns, expected_texts = load_search_haystack(db_path, 'ssas')
+    assert_frame_equal(df, query_db(db_path, 'ssas'))
+    assert columns == expected_columns and list(texts) == expected_texts
+
+    df = load_dataset(db_path, 'ssas')
+    assert_frame_equal(df, query_db(db_path, 'ssas'))
+    assert dataset_version_of(df) == import_id
+
+def test_snapshot_keyed_by_import_id(imported_db):
+    """Outro id de importação não usa o snapshot; um snapshot novo apaga os anteriores."""
+    pytest.importorskip('pyarrow')
+    db_path, import_id = imported_db
+    assert snapshot.write_snapshot(db_path, 'ssas', import_id)
+    assert snapshot.load_snapshot(db_path, 'ssas', 'outra-importacao') is None
+
+    new_id = bump_dataset_version(db_path)
+    assert snapshot.write_snapshot(db_path, 'ssas', new_id)
+    assert not os.path.exists(snapshot.snapshot_path(db_path, 'ssas', import_id))
+    assert snapshot.load_snapshot(db_path, 'ssas', new_id) is not None
+
+@pytest.mark.skipif(os.name == 'nt', reason="permissões POSIX")
+def test_snapshot_file_mode_follows_umask(imported_db):
+    """O snapshot é criado com as permissões da umask, como os demais arquivos da pasta de dados."""
+    pytest.importorskip('pyarrow')
+    db_path, import_id = imported_db
+    umask = os.umask(0o022)
+    try:
+        assert snapshot.write_snapshot(db_path, 'ssas', import_id)
+    finally:
+        os.umask(umask)
+    assert os.stat(snapshot.snapshot_path(db_path, 'ssas', import_id)).st_mode & 0o777 == 0o644
@@ -0,0 +1,65 @@
+# tests/test_startup.py
+"""
+Testes da inicialização: módulos carregados por cada ponto de entrada, medidos com
+`python -X importtime`. O orçamento de tempo só é verificado com SSA_TIMING_TESTS=1.
+"""
+
+import pytest
+import os
+import subprocess
+import sys
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+# Orçamento do tempo acumulado de importação de cada ponto de entrada (em segundos).
+# Só com o pandas a importação já passa de 0,3s: o orçamento só é cumprido se ele
+# (e o importador/exportador) ficarem para o primeiro uso.
+IMPORT_BUDGET_SECONDS = {
+    'main': 0.15,
+    'interface.cli': 0.2,
+    'core.app_logic': 0.2,
+}
+TIMING_TESTS = os.environ.get('SSA_TIMING_TESTS') == '1'
+# Módulos que nenhum ponto de entrada pode carregar na importação
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'extracao.extractor', 'exportacao.exporter')
+
+# --- Fixtures ---
+
+def _import_profile(module: str) -> dict:
+    """Importa `module` num interpretador novo e retorna {módulo: tempo acumulado em segundos}."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=project_root
+    )
+    assert result.returncode == 0, result.stderr
+    profile = {}
+    for line in result.stderr.splitlines():
+        # Formato: "import time: <próprio us> | <acumulado us> | <indentação><módulo>"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        profile[name.strip()] = int(cumulative) / 1_000_000
+    return profile
+
+# --- Testes ---
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGET_SECONDS))
+def test_entry_point_skips_heavy_modules(module):
+    """Pontos de entrada importam sem pandas, openpyxl, importador ou exportador."""
+    profile = _import_profile(module)
+    assert [name for name in HEAVY_MODULES if name in profile] == []
+
+@pytest.mark.skipif(not TIMING_TESTS, reason="orçamento de tempo: defina SSA_TIMING_TESTS=1")
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGET_SECONDS))
+def test_entry_point_import_budget(module):
+    """Pontos de entrada importam dentro do orçamento."""
+    profile = _import_profile(module)
+    assert profile[module] < IMPORT_BUDGET_SECONDS[module], f"Importar {module} levou {profile[module]:.3f}s"
+
+def test_main_does_not_import_cli():
+    """main.py só carrega o importador e a CLI depois de ler os argumentos."""
+    profile = _import_profile('main')
+    assert 'core.app_logic' not in profile
+    assert 'interface.cli' not in profile
@@ -0,0 +1,101 @@
+# tests/test_table_model.py
+"""
+Testes unitários para os modelos de tabela da GUI (gui.table_model).
+
+Os testes são pulados quando o PyQt6 não está instalado.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+pytest.importorskip('PyQt6.QtCore')
+from PyQt6.QtCore import Qt, QCoreApplication
+
+from armazenamento.database import insert_dataframe_to_db
+from gui.table_model import DataFrameTableModel, SqlTableModel, ROW_NUMBER_COLUMN, MAX_CELL_CHARS
+
+DISPLAY = Qt.ItemDataRole.DisplayRole
+
+# --- Fixtures ---
+
+@pytest.fixture(scope='module')
+def qt_app():
+    """Aplicação Qt (sem janelas) para os modelos."""
+    return QCoreApplication.instance() or QCoreApplication([])
+
+@pytest.fixture
+def base_df():
+    """Base pequena com nulos e um texto maior que a célula."""
+    return pd.DataFrame({
+        'numero_ssa': [2025003, 2025001, 2025002, 2025004],
+        'setor_executor': ['IEE3', 'MEL3', None, 'MEL3'],
+        'descricao_ssa': ['Painel', 'x' * (MAX_CELL_CHARS + 10), 'Bomba', np.nan],
+    })
+
+@pytest.fixture
+def sql_db(tmp_path):
+    """Banco temporário com 10 linhas na tabela 'ssas'."""
+    db_path = str(tmp_path / 'ssas.db')
+    insert_dataframe_to_db(
+        pd.DataFrame({'numero_ssa': range(1, 11), 'situacao': ['ADM', 'APG'] * 5}), db_path, 'ssas'
+    )
+    return db_path
+
+def _column(model, column: int) -> list:
+    return [model.data(model.index(row, column), DISPLAY) for row in range(model.rowCount())]
+
+# --- Testes ---
+
+def test_dataframe_model_view(qt_app, base_df):
+    """rowCount/data seguem a visão (posições), com numeração, nulos vazios e textos truncados."""
+    model = DataFrameTableModel({'setor_executor': 'Executor'})
+    model.set_view(base_df, np.array([1, 2]), [ROW_NUMBER_COLUMN, 'setor_executor', 'descricao_ssa', 'inexistente'])
+    assert model.rowCount() == 2 and model.columnCount() == 3
+    assert _column(model, 0) == ['1', '2']
+    assert _column(model, 1) == ['MEL3', '']
+    assert _column(model, 2)[0] == 'x' * (MAX_CELL_CHARS - 3) + '...'
+    assert model.data(model.index(0, 2), Qt.ItemDataRole.ToolTipRole) == 'x' * (MAX_CELL_CHARS + 10)
+    assert model.headerData(1, Qt.Orientation.Horizontal) == 'Executor'
+
+    model.set_view(base_df, None, ['numero_ssa'])
+    assert model.rowCount() == 4
+
+def test_dataframe_model_sort(qt_app, base_df):
+    """sort() reordena a visão, mantém a ordenação em novas visões e '#' volta à ordem da busca."""
+    model = DataFrameTableModel()
+    model.set_view(base_df, None, [ROW_NUMBER_COLUMN, 'numero_ssa', 'setor_executor'])
+    model.sort(1, Qt.SortOrder.DescendingOrder)
+    assert _column(model, 1) == ['2025004', '2025003', '2025002', '2025001']
+    assert model.sort_state() == (1, Qt.SortOrder.DescendingOrder)
+
+    model.set_view(base_df, np.array([0, 1, 2]), [ROW_NUMBER_COLUMN, 'numero_ssa', 'setor_executor'])
+    assert _column(model, 1) == ['2025003', '2025002', '2025001']
+    assert model.base_position(0) == 0
+
+    model.sort(2, Qt.SortOrder.AscendingOrder)  # Nulos por último
+    assert _column(model, 2) == ['IEE3', 'MEL3', '']
+    model.sort(0)
+    assert _column(model, 1) == ['2025003', '2025001', '2025002']
+    assert model.sort_state()[0] == -1
+
+def test_sql_model_fetches_in_batches(qt_app, sql_db):
+    """canFetchMore/fetchMore leem a tabela em lotes, em ordem de rowid, até o fim."""
+    model = SqlTableModel(sql_db, 'ssas', batch_size=4)
+    model.set_columns([ROW_NUMBER_COLUMN, 'situacao', 'numero_ssa', 'inexistente'])
+    assert model.rowCount() == 0 and model.columnCount() == 3 and model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 4
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 10
+    assert _column(model, 2) == [str(n) for n in range(1, 11)]
+    assert _column(model, 0)[-1] == '10'
+    assert model.column_name(1) == 'situacao'
+    assert model.rowid(0) < model.rowid(9)
@@ -17,10 +17,16 @@ sys.path.insert(0, project_root)
 from interface.table_printer import (
     get_terminal_size,
     _estimate_column_width,
+    _estimate_column_widths,
     _select_columns_for_width,
     paginate_dataframe,
-    pretty_print_df
+    pretty_print_df,
+    _PageRenderer,
+    _sanitize_text_column
 )
+from utils.benchmarks import sanitize_per_cell
+from core.column_stats import ColumnStats
+from core.search_engine import attach_column_stats
 
 # --- Fixtures ---
 
@@ -122,6 +128,15 @@ def test_estimate_column_width(sample_dataframe):
     assert isinstance(width_num, int)
     assert width_num > 0
 
+def test_estimate_column_widths_uses_catalog(sample_dataframe, display_map):
+    """Com o catálogo associado, a largura vem do p95 gravado, sem examinar os dados."""
+    df = sample_dataframe.copy()
+    attach_column_stats(df, {'descricao_ssa': ColumnStats('descricao_ssa', len(df), 0.0, len(df), 42, 90)})
+    widths = _estimate_column_widths(df, display_map)
+    assert widths['descricao_ssa'] == 42
+    # Colunas fora do catálogo continuam estimadas pela amostra
+    assert widths['numero_ssa'] == _estimate_column_width(df['numero_ssa'], display_map.get('numero_ssa', 'numero_ssa'))
+
 def test_select_columns_for_width(sample_dataframe, display_map):
     """Testa a função _select_columns_for_width."""
     essential_cols = ['numero_ssa', 'setor_executor', 'situacao']
@@ -209,3 +224,64 @@ def test_pretty_print_df_auto_scroll(mock_get_terminal_size, sample_dataframe, d
     assert "Descricao curta" in output
     # Não deve ter prompts de paginação se couber em poucas páginas
     # (isso pode variar com base na lógica interna)
+
+@patch('interface.table_printer.get_terminal_size')
+def test_pretty_print_df_formats_only_displayed_pages(mock_get_terminal_size, display_map, sample_settings):
+    """Testa se só as páginas exibidas são formatadas e se voltar ('b') reaproveita a página renderizada."""
+    mock_get_terminal_size.return_value = (10, 120)  # 5 linhas por página
+    big_df = pd.DataFrame({
+        'numero_ssa': range(1000),
+        'situacao': ['ADM', 'APG'] * 500,
+        'descricao_ssa': [f'Descricao {i}' for i in range(1000)],
+    })
+
+    with patch.object(_PageRenderer, '_format_page', autospec=True, side_effect=_PageRenderer._format_page) as format_page:
+        with patch('builtins.input', side_effect=['', 'b', 'q']) as mock_input:
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                pretty_print_df(big_df, display_map, sample_settings)
+                output = mock_stdout.getvalue()
+    prompts = [call.args[0] for call in mock_input.call_args_list]
+
+    # Páginas 1 e 2 formatadas uma vez cada; a volta à página 1 vem do cache
+    assert [call.args[1] for call in format_page.call_args_list] == [0, 1]
+    assert "Página 1 de 200" in prompts[0]
+    assert "Página 2 de 200" in prompts[1]
+    assert output.count("Descricao 0") == 2
+    assert "Descricao 10" not in output
+
+def test_sanitize_text_column_matches_per_cell_version():
+    """Testa se a sanitização vetorizada produz exatamente a saída da versão célula a célula."""
+    series = pd.Series([
+        'Bomba  com\tvazamento\n', 'Execução Ñ', ' None ', 'nan', 'NaT', '', '   ',
+        None, float('nan'), pd.NaT, pd.NA, 12, 2.5, 'ﬁm ① x\x01y\x7fz', 'a\u200bb\u00a0c', 'Execução Ñ',
+        'a\x00SECRET', 'a', 'nan\x00', 'a\x00\x01b'
+    ] * 3, dtype=object, index=range(100, 160))
+
+    result = _sanitize_text_column(series)
+
+    assert result.equals(sanitize_per_cell(series))
+    assert result.iloc[:8].tolist() == ['Bomba com vazamento', 'Execucao N', '-', '-', '-', '-', '-', '-']
+    assert result.iloc[16:18].tolist() == ['a SECRET', 'a']  # NUL não junta 'a\x00SECRET' e 'a'
+
+@patch('interface.table_printer.get_terminal_size')
+def test_pretty_print_df_fixed_width_pages(mock_get_terminal_size, display_map, sample_settings):
+    """Testa se todas as páginas usam as mesmas larguras, com uma linha por registro e textos longos truncados."""
+    mock_get_terminal_size.return_value = (8, 100)  # 3 linhas por página
+    df = pd.DataFrame({
+        'numero_ssa': [2025001, 2025002, 2025003, 2025004],
+        'situacao': ['ADM', 'APG', None, 'SCA'],
+        'descricao_ssa': ['Curta', 'Media', 'x' * 300, 'Outra'],
+    })
+
+    with patch('builtins.input', side_effect=['']):
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            pretty_print_df(df, display_map, sample_settings)
+            lines = mock_stdout.getvalue().splitlines()
+
+    assert lines[1].startswith('------+')
+    data_lines = [line for line in lines[2:] if '|' in line]
+    assert len(data_lines) == 4  # Sem quebra de linha nos textos longos
+    separator_positions = {tuple(i for i, ch in enumerate(line) if ch == '|') for line in [lines[0]] + data_lines}
+    assert len(separator_positions) == 1
+    assert data_lines[2].rstrip().endswith('...')
+    assert '| -' in data_lines[2]
@@ -0,0 +1,67 @@
+# tests/test_task_runner.py
+"""
+Testes unitários para o executor de tarefas da GUI (gui.task_runner).
+
+Os testes são pulados quando o PyQt6 não está instalado.
+"""
+
+import pytest
+import os
+import sys
+import threading
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+pytest.importorskip('PyQt6.QtCore')
+from PyQt6.QtCore import QCoreApplication
+
+from gui.task_runner import TaskRunner, COALESCE_JOIN, COALESCE_REPLACE
+
+# --- Fixtures ---
+
+@pytest.fixture(scope='module')
+def qt_app():
+    """Aplicação Qt (sem janelas): os callbacks chegam pelo laço de eventos."""
+    return QCoreApplication.instance() or QCoreApplication([])
+
+def _drain(app, runner: TaskRunner):
+    """Espera o pool e entrega os sinais pendentes na thread principal."""
+    assert runner.wait_for_done(5000)
+    app.processEvents()
+
+# --- Testes ---
+
+def test_result_error_and_finished(qt_app):
+    """Resultados e erros chegam aos callbacks; on_finished é sempre chamado."""
+    runner = TaskRunner(max_threads=2)
+    events = []
+
+    def failing(handle):
+        raise ValueError("falhou")
+
+    runner.submit('soma', lambda handle, a, b: a + b, 2, 3,
+                  on_result=events.append, on_finished=lambda: events.append('fim soma'))
+    runner.submit('erro', failing, on_error=events.append, on_finished=lambda: events.append('fim erro'))
+    _drain(qt_app, runner)
+    assert sorted(map(str, events)) == sorted(['5', 'falhou', 'fim soma', 'fim erro'])
+    assert runner.active_count() == 0 and not runner.is_active('soma')
+
+def test_coalescing(qt_app):
+    """JOIN reaproveita a tarefa ativa de mesma chave; REPLACE descarta o resultado da anterior."""
+    runner = TaskRunner(max_threads=1)
+    release = threading.Event()
+    results = []
+
+    def slow(handle, value):
+        release.wait(5)
+        return value
+
+    first = runner.submit('busca', slow, 1, on_result=results.append)
+    assert runner.submit('busca', slow, 2, coalesce=COALESCE_JOIN) is first
+    runner.submit('busca', slow, 3, coalesce=COALESCE_REPLACE, on_result=results.append)
+    assert first.is_cancelled()
+    release.set()
+    _drain(qt_app, runner)
+    assert results == [3]
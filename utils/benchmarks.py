@@ -0,0 +1,145 @@
+# utils/benchmarks.py 20250729 203000 (v1.1 - Benchmark da sanitizacao de exibicao)
+"""
+Medições de desempenho das rotinas de busca e de exibição, executadas sobre a tabela completa.
+
+Uso:
+    python utils/benchmarks.py [--db data/ssas.db] [--table ssas] [--repeat 5] [--min-rows 100000]
+
+Se a tabela tiver menos linhas que `--min-rows`, ela é replicada até atingir esse
+tamanho, para que as diferenças fiquem mensuráveis.
+"""
+
+import os
+import re
+import sys
+import time
+import unicodedata
+import argparse
+import statistics
+from typing import Callable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Adiciona a raiz do projeto ao path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from armazenamento.database import query_db, load_search_haystack
+from core.search_engine import Predicate, RegexPredicate, _match, attach_haystack, get_haystack
+from interface.table_printer import _sanitize_text_column
+
+DEFAULT_DB_PATH = os.path.join(project_root, 'data', 'ssas.db')
+DEFAULT_TABLE_NAME = 'ssas'
+
+
+def time_call(func: Callable[[], object], repeat: int) -> float:
+    """Executa `func` `repeat` vezes e retorna a mediana do tempo, em milissegundos."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def load_haystack(db_path: str, table_name: str, min_rows: int) -> np.ndarray:
+    """Carrega o texto pesquisável da tabela, replicado até `min_rows` linhas."""
+    df = query_db(db_path, table_name)
+    search_index = load_search_haystack(db_path, table_name)
+    if search_index is not None:
+        attach_haystack(df, search_index[1], search_index[0])
+    haystack = get_haystack(df)
+    if 0 < len(haystack) < min_rows:
+        haystack = np.tile(haystack, -(-min_rows // len(haystack)))
+    return haystack
+
+
+def load_table(db_path: str, table_name: str, min_rows: int) -> pd.DataFrame:
+    """Carrega a tabela, replicada até `min_rows` linhas."""
+    df = query_db(db_path, table_name)
+    if 0 < len(df) < min_rows:
+        df = pd.concat([df] * -(-min_rows // len(df)), ignore_index=True)
+    return df
+
+
+def sanitize_per_cell(series: pd.Series) -> pd.Series:
+    """Sanitização de exibição célula a célula (implementação anterior, referência de saída)."""
+    series = series.apply(
+        lambda x: '-' if pd.isna(x) or str(x).strip().lower() in ['none', 'nan', 'nat', ''] else str(x)
+    )
+    series = series.apply(lambda x: unicodedata.normalize('NFKD', x).encode('ascii', 'ignore').decode('utf-8'))
+    series = series.apply(lambda x: re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\n\r\t]+', ' ', x))
+    return series.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def bench_display_sanitizer(df: pd.DataFrame, repeat: int) -> List[Tuple[str, float, float, bool]]:
+    """
+    Compara, por coluna de texto, a sanitização célula a célula com a vetorizada.
+
+    Returns:
+        List[Tuple[str, float, float, bool]]: (coluna, ms por célula, ms vetorizada, saídas idênticas).
+    """
+    results = []
+    for col in df.columns:
+        if not pd.api.types.is_object_dtype(df[col]):
+            continue
+        series = df[col]
+        identical = sanitize_per_cell(series).equals(_sanitize_text_column(series))
+        results.append((
+            col,
+            time_call(lambda: sanitize_per_cell(series), repeat),
+            time_call(lambda: _sanitize_text_column(series), repeat),
+            identical,
+        ))
+    return results
+
+
+def bench_search_modes(haystack: np.ndarray, repeat: int) -> List[Tuple[str, float, int]]:
+    """
+    Compara o custo da busca literal (regex=False), da busca literal pelo motor de regex
+    (comportamento antigo) e do modo 're:' com padrões compilados.
+
+    Returns:
+        List[Tuple[str, float, int]]: (descrição, mediana em ms, linhas encontradas).
+    """
+    series = pd.Series(haystack, dtype=object)
+    cases = [
+        ("literal 'bomba' (regex=False)", lambda: _match(haystack, Predicate('bomba'))),
+        ("literal 'bomba' (regex=True, antigo)",
+         lambda: series.str.contains('bomba', na=False).to_numpy(dtype=bool)),
+        ("re:^mel[0-9]", lambda: _match(haystack, RegexPredicate('^mel[0-9]'))),
+        ("re:bomba.*vazamento", lambda: _match(haystack, RegexPredicate('bomba.*vazamento'))),
+    ]
+    return [(label, time_call(func, repeat), int(func().sum())) for label, func in cases]
+
+
+def main(cli_args=None):
+    parser = argparse.ArgumentParser(description="Benchmark da busca literal x expressão regular.")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Caminho do banco SQLite.')
+    parser.add_argument('--table', default=DEFAULT_TABLE_NAME, help='Nome da tabela.')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetições por medição.')
+    parser.add_argument('--min-rows', type=int, default=100_000, help='Tamanho mínimo da amostra.')
+    args = parser.parse_args(cli_args)
+
+    if not os.path.exists(args.db):
+        print(f"Banco de dados não encontrado: {args.db}")
+        return 1
+
+    haystack = load_haystack(args.db, args.table, args.min_rows)
+    print(f"\nBusca sobre {len(haystack)} linhas (mediana de {args.repeat} execuções):")
+    for label, elapsed_ms, matches in bench_search_modes(haystack, args.repeat):
+        print(f"  {label:<40} {elapsed_ms:9.1f} ms  {matches:>8} linhas")
+
+    df = load_table(args.db, args.table, args.min_rows)
+    print(f"\nSanitização de exibição sobre {len(df)} linhas (célula a célula x vetorizada):")
+    for col, per_cell_ms, vectorized_ms, identical in bench_display_sanitizer(df, args.repeat):
+        print(
+            f"  {col:<32} {per_cell_ms:9.1f} ms {vectorized_ms:9.1f} ms"
+            f"  {'idêntica' if identical else 'DIFERENTE'}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
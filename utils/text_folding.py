@@ -0,0 +1,31 @@
+# utils/text_folding.py 20250728 160000 (v1.1 - Remocao de acentos sem alterar caixa)
+"""
+Normalização de texto para busca insensível a acentos e maiúsculas/minúsculas.
+
+A mesma função é usada em Python (motor de busca em memória) e registrada no SQLite
+como `fold()`, garantindo que as duas buscas casem exatamente os mesmos textos.
+"""
+
+import unicodedata
+from typing import Optional
+
+
+def strip_accents(value: str) -> str:
+    """Remove acentos preservando maiúsculas/minúsculas ('Execução' -> 'Execucao')."""
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def fold_text(value: Optional[str]) -> Optional[str]:
+    """
+    Remove acentos e converte para minúsculas ('Execução' -> 'execucao').
+
+    Args:
+        value (Optional[str]): Texto de entrada. Valores não-texto são convertidos com str().
+
+    Returns:
+        Optional[str]: Texto normalizado, ou None se a entrada for None.
+    """
+    if value is None:
+        return None
+    return strip_accents(str(value)).lower()